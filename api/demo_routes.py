@@ -2,6 +2,10 @@
 from flask import Blueprint, request, jsonify
 from services.mode_service import toggle_demo_mode, is_demo_mode
 from services.transaction_service import reset_demo_transactions
+import logging
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
 
 demo_blueprint = Blueprint('demo', __name__)
 
@@ -21,7 +25,7 @@ def toggle_demo_mode_api():
         
         # Basculer le mode
         new_mode = toggle_demo_mode(enable_demo)
-        print(f"Mode démo {'activé' if enable_demo else 'désactivé'} par l'utilisateur {user_id}")
+        logger.info(f"Mode démo {'activé' if enable_demo else 'désactivé'}", extra={'user_id': user_id})
         
         return jsonify({
             "success": True,
@@ -29,7 +33,7 @@ def toggle_demo_mode_api():
             "is_demo_mode": is_demo_mode()
         })
     except Exception as e:
-        print(f"Erreur lors du basculement du mode démo: {str(e)}")
+        logger.exception(f"Erreur lors du basculement du mode démo: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @demo_blueprint.route('/reset_test_transactions', methods=['POST'])
@@ -49,7 +53,8 @@ def reset_test_transactions_api():
         
         # Réinitialiser les transactions de test
         transactions = reset_demo_transactions(user_id, days)
-        print(f"Transactions de test réinitialisées pour l'utilisateur {user_id}")
+        logger.info("Transactions de test réinitialisées",
+                    extra={'user_id': user_id, 'days': days, 'count': len(transactions)})
         
         return jsonify({
             "success": True,
@@ -57,5 +62,5 @@ def reset_test_transactions_api():
             "count": len(transactions)
         })
     except Exception as e:
-        print(f"Erreur lors de la réinitialisation des transactions de test: {str(e)}")
+        logger.exception(f"Erreur lors de la réinitialisation des transactions de test: {str(e)}")
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
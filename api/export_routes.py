@@ -0,0 +1,46 @@
+# api/export_routes.py
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from services.export_service import export_transactions
+from utils.auth_utils import require_valid_user
+import logging
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+export_blueprint = Blueprint('export', __name__)
+
+@export_blueprint.route('/export', methods=['GET', 'POST'])
+@require_valid_user
+def export_api():
+    """
+    Exporte les transactions de l'utilisateur sur une plage de dates, en CSV ou XLSX
+
+    Le fichier est envoyé au fil de la lecture en base (mémoire constante) :
+    les premiers octets partent avant la fin de la lecture.
+    """
+    try:
+        # GET : query string (lien de téléchargement), POST : corps JSON
+        params = request.args if request.method == 'GET' else request.json
+        # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
+        user_id = params.get('userId') or params.get('user_id')
+
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+
+        body, mimetype, filename = export_transactions(
+            user_id,
+            export_format=(params.get('format') or 'csv').lower(),
+            start_date=params.get('start_date'),
+            end_date=params.get('end_date'),
+            days=int(params.get('days', 30))
+        )
+
+        return Response(stream_with_context(body), mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'private, no-store'
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception(f"Erreur lors de l'export des transactions: {str(e)}")
+        return jsonify({"error": str(e)}), 500
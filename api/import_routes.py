@@ -0,0 +1,70 @@
+# api/import_routes.py
+from flask import Blueprint, request, jsonify
+from services.import_service import get_import_job, import_transactions
+from utils.auth_utils import require_valid_user
+import logging
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+import_blueprint = Blueprint('import', __name__)
+
+# Statut de l'import -> code HTTP (200 sinon)
+IMPORT_STATUS_CODES = {
+    'rejected': 422,
+    'failed': 500,
+}
+
+@import_blueprint.route('/import', methods=['POST'])
+@require_valid_user
+def import_api():
+    """
+    Importe un relevé bancaire (CSV ou OFX) dans les transactions manuelles de l'utilisateur
+
+    Le fichier est envoyé en multipart (champ "file") ou directement dans le
+    corps de la requête ; les paramètres dans le formulaire ou la query string.
+    """
+    try:
+        params = request.values
+        # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
+        user_id = params.get('userId') or params.get('user_id')
+
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+
+        upload = request.files.get('file')
+        job = import_transactions(
+            user_id,
+            upload.stream if upload else request.stream,
+            import_format=params.get('format'),
+            file_name=upload.filename if upload else params.get('file_name'),
+            amount_sign=params.get('amount_sign', 'bank'),
+            resume=params.get('resume')
+        )
+
+        # Import refusé (fichier invalide) ou interrompu : la progression
+        # (et son identifiant, pour reprendre) est renvoyée avec l'erreur
+        return jsonify(job), IMPORT_STATUS_CODES.get(job["status"], 200)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception(f"Erreur lors de l'import du relevé: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@import_blueprint.route('/import/<job_id>', methods=['GET'])
+@require_valid_user
+def import_status_api(job_id):
+    """
+    Renvoie la progression d'un import
+    """
+    try:
+        user_id = request.args.get('userId') or request.args.get('user_id')
+        job = get_import_job(user_id, job_id)
+
+        if job is None:
+            return jsonify({"error": "Import job not found"}), 404
+
+        return jsonify(job)
+    except Exception as e:
+        logger.exception(f"Erreur lors de la lecture de l'import: {str(e)}")
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,73 @@
+# api/metrics_routes.py
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from db_models import db
+from utils.auth_utils import user_cache
+from utils.db_pool import pool_status
+from utils.instrumentation import METRICS, render_gauges
+from utils.response_cache import get_response_cache
+from utils.structured_logging import dropped_records
+
+metrics_blueprint = Blueprint('metrics', __name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+@metrics_blueprint.before_request
+def require_metrics_token():
+    """
+    Réserve les métriques aux porteurs du jeton METRICS_TOKEN
+
+    Sans jeton configuré, les métriques sont désactivées (404) : elles
+    révèlent la charge et le coût des requêtes de chaque endpoint.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return jsonify({"error": "Metrics are disabled"}), 404
+
+    scheme, _, provided = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not hmac.compare_digest(provided.encode(), token.encode()):
+        return jsonify({"error": "Invalid metrics token"}), 401
+
+@metrics_blueprint.route('', methods=['GET'])
+def prometheus_metrics():
+    """
+    Retourne les métriques du worker qui répond au format texte Prometheus :
+    latence par endpoint, requêtes SQL par requête, temps SQL et de
+    sérialisation, occupation du pool et efficacité des caches
+    """
+    pool = pool_status(db.engine)
+    gauges = [
+        ('cashsense_db_pool_checked_out', 'gauge', 'Connections currently checked out', pool.get('checked_out', 0)),
+        ('cashsense_db_pool_overflow', 'gauge', 'Overflow connections currently open', pool.get('overflow', 0)),
+        ('cashsense_db_pool_checkouts_total', 'counter', 'Connection checkouts', pool['checkouts']),
+        ('cashsense_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection', pool['wait_seconds_total']),
+        ('cashsense_db_pool_timeouts_total', 'counter', 'Connection checkouts that timed out', pool['timeouts']),
+    ]
+
+    users = user_cache.stats()
+    gauges += [
+        ('cashsense_user_cache_hits_total', 'counter', 'User existence cache hits', users['hits']),
+        ('cashsense_user_cache_misses_total', 'counter', 'User existence cache misses', users['misses']),
+    ]
+
+    gauges.append(('cashsense_log_records_dropped_total', 'counter',
+                   'Log records dropped because the log queue was full', dropped_records()))
+
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        cached = response_cache.stats()
+        gauges += [
+            ('cashsense_response_cache_hits_total', 'counter', 'Response cache hits', cached['hits']),
+            ('cashsense_response_cache_misses_total', 'counter', 'Response cache misses', cached['misses']),
+            ('cashsense_response_cache_bytes', 'gauge', 'Response cache size in bytes', cached.get('bytes', 0)),
+        ]
+
+    return Response(METRICS.render() + render_gauges(gauges), content_type=PROMETHEUS_CONTENT_TYPE)
+
+@metrics_blueprint.route('/pool', methods=['GET'])
+def pool_metrics():
+    """
+    Retourne l'occupation du pool de connexions du worker qui répond
+    (connexions empruntées, débordement, temps d'attente cumulé)
+    """
+    return jsonify(pool_status(db.engine))
@@ -0,0 +1,35 @@
+# api/reports_routes.py
+from flask import Blueprint, request, jsonify
+from services.analysis_service import get_summary
+from utils.auth_utils import require_valid_user
+import logging
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+reports_blueprint = Blueprint('reports', __name__)
+
+@reports_blueprint.route('/summary', methods=['POST'])
+@require_valid_user
+def summary_api():
+    """
+    Retourne les dépenses et revenus agrégés par mois et par catégorie
+    """
+    try:
+        # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
+        user_id = request.json.get('userId') or request.json.get('user_id')
+
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+
+        # Plage de dates : start_date/end_date, ou les 'days' derniers jours
+        start_date = request.json.get('start_date')
+        end_date = request.json.get('end_date')
+        days = request.json.get('days', 30)
+
+        return jsonify(get_summary(user_id, start_date, end_date, days))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception(f"Erreur lors du calcul de la synthèse: {str(e)}")
+        return jsonify({"error": str(e)}), 500
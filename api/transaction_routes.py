@@ -1,7 +1,18 @@
 # api/transaction_routes.py
-from flask import Blueprint, request, jsonify
-from services.transaction_service import get_transactions, add_transaction
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from services.transaction_service import (
+    get_transactions, get_transactions_page, get_transactions_version, iter_transactions,
+    add_transaction, add_transactions
+)
+from services.mode_service import get_current_mode
+from services.sync_service import get_transaction_changes
+from config import DEMO_ENGINE
 from utils.auth_utils import require_valid_user
+from utils.response_cache import cached_json_response, response_cache_key
+from utils.serialization import dumps_items
+from datetime import date
+import hashlib
+import json
 import logging
 
 # Configuration du logger
@@ -9,31 +20,193 @@ logger = logging.getLogger(__name__)
 
 transaction_blueprint = Blueprint('transaction', __name__)
 
-@transaction_blueprint.route('/get_transactions', methods=['POST'])
+# Nombre de transactions sérialisées par morceau de réponse en streaming
+STREAM_BATCH_SIZE = 200
+
+def _stream_transactions_json(transactions):
+    """
+    Sérialise un itérable de transactions en JSON morceau par morceau
+    
+    Args:
+        transactions: Itérable de transactions au format API
+        
+    Yields:
+        bytes: Morceaux du document {"transactions": [...]}
+    """
+    yield b'{"transactions":['
+    
+    batch = []
+    first = True
+    for transaction in transactions:
+        batch.append(transaction)
+        if len(batch) >= STREAM_BATCH_SIZE:
+            yield (b'' if first else b',') + dumps_items(batch)
+            first = False
+            batch = []
+    
+    if batch:
+        yield (b'' if first else b',') + dumps_items(batch)
+    
+    yield b']}'
+
+def _read_params():
+    """
+    Lit les paramètres de lecture des transactions
+    
+    Les requêtes GET passent leurs paramètres dans la query string,
+    les requêtes POST dans le corps JSON.
+    
+    Returns:
+        dict: Paramètres userId, days, limit, cursor et stream
+    """
+    if request.method == 'GET':
+        args = request.args
+        return {
+            "user_id": args.get('userId') or args.get('user_id'),
+            "days": args.get('days', 30, type=int),
+            "limit": args.get('limit', type=int),
+            "cursor": args.get('cursor'),
+            "stream": args.get('stream', '').lower() in ('1', 'true')
+        }
+    
+    # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
+    return {
+        "user_id": request.json.get('userId') or request.json.get('user_id'),
+        "days": request.json.get('days', 30),  # Valeur par défaut: 30
+        "limit": request.json.get('limit'),
+        "cursor": request.json.get('cursor'),
+        "stream": bool(request.json.get('stream'))
+    }
+
+def _transactions_etag(user_id, days, params, cache_key=None):
+    """
+    Calcule l'ETag d'une lecture de transactions sans charger de ligne
+    
+    La clé du cache de réponses, qui contient le compteur de version de
+    l'utilisateur (incrémenté à chaque écriture), suffit : aucune requête
+    n'est faite en base. Sans cache, l'ETag est tiré de COUNT(*) et
+    MAX(updatedAt) des transactions lues.
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        days (int): Nombre de jours de transactions
+        params (dict): Paramètres qui déterminent la réponse
+        cache_key (str, optional): Clé du cache de réponses (voir response_cache_key)
+        
+    Returns:
+        str: ETag (faible : deux réponses égales ne sont pas forcément identiques à l'octet près)
+    """
+    if cache_key is not None:
+        payload = cache_key
+    else:
+        count, last_updated = get_transactions_version(user_id, days)
+        payload = json.dumps([params, count, last_updated], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+@transaction_blueprint.route('/get_transactions', methods=['GET', 'POST'])
 @require_valid_user
 def get_transactions_api():
     """
     Récupère les transactions pour un utilisateur
     (mode démo ou transactions manuelles)
+    
+    Si 'limit' ou 'cursor' est fourni, la réponse est paginée et contient
+    un 'next_cursor' à renvoyer pour obtenir la page suivante.
+    Si 'stream' vaut true, le tableau JSON est envoyé au fil de la lecture
+    en base, avec une mémoire constante quelle que soit la fenêtre.
+    
+    Les réponses non streamées portent un ETag : une requête conditionnelle
+    (If-None-Match) dont les données n'ont pas changé reçoit un 304 sans
+    qu'aucune transaction ne soit lue ni sérialisée.
     """
     try:
         # Récupérer et valider les paramètres requis
-        # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
-        user_id = request.json.get('userId') or request.json.get('user_id')
+        params = _read_params()
+        user_id = params["user_id"]
         
         if not user_id:
             return jsonify({"error": "User ID is required"}), 400
         
-        # Récupérer le paramètre days s'il est fourni
-        days = request.json.get('days', 30)  # Valeur par défaut: 30
+        days = params["days"]
+        limit = params["limit"]
+        cursor = params["cursor"]
+        
+        # Réponse en streaming si demandée (jamais mise en cache)
+        if params["stream"] and limit is None and not cursor:
+            body = _stream_transactions_json(iter_transactions(user_id, days))
+            return Response(stream_with_context(body), mimetype='application/json')
+        
+        # Paramètres qui déterminent la réponse (la fenêtre glisse chaque jour)
+        cache_params = {
+            "mode": get_current_mode(),
+            "demo_engine": DEMO_ENGINE,
+            "days": days,
+            "limit": limit,
+            "cursor": cursor,
+            "today": date.today().isoformat()
+        }
+        
+        # L'ETag est calculé avant la lecture : si les données changent entre-temps,
+        # il est plus ancien que la réponse et provoque au pire un 200 superflu
+        cache_key = response_cache_key(user_id, cache_params)
+        etag = _transactions_etag(user_id, days, cache_params, cache_key)
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        elif limit is not None or cursor:
+            # Pagination par curseur si demandée
+            response = cached_json_response(
+                user_id, cache_params,
+                lambda: get_transactions_page(user_id, days, limit, cursor),
+                key=cache_key
+            )
+        else:
+            response = cached_json_response(
+                user_id, cache_params,
+                lambda: {"transactions": get_transactions(user_id, days)},
+                key=cache_key
+            )
         
-        transactions = get_transactions(user_id, days)
-        return jsonify({"transactions": transactions})
+        # Les caches HTTP doivent revalider à chaque fois (données propres à l'utilisateur)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
     except ValueError as e:
         # Erreur de validation (comme un ID utilisateur manquant)
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        print(f"Erreur lors de la récupération des transactions: {str(e)}")
+        logger.exception(f"Erreur lors de la récupération des transactions: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@transaction_blueprint.route('/sync', methods=['GET', 'POST'])
+@require_valid_user
+def sync_transactions_api():
+    """
+    Synchronisation incrémentale : transactions créées, modifiées ou
+    supprimées depuis le curseur renvoyé par l'appel précédent
+    
+    Sans curseur, toutes les transactions du mode actuel sont renvoyées
+    (page par page tant que 'has_more' est vrai).
+    """
+    try:
+        if request.method == 'GET':
+            params = request.args
+            limit = params.get('limit', type=int)
+        else:
+            params = request.json
+            limit = params.get('limit')
+        # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
+        user_id = params.get('userId') or params.get('user_id')
+        
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+        
+        response = jsonify(get_transaction_changes(user_id, params.get('cursor'), limit))
+        response.headers['Cache-Control'] = 'private, no-store'
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception(f"Erreur lors de la synchronisation des transactions: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @transaction_blueprint.route('/add_transaction', methods=['POST'])
@@ -65,5 +238,39 @@ def add_transaction_api():
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
     except Exception as e:
-        print(f"Erreur lors de l'ajout de la transaction: {str(e)}")
+        logger.exception(f"Erreur lors de l'ajout de la transaction: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@transaction_blueprint.route('/add_transactions', methods=['POST'])
+@require_valid_user
+def add_transactions_api():
+    """
+    Ajoute un lot de transactions manuelles pour un utilisateur
+    """
+    try:
+        # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
+        user_id = request.json.get('userId') or request.json.get('user_id')
+        
+        if not user_id:
+            return jsonify({"error": "User ID is required"}), 400
+        
+        transactions_data = request.json.get('transactions')
+        
+        if not transactions_data:
+            return jsonify({"error": "Transactions data is required"}), 400
+        
+        # Ajouter les transactions valides en une seule transaction
+        results = add_transactions(user_id, transactions_data, is_manual=True)
+        inserted_count = sum(1 for result in results if result["success"])
+        
+        return jsonify({
+            "success": inserted_count == len(results),
+            "inserted": inserted_count,
+            "failed": len(results) - inserted_count,
+            "results": results
+        })
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception(f"Erreur lors de l'ajout du lot de transactions: {str(e)}")
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -1,48 +1,223 @@
-from flask import Flask
+from flask import Flask, current_app
+from flask.cli import with_appcontext
 from flask_cors import CORS
+import click
 import os
 from api.transaction_routes import transaction_blueprint
 from api.demo_routes import demo_blueprint
+from api.reports_routes import reports_blueprint
+from api.export_routes import export_blueprint
+from api.import_routes import import_blueprint
+from api.metrics_routes import metrics_blueprint
+from config import DB_AUTO_MIGRATE, METRICS_TOKEN
 from db_models import db  # Importer la base de données
+from migrations import contract_legacy_columns, initialize_database, upgrade
+from utils.compression import init_compression
+from utils.db_pool import engine_options, init_engine
+from utils.instrumentation import init_instrumentation
+from utils.structured_logging import init_logging
+from utils.serialization import FastJSONProvider
 
-app = Flask(__name__)
 
-# Configuration de CORS
-CORS(app, expose_headers=["Content-Type", "Authorization"], 
-   allow_headers=["Content-Type", "Authorization"],
-   supports_credentials=True)
+def _print_upgrade_result(result):
+    """Affiche le résumé d'une migration"""
+    print(f"Tables dérivées recréées: {', '.join(result['tables_rebuilt']) or 'aucune'}")
+    print(f"Colonnes ajoutées: {', '.join(result['columns_added']) or 'aucune'}")
+    print(f"Catégories enregistrées: {len(result['categories_added'])}")
+    print(f"Lignes reprises des anciennes colonnes: {result['legacy_backfilled']}")
+    print(f"Transactions illisibles mises en quarantaine: {result['quarantined']}")
+    for name, rows in result['data_migrations'].items():
+        print(f"Migration de données {name}: {rows} ligne(s) mise(s) à jour")
+    print(f"Transactions de la version précédente numérotées: {result['legacy_sequenced']}")
+    print(f"Index créés: {', '.join(result['indexes_created']) or 'aucun'}")
+    print(f"Index supprimés: {', '.join(result['indexes_dropped']) or 'aucun'}")
+    print(f"Lignes de cumul mensuel initialisées: {result['rollup_rows']}")
 
-# Initialiser le mode de l'application
-app.config['APP_MODE'] = 'prod'  # Valeur par défaut: mode production
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Crée les tables manquantes puis applique les migrations"""
+    _print_upgrade_result(initialize_database())
 
-# Configuration de la base de données
-database_url = os.getenv('DATABASE_URL', 'sqlite:///cashsense.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = database_url
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+@click.command('db-upgrade')
+@with_appcontext
+def db_upgrade_command():
+    """Applique les migrations (colonnes, backfill, index) sur la base existante"""
+    _print_upgrade_result(upgrade())
 
-# Initialisation de la base de données
-db.init_app(app)
+@click.command('db-contract')
+@with_appcontext
+def db_contract_command():
+    """Supprime les anciennes colonnes de Transaction (après le déploiement de LEGACY_TRANSACTION_WRITES=false)"""
+    try:
+        dropped = contract_legacy_columns()
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    print(f"Colonnes supprimées: {', '.join(dropped) or 'aucune'}")
 
-# Créer les tables si elles n'existent pas
-with app.app_context():
-    db.create_all()
+@click.command('rollup-rebuild')
+@click.option('--user', default=None, help='Limiter à un utilisateur')
+@with_appcontext
+def rollup_rebuild_command(user):
+    """Recalcule le cumul mensuel à partir des transactions"""
+    from services.rollup_service import rebuild_rollup
+    print(f"{rebuild_rollup(user)} lignes de cumul écrites")
 
-# Autres configurations
-app.config['DEBUG'] = os.getenv("FLASK_ENV", "development") != "production"
+@click.command('rollup-verify')
+@click.option('--user', default=None, help='Limiter à un utilisateur')
+@with_appcontext
+def rollup_verify_command(user):
+    """Vérifie que le cumul mensuel correspond aux transactions"""
+    from services.rollup_service import verify_rollup
+    drifts = verify_rollup(user)
+    for drift in drifts:
+        print(f"Écart {drift['key']}: attendu {drift['expected']}, stocké {drift['stored']}")
+    print(f"{len(drifts)} écart(s) détecté(s)")
+    if drifts:
+        raise SystemExit(1)
 
-# Enregistrer les blueprints
-app.register_blueprint(transaction_blueprint, url_prefix='/api')
-app.register_blueprint(demo_blueprint, url_prefix='/api')
+@click.command('generate-synthetic')
+@click.option('--users', default=1, help="Nombre d'utilisateurs")
+@click.option('--months', default=12, help='Nombre de mois par utilisateur')
+@click.option('--seed', default=None, type=int, help='Graine du générateur')
+@click.option('--output', default=None, help='Fichier de sortie (.csv ou .npz) au lieu de la base')
+@with_appcontext
+def generate_synthetic_command(users, months, seed, output):
+    """Génère un jeu de transactions fictives volumineux (base ou fichier)"""
+    from utils.synthetic_data import generate_columns, write_to_db, write_to_file, default_user_ids
+
+    columns = generate_columns(users, months, seed=seed)
+    user_ids = default_user_ids(users)
+    if output:
+        written = write_to_file(columns, output, user_ids)
+    else:
+        written = write_to_db(columns, user_ids)
+    print(f"{written} transactions générées pour {users} utilisateur(s) sur {months} mois")
+
+@click.command('import-transactions')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', required=True, help='Utilisateur destinataire')
+@click.option('--format', 'import_format', default=None, help="csv ou ofx (déduit de l'extension par défaut)")
+@click.option('--amount-sign', default='bank', type=click.Choice(['bank', 'api']),
+              help="'bank' : négatif au débit (relevé), 'api' : négatif pour un revenu (export)")
+@click.option('--resume', default=None, help="Identifiant d'un import interrompu à reprendre")
+@with_appcontext
+def import_transactions_command(path, user, import_format, amount_sign, resume):
+    """Importe un relevé bancaire CSV ou OFX (lignes déjà importées ignorées)"""
+    from services.import_service import import_transactions
+    from utils.auth_utils import verify_user_exists
+
+    if not verify_user_exists(user):
+        raise click.ClickException(f"Utilisateur inconnu: {user}")
+    try:
+        with open(path, 'rb') as stream:
+            job = import_transactions(user, stream, import_format=import_format,
+                                      file_name=os.path.basename(path), amount_sign=amount_sign, resume=resume)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    print(f"Import {job['id']}: {job['status']}, {job['rows_processed']} ligne(s) lue(s)")
+    print(f"Insérées: {job['inserted']}, déjà importées: {job['duplicates']}, en erreur: {job['failed']}")
+    for error in job['errors']:
+        print(f"Ligne {error['row']}: {error['error']}")
+    if job['status'] == 'rejected':
+        raise click.ClickException(f"Import refusé: {job['error']}")
+    if job['status'] == 'failed':
+        print(f"Import interrompu ({job['error']}) : relancer avec --resume {job['id']}")
+        raise SystemExit(1)
+
+@click.command('purge-tombstones')
+@click.option('--days', default=None, type=int, help='Durée de conservation (SYNC_TOMBSTONE_RETENTION_DAYS par défaut)')
+@with_appcontext
+def purge_tombstones_command(days):
+    """Supprime les traces de suppression trop anciennes pour la synchronisation"""
+    from config import SYNC_TOMBSTONE_RETENTION_DAYS
+    from services.sync_service import purge_tombstones
+    print(f"{purge_tombstones(days if days is not None else SYNC_TOMBSTONE_RETENTION_DAYS)} trace(s) supprimée(s)")
+
+CLI_COMMANDS = [
+    init_db_command, db_upgrade_command, db_contract_command, rollup_rebuild_command,
+    rollup_verify_command, generate_synthetic_command, import_transactions_command,
+    purge_tombstones_command
+]
 
-@app.route('/')
 def health_check():
     """Vérifie si l'API est en cours d'exécution"""
-    environment = "test" if app.config['APP_MODE'] == 'demo' else "production"
+    environment = "test" if current_app.config['APP_MODE'] == 'demo' else "production"
     return {
-        'status': 'ok', 
+        'status': 'ok',
         'message': f'Cash Sense API is running in {environment} mode!'
     }
 
+def create_app(config=None):
+    """
+    Construit l'application Flask
+
+    Aucune connexion à la base n'est ouverte ici : le schéma est créé par la
+    commande init-db (ou au démarrage si DB_AUTO_MIGRATE est activé), et les
+    schémas JSON sont lus à la première validation. Sous gunicorn avec
+    preload_app, le processus maître n'a donc aucune connexion à partager
+    avec les workers.
+
+    Args:
+        config (dict, optional): Valeurs de configuration Flask prioritaires
+            (ex. SQLALCHEMY_DATABASE_URI pour un benchmark)
+
+    Returns:
+        Flask: L'application configurée
+    """
+    app = Flask(__name__)
+
+    # Initialiser le mode de l'application
+    app.config['APP_MODE'] = 'prod'  # Valeur par défaut: mode production
+    app.config['DEBUG'] = os.getenv("FLASK_ENV", "development") != "production"
+
+    # Configuration de la base de données
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///cashsense.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['DB_AUTO_MIGRATE'] = DB_AUTO_MIGRATE
+    app.config['METRICS_TOKEN'] = METRICS_TOKEN
+    if config:
+        app.config.update(config)
+    # Pool dimensionné d'après les threads gunicorn, pragmas SQLite (voir utils/db_pool.py)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    # Logs JSON écrits par un thread dédié, identifiant de requête (X-Request-ID)
+    init_logging(app)
+
+    # Sérialisation JSON rapide (orjson si disponible) et compression des réponses
+    app.json = FastJSONProvider(app)
+    init_compression(app)
+
+    # Configuration de CORS
+    CORS(app, expose_headers=["Content-Type", "Authorization"],
+       allow_headers=["Content-Type", "Authorization"],
+       supports_credentials=True)
+
+    # Initialisation de la base de données (le moteur ne se connecte qu'au premier usage)
+    db.init_app(app)
+    with app.app_context():
+        init_engine(db.engine)
+        # Latence par endpoint, requêtes SQL et sérialisation (GET /metrics)
+        init_instrumentation(app, db.engine)
+        if app.config['DB_AUTO_MIGRATE']:
+            initialize_database()
+
+    # Enregistrer les blueprints
+    app.register_blueprint(transaction_blueprint, url_prefix='/api')
+    app.register_blueprint(demo_blueprint, url_prefix='/api')
+    app.register_blueprint(reports_blueprint, url_prefix='/api')
+    app.register_blueprint(export_blueprint, url_prefix='/api')
+    app.register_blueprint(import_blueprint, url_prefix='/api')
+    app.register_blueprint(metrics_blueprint, url_prefix='/metrics')
+    app.add_url_rule('/', 'health_check', health_check)
+
+    for command in CLI_COMMANDS:
+        app.cli.add_command(command)
+
+    return app
+
 if __name__ == '__main__':
+    app = create_app()
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=app.config['DEBUG'])
\ No newline at end of file
+    app.run(host='0.0.0.0', port=port, debug=app.config['DEBUG'])
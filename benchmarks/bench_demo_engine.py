@@ -0,0 +1,61 @@
+"""
+Première visite en mode démo : génération puis stockage des transactions
+(moteur 'stored') contre génération à la volée sans écriture (moteur 'lazy'),
+à froid puis avec les mois déjà dans le LRU.
+
+Usage:
+    python benchmarks/bench_demo_engine.py [30,365,1825]
+"""
+import itertools
+import sys
+
+from common import get_bench_app, reset_bench_data, timed
+
+DEFAULT_DAYS = [30, 365, 1825]
+REPEAT = 5
+
+
+def main():
+    days_list = [int(days) for days in sys.argv[1].split(',')] if len(sys.argv) > 1 else DEFAULT_DAYS
+
+    app = get_bench_app()
+    from db_models import db, Transaction
+    import services.transaction_service as transaction_service
+    from services.demo_service import generate_demo_month
+
+    # Un nouvel utilisateur par appel : chaque mesure est une première visite
+    user_ids = (f'bench-demo-{index}' for index in itertools.count())
+
+    def first_visit(engine, clear_cache=False):
+        user_id = next(user_ids)
+        reset_bench_data(user_id)
+        if clear_cache:
+            generate_demo_month.cache_clear()
+        transaction_service.DEMO_ENGINE = engine
+        return transaction_service.get_demo_transactions(user_id, days)
+
+    with app.app_context():
+        for days in days_list:
+            print(f"=== days={days} ===")
+            stored = timed(lambda: first_visit('stored'), repeat=REPEAT)
+            lazy_cold = timed(lambda: first_visit('lazy', clear_cache=True), repeat=REPEAT)
+
+            # Même utilisateur : tous les mois de la fenêtre sont dans le LRU
+            warm_user = next(user_ids)
+            reset_bench_data(warm_user)
+            transaction_service.DEMO_ENGINE = 'lazy'
+            transaction_service.get_demo_transactions(warm_user, days)
+            lazy_warm = timed(lambda: transaction_service.get_demo_transactions(warm_user, days), repeat=REPEAT)
+
+            for label, stats in [('stored', stored), ('lazy (froid)', lazy_cold), ('lazy (LRU)', lazy_warm)]:
+                print(f"{label:>13}: min {stats['min_ms']:.1f} ms, médiane {stats['median_ms']:.1f} ms")
+
+        written = Transaction.query.filter(Transaction.userId.like('bench-demo-%')).count()
+        print(f"Lignes écrites par le moteur 'stored': {written} (0 pour 'lazy')")
+
+        db.session.execute(db.delete(Transaction).where(Transaction.userId.like('bench-demo-%')))
+        db.session.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark de la réinitialisation des données de test : insertion ORM ligne par
+ligne suivie d'une relecture, contre insertion en masse avec RETURNING.
+
+L'utilisateur a d'abord un historique de transactions (50 000 par défaut) :
+suppressions, cumul mensuel et relectures portent sur une table peuplée.
+
+Usage:
+    python benchmarks/bench_demo_reset.py [30,365,1825] [50000]
+"""
+import sys
+
+from common import get_bench_app, reset_bench_data, seed_transactions, timed, BENCH_USER_ID
+
+DEFAULT_DAYS = [30, 365, 1825]
+DEFAULT_HISTORY = 50000
+
+
+def orm_reset(user_id, days):
+    """
+    Ancienne implémentation de reset_demo_transactions, conservée pour comparaison
+
+    Même travail que l'implémentation actuelle (cumul mensuel, traces de
+    suppression, numéro de modification, invalidation du cache) : seules
+    l'insertion ligne par ligne et la relecture diffèrent.
+    """
+    from db_models import db, Transaction
+    from utils.mock_data import get_mock_transactions
+    from services.transaction_service import get_stored_transactions
+    from services.bulk_writer import build_transaction_row
+    from services.change_sequence import stamp_rows
+    from services.rollup_service import record_deleted, record_inserted
+    from services.sync_service import record_tombstones
+    from utils.response_cache import bump_user_version
+
+    generated_test_data = (
+        Transaction.userId == user_id,
+        Transaction.isTestData == True,  # noqa: E712
+        Transaction.isManual == False  # noqa: E712
+    )
+    record_deleted(*generated_test_data)
+    record_tombstones(*generated_test_data)
+    Transaction.query.filter(*generated_test_data).delete()
+
+    rows = [build_transaction_row(user_id, tx_data, is_test=True, is_manual=False)
+            for tx_data in get_mock_transactions(days=days)]
+    stamp_rows(rows)
+    for row in rows:
+        db.session.add(Transaction(**row))
+    record_inserted(rows)
+
+    db.session.commit()
+    bump_user_version(user_id)
+    return get_stored_transactions(user_id, days, is_test_data=True)
+
+
+def main():
+    days_list = [int(days) for days in sys.argv[1].split(',')] if len(sys.argv) > 1 else DEFAULT_DAYS
+    history = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_HISTORY
+
+    app = get_bench_app()
+    from services.transaction_service import reset_demo_transactions
+
+    with app.app_context():
+        reset_bench_data()
+        seed_transactions(history)
+        print(f"Historique: {history} transactions")
+        for days in days_list:
+            print(f"=== days={days} ===")
+            for label, fn in [('orm', orm_reset), ('bulk', reset_demo_transactions)]:
+                # Premier appel non mesuré : il remplace les données de l'appel précédent
+                fn(BENCH_USER_ID, days)
+                stats = timed(lambda: fn(BENCH_USER_ID, days))
+                print(f"{label:>5}: min {stats['min_ms']:.1f} ms, médiane {stats['median_ms']:.1f} ms")
+
+        reset_bench_data()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark de l'export en flux (GET /api/export) : CSV et XLSX sur 5 ans.
+
+Pour chaque format : délai avant le premier morceau, durée totale, débit
+et pic mémoire (tracemalloc) pendant le parcours complet du flux. En mode
+prod, seule la moitié manuelle des lignes insérées est exportée.
+
+Usage:
+    python benchmarks/bench_export.py [10000,100000,1000000]
+"""
+import sys
+import time
+import tracemalloc
+
+from common import get_bench_app, reset_bench_data, seed_transactions, BENCH_USER_ID
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DAYS = 5 * 365
+
+
+def measure_export(export_format):
+    """
+    Parcourt le flux d'export complet
+
+    Returns:
+        dict: Premier octet (ms), durée (ms), taille (Mo) et pic mémoire (Mo)
+    """
+    from services.export_service import export_transactions
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    body, _, _ = export_transactions(BENCH_USER_ID, export_format=export_format, days=DAYS)
+    first_chunk = None
+    size = 0
+    for chunk in body:
+        if first_chunk is None:
+            first_chunk = time.perf_counter()
+        size += len(chunk)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'first_byte_ms': (first_chunk - start) * 1000,
+        'duration_ms': duration * 1000,
+        'size_mb': size / (1024 * 1024),
+        'peak_mb': peak / (1024 * 1024),
+    }
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else DEFAULT_SIZES
+
+    app = get_bench_app()
+    with app.test_request_context():
+        for size in sizes:
+            reset_bench_data()
+            seed_transactions(size, years=5)
+
+            print(f"=== {size} lignes ===")
+            for export_format in ('csv', 'xlsx'):
+                result = measure_export(export_format)
+                throughput = result['size_mb'] / (result['duration_ms'] / 1000)
+                print(f"{export_format:>5}: premier octet {result['first_byte_ms']:.1f} ms, "
+                      f"total {result['duration_ms']:.0f} ms, {result['size_mb']:.1f} Mo "
+                      f"({throughput:.1f} Mo/s), pic {result['peak_mb']:.1f} Mo")
+
+        reset_bench_data()
+
+
+if __name__ == '__main__':
+    main()
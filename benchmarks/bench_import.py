@@ -0,0 +1,85 @@
+"""
+Benchmark de l'import de relevés (services/import_service.py) : un relevé
+CSV de N lignes importé dans une base vide, puis réimporté (toutes les
+lignes déjà connues, ignorées grâce à l'empreinte).
+
+Pour chaque passe : durée et débit en lignes par seconde. Le pic mémoire
+(tracemalloc), qui doit rester constant quelle que soit la taille du
+fichier, est relevé sur un import supplémentaire : tracemalloc ralentit
+trop l'exécution pour mesurer les durées en même temps.
+
+Usage:
+    python benchmarks/bench_import.py [10000,100000,1000000]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from common import get_bench_app, reset_bench_data, BENCH_USER_ID
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+MERCHANTS = ['CARTE CARREFOUR', 'PRLV EDF', 'CB SNCF', 'VIR SALAIRE', 'CARTE BOULANGERIE']
+
+
+def write_statement(path, count, seed=42):
+    """Écrit un relevé CSV au format d'une banque française, trié par date"""
+    rng = random.Random(seed)
+    day = date.today() - timedelta(days=count // 20)
+    with open(path, 'w', encoding='cp1252', newline='') as statement:
+        statement.write("Date de l'opération;Libellé;Débit;Crédit\r\n")
+        for i in range(count):
+            if i % 20 == 0:
+                day += timedelta(days=1)
+            amount = f"{rng.uniform(1, 500):.2f}".replace('.', ',')
+            debit, credit = (amount, '') if rng.random() < 0.9 else ('', amount)
+            statement.write(f"{day:%d/%m/%Y};{rng.choice(MERCHANTS)} {i % 7};{debit};{credit}\r\n")
+
+
+def import_statement(path):
+    """Importe le relevé pour l'utilisateur de benchmark"""
+    from services.import_service import import_transactions
+
+    with open(path, 'rb') as stream:
+        return import_transactions(BENCH_USER_ID, stream, 'csv')
+
+
+def measure_peak(fn):
+    """Retourne le pic mémoire (Mo) d'un appel"""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else DEFAULT_SIZES
+    path = os.path.join(tempfile.gettempdir(), 'cashsense_bench_import.csv')
+
+    app = get_bench_app()
+    with app.app_context():
+        for size in sizes:
+            reset_bench_data()
+            write_statement(path, size)
+
+            print(f"=== {size} lignes ({os.path.getsize(path) / (1024 * 1024):.1f} Mo) ===")
+            for label in ('import', 'réimport'):
+                start = time.perf_counter()
+                job = import_statement(path)
+                duration = time.perf_counter() - start
+                print(f"{label:>9}: {duration * 1000:.0f} ms ({size / duration:.0f} lignes/s), "
+                      f"{job['inserted']} insérées, {job['duplicates']} ignorées, {job['failed']} en erreur")
+
+            reset_bench_data()
+            print(f"{'pic':>9}: {measure_peak(lambda: import_statement(path)):.1f} Mo")
+
+        reset_bench_data()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Lecture des transactions : instances ORM + to_dict() contre lecture Core des
+seules colonnes de la forme API.
+
+Mesure le temps CPU et le pic d'allocations (tracemalloc), ramenés à 10 000
+lignes.
+
+Usage:
+    python benchmarks/bench_read_path.py [nombre_de_lignes]
+"""
+import sys
+import time
+import tracemalloc
+
+from common import get_bench_app, reset_bench_data, seed_transactions, BENCH_USER_ID
+
+DAYS = 5 * 365
+REPEAT = 5
+
+
+def cpu_time(fn):
+    """Temps CPU minimal (ms) sur REPEAT appels"""
+    durations = []
+    for _ in range(REPEAT):
+        start = time.process_time()
+        fn()
+        durations.append((time.process_time() - start) * 1000)
+    return min(durations)
+
+
+def peak_allocations(fn):
+    """Pic d'allocations (Mo) pendant un appel"""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    app = get_bench_app()
+    from db_models import db, Transaction
+    from services.transaction_service import get_stored_transactions
+
+    def orm_path():
+        transactions = Transaction.query.filter(
+            Transaction.userId == BENCH_USER_ID,
+            Transaction.isManual == True  # noqa: E712
+        ).order_by(Transaction.txDate.desc()).all()
+        result = [tx.to_dict() for tx in transactions]
+        db.session.expunge_all()
+        return result
+
+    def core_path():
+        return get_stored_transactions(BENCH_USER_ID, DAYS, is_manual=True)
+
+    with app.app_context():
+        reset_bench_data()
+        seed_transactions(count)
+        rows = len(core_path())
+        assert rows == len(orm_path())
+
+        print(f"{rows} lignes lues (valeurs ramenées à 10 000 lignes)")
+        for label, fn in [('ORM', orm_path), ('Core', core_path)]:
+            cpu_ms = cpu_time(fn) * 10_000 / rows
+            peak_mb = peak_allocations(fn) * 10_000 / rows
+            print(f"{label:>5}: {cpu_ms:7.1f} ms CPU, pic {peak_mb:6.2f} Mo")
+
+        reset_bench_data()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Temps de sérialisation et taille sur le réseau des réponses de transactions.
+
+Compare le json de la bibliothèque standard, avec les réglages par défaut de
+Flask (clés triées, ASCII échappé), au backend de utils.serialization, puis
+mesure le coût et le gain de la compression gzip/deflate.
+
+Usage:
+    python benchmarks/bench_serialization.py [taille1 taille2 ...]
+"""
+import json
+import random
+import sys
+
+from common import timed
+from utils.compression import compress_body
+from utils.serialization import BACKEND, dumps
+
+MERCHANTS = ['Carrefour', 'Air France', 'SNCF', 'Fnac', 'Café de Flore', 'Leroy Merlin']
+CATEGORIES = [('foodAndDrink', 'groceries'), ('travel', 'hotels'), ('shopping', 'clothing'), ('income', 'salary')]
+
+
+def make_transactions(count, seed=42):
+    """Construit des transactions au format API (sortie de Transaction.to_dict)"""
+    rng = random.Random(seed)
+    transactions = []
+    for i in range(count):
+        category, subcategory = rng.choice(CATEGORIES)
+        transactions.append({
+            "id": f"tx_{i:032x}",
+            "date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "amount": round(rng.uniform(-200, 200), 2),
+            "merchant_name": rng.choice(MERCHANTS),
+            "payment_channel": "online",
+            "pending": False,
+            "category": {"id": category, "subcategory": {"id": subcategory}},
+            "is_test_data": False,
+            "is_manual": True,
+        })
+    return transactions
+
+
+def flask_default_dumps(obj):
+    """Sérialisation équivalente au DefaultJSONProvider de Flask"""
+    return json.dumps(obj, sort_keys=True, ensure_ascii=True, separators=(',', ':')).encode('utf-8')
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+    print(f"Backend de utils.serialization: {BACKEND}")
+    for count in sizes:
+        payload = {"transactions": make_transactions(count)}
+        print(f"\n{count} transactions")
+
+        for label, fn in (('json (Flask)', flask_default_dumps), (f'{BACKEND}', dumps)):
+            timing = timed(lambda: fn(payload))
+            print(f"  {label:>14}: {timing['median_ms']:8.1f} ms, {len(fn(payload)):>11,} octets")
+
+        body = dumps(payload)
+        for encoding in ('gzip', 'deflate'):
+            for level in (1, 6):
+                timing = timed(lambda: compress_body(body, encoding, level))
+                compressed = len(compress_body(body, encoding, level))
+                print(f"  {encoding:>7} niv. {level}: {timing['median_ms']:8.1f} ms, {compressed:>11,} octets "
+                      f"({compressed / len(body):.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Coût du démarrage : import de app.py, create_app() et première requête,
+chaque mesure dans un processus Python neuf (comme un worker ou une commande).
+
+Vérifie aussi un budget d'import relevé par `python -X importtime` : le
+temps propre aux modules du projet (hors Flask, SQLAlchemy...) et le total.
+Le script échoue (code 1) si un budget est dépassé.
+
+Usage:
+    python benchmarks/bench_startup.py [budget_projet_ms] [budget_total_ms]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import ROOT_PATH, BENCH_USER_ID, get_bench_app, reset_bench_data
+
+DEFAULT_PROJECT_BUDGET_MS = 150
+DEFAULT_TOTAL_BUDGET_MS = 1500
+REPEAT = 5
+
+# Modules du projet (le reste de l'arbre d'import vient des dépendances)
+PROJECT_PACKAGES = ('app', 'api', 'services', 'utils', 'db_models', 'migrations', 'config')
+
+# Exécuté dans un processus neuf : durées en millisecondes sur la sortie standard
+STARTUP_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app({{'SQLALCHEMY_DATABASE_URI': {database_url!r}}})
+created = time.perf_counter()
+client = flask_app.test_client()
+client.get('/')
+first = time.perf_counter()
+response = client.get('/api/get_transactions', query_string={{'userId': {user_id!r}, 'days': 30}})
+assert response.status_code == 200, response.status_code
+first_db = time.perf_counter()
+print(json.dumps({{
+    'import': (imported - start) * 1000,
+    'create_app': (created - imported) * 1000,
+    'first_request': (first - created) * 1000,
+    'first_db_request': (first_db - first) * 1000,
+}}))
+"""
+
+
+def measure_startup(database_url):
+    """
+    Returns:
+        dict: Durées (ms) d'un démarrage à froid, par étape
+    """
+    script = STARTUP_SCRIPT.format(root=ROOT_PATH, database_url=database_url, user_id=BENCH_USER_ID)
+    env = dict(os.environ, LOG_LEVEL='WARNING', RESPONSE_CACHE_BACKEND='none')
+    output = subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_profile():
+    """
+    Importe app.py sous `python -X importtime`
+
+    Returns:
+        tuple: (total en ms, temps propre des modules du projet en ms,
+                liste (ms, module) des modules du projet les plus coûteux)
+    """
+    env = dict(os.environ, LOG_LEVEL='WARNING')
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], cwd=ROOT_PATH,
+                            env=env, check=True, capture_output=True, text=True).stderr
+
+    total_us = 0
+    project = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        if name == 'app':
+            total_us = int(cumulative_us)
+        if name.split('.')[0] in PROJECT_PACKAGES:
+            project.append((int(self_us) / 1000, name))
+
+    project.sort(reverse=True)
+    return total_us / 1000, sum(ms for ms, _ in project), project[:10]
+
+
+def main():
+    project_budget = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PROJECT_BUDGET_MS
+    total_budget = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_TOTAL_BUDGET_MS
+
+    # Base prête (tables et utilisateur) : seul le démarrage est mesuré
+    app = get_bench_app()
+    with app.app_context():
+        reset_bench_data()
+    database_url = app.config['SQLALCHEMY_DATABASE_URI']
+
+    runs = [measure_startup(database_url) for _ in range(REPEAT)]
+    print(f"=== Démarrage à froid ({REPEAT} processus) ===")
+    for step in ('import', 'create_app', 'first_request', 'first_db_request'):
+        durations = [run[step] for run in runs]
+        print(f"{step:>17}: min {min(durations):.1f} ms, médiane {statistics.median(durations):.1f} ms")
+    totals = [sum(run.values()) for run in runs]
+    print(f"{'première réponse':>17}: médiane {statistics.median(totals):.1f} ms (import compris)")
+
+    total_ms, project_ms, top = import_profile()
+    print("=== python -X importtime ===")
+    print(f"Import de app.py: {total_ms:.1f} ms (budget {total_budget:.0f} ms)")
+    print(f"Modules du projet (temps propre): {project_ms:.1f} ms (budget {project_budget:.0f} ms)")
+    for ms, name in top:
+        print(f"{ms:>8.1f} ms  {name}")
+
+    if total_ms > total_budget or project_ms > project_budget:
+        print("Budget d'import dépassé")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark de get_stored_transactions : plan d'exécution et latence.
+
+Usage:
+    python benchmarks/bench_stored_transactions.py [10000,1000000,10000000]
+"""
+import sys
+from datetime import datetime, timedelta
+
+from common import get_bench_app, reset_bench_data, seed_transactions, timed, explain, BENCH_USER_ID
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else DEFAULT_SIZES
+
+    app = get_bench_app()
+    from db_models import db, Transaction
+    from services.transaction_service import get_stored_transactions
+
+    with app.app_context():
+        for size in sizes:
+            reset_bench_data()
+            seed_transactions(size)
+
+            min_date = (datetime.now() - timedelta(days=30)).date()
+            statement = (
+                db.select(Transaction)
+                .where(Transaction.userId == BENCH_USER_ID,
+                       Transaction.txDate >= min_date,
+                       Transaction.isManual == True)  # noqa: E712
+                .order_by(Transaction.txDate.desc())
+            )
+
+            print(f"=== {size} lignes ===")
+            print(explain(statement))
+            for days, limit in [(30, None), (365, None), (365, 100)]:
+                stats = timed(lambda: get_stored_transactions(BENCH_USER_ID, days, is_manual=True, limit=limit))
+                print(f"days={days} limit={limit}: min {stats['min_ms']:.1f} ms, "
+                      f"médiane {stats['median_ms']:.1f} ms")
+
+        reset_bench_data()
+
+
+if __name__ == '__main__':
+    main()
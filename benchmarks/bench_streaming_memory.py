@@ -0,0 +1,57 @@
+"""
+Benchmark mémoire : réponse JSON complète (jsonify) contre réponse en streaming.
+
+Usage:
+    python benchmarks/bench_streaming_memory.py [10000,100000,1000000]
+"""
+import sys
+import time
+import tracemalloc
+
+from common import get_bench_app, reset_bench_data, seed_transactions, BENCH_USER_ID
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DAYS = 5 * 365
+
+
+def measure(fn):
+    """Retourne (pic mémoire en Mo, durée en ms) d'un appel"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    duration = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024), duration
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else DEFAULT_SIZES
+
+    app = get_bench_app()
+    from flask import jsonify
+    from services.transaction_service import get_transactions, iter_transactions
+    from api.transaction_routes import _stream_transactions_json
+
+    def full_response():
+        response = jsonify({"transactions": get_transactions(BENCH_USER_ID, DAYS)})
+        return len(response.get_data())
+
+    def streamed_response():
+        return sum(len(chunk) for chunk in _stream_transactions_json(iter_transactions(BENCH_USER_ID, DAYS)))
+
+    with app.test_request_context():
+        for size in sizes:
+            reset_bench_data()
+            seed_transactions(size)
+
+            print(f"=== {size} lignes ===")
+            for label, fn in [('jsonify', full_response), ('streaming', streamed_response)]:
+                peak_mb, duration_ms = measure(fn)
+                print(f"{label:>10}: pic {peak_mb:.1f} Mo, {duration_ms:.0f} ms")
+
+        reset_bench_data()
+
+
+if __name__ == '__main__':
+    main()
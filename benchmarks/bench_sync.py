@@ -0,0 +1,79 @@
+"""
+Benchmark de la synchronisation incrémentale (POST /api/sync) face à la
+relecture de toute la fenêtre (get_transactions).
+
+Pour chaque taille : relecture complète sur 5 ans, première synchronisation
+(toutes les pages), puis synchronisation après la modification de quelques
+transactions. Durée et volume JSON de chaque réponse ; le coût d'une
+synchronisation incrémentale ne doit pas dépendre du nombre de transactions.
+
+Usage:
+    python benchmarks/bench_sync.py [10000,100000,1000000]
+"""
+import sys
+import time
+
+from common import get_bench_app, reset_bench_data, seed_transactions, BENCH_USER_ID
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DAYS = 5 * 365
+CHANGED = 20
+PAGE_SIZE = 1000
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else DEFAULT_SIZES
+
+    app = get_bench_app()
+    from datetime import datetime
+    from db_models import db, Transaction
+    from services.change_sequence import next_change_seq
+    from services.sync_service import get_transaction_changes
+    from services.transaction_service import get_transactions
+    from utils.serialization import dumps
+
+    def timed_size(fn):
+        start = time.perf_counter()
+        size = len(dumps(fn()))
+        return (time.perf_counter() - start) * 1000, size / 1024
+
+    with app.app_context():
+        for size in sizes:
+            reset_bench_data()
+            seed_transactions(size)
+
+            print(f"=== {size} lignes ===")
+            duration, kilobytes = timed_size(lambda: {"transactions": get_transactions(BENCH_USER_ID, DAYS)})
+            print(f"{'fenêtre complète':>22}: {duration:.0f} ms, {kilobytes:.0f} Ko")
+
+            start = time.perf_counter()
+            cursor, pages, total_kb = None, 0, 0
+            while True:
+                page = get_transaction_changes(BENCH_USER_ID, cursor, PAGE_SIZE)
+                total_kb += len(dumps(page)) / 1024
+                cursor, pages = page["next_cursor"], pages + 1
+                if not page["has_more"]:
+                    break
+            print(f"{'première synchro':>22}: {(time.perf_counter() - start) * 1000:.0f} ms, "
+                  f"{total_kb:.0f} Ko en {pages} page(s)")
+
+            # Modifier quelques transactions manuelles (celles du mode prod)
+            ids = db.session.scalars(
+                db.select(Transaction.id).where(
+                    Transaction.userId == BENCH_USER_ID,
+                    Transaction.isManual == True  # noqa: E712
+                ).limit(CHANGED)
+            ).all()
+            db.session.execute(db.update(Transaction).where(Transaction.id.in_(ids)).values(
+                pending=True, updatedAt=datetime.utcnow(), changeSeq=next_change_seq(BENCH_USER_ID)
+            ))
+            db.session.commit()
+
+            duration, kilobytes = timed_size(lambda: get_transaction_changes(BENCH_USER_ID, cursor, PAGE_SIZE))
+            print(f"{f'synchro ({CHANGED} modifiées)':>22}: {duration:.1f} ms, {kilobytes:.1f} Ko")
+
+        reset_bench_data()
+
+
+if __name__ == '__main__':
+    main()
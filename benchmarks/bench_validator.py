@@ -0,0 +1,76 @@
+"""
+Microbenchmark du validateur compilé contre l'ancien parcours du schéma.
+
+Usage:
+    python benchmarks/bench_validator.py [nombre_de_transactions]
+"""
+import sys
+import timeit
+
+import common  # noqa: F401  (ajoute la racine du projet au sys.path)
+from utils.schema_loader import get_categories_schema, get_transaction_schema
+from utils.transaction_validator import format_transaction, validate_transactions
+
+TRANSACTION_SCHEMA = get_transaction_schema()
+CATEGORIES_SCHEMA = get_categories_schema()
+
+
+def legacy_format_transaction(transaction):
+    """Ancien validateur, conservé pour comparaison"""
+    if not isinstance(transaction, dict):
+        raise Exception("La transaction doit être un dictionnaire")
+
+    for field, expected_type in TRANSACTION_SCHEMA.items():
+        if field not in transaction:
+            raise Exception(f"Schéma non respecté: champ '{field}' requis par TRANSACTION_SCHEMA est manquant")
+
+        if expected_type == "string" and not isinstance(transaction[field], str):
+            raise Exception(f"Schéma non respecté: '{field}' doit être une chaîne de caractères")
+        elif expected_type == "number" and not isinstance(transaction[field], (int, float)):
+            raise Exception(f"Schéma non respecté: '{field}' doit être un nombre")
+        elif expected_type == "boolean" and not isinstance(transaction[field], bool):
+            raise Exception(f"Schéma non respecté: '{field}' doit être un booléen")
+        elif expected_type == "object" and field == "category":
+            cat = transaction["category"]
+            if not isinstance(cat, dict) or "id" not in cat:
+                raise Exception("Schéma non respecté: 'category' doit être un dict avec un champ 'id'")
+            if cat["id"] not in CATEGORIES_SCHEMA:
+                raise Exception(f"Schéma non respecté: catégorie '{cat['id']}' inconnue dans CATEGORIES_SCHEMA")
+            if "subcategory" not in cat or not isinstance(cat["subcategory"], dict) or "id" not in cat["subcategory"]:
+                raise Exception("Schéma non respecté: manque 'subcategory' avec 'id' dans 'category'")
+            subcat_id = cat["subcategory"]["id"]
+            if subcat_id != "unknown" and (
+                "subcategories" not in CATEGORIES_SCHEMA[cat["id"]] or
+                subcat_id not in CATEGORIES_SCHEMA[cat["id"]]["subcategories"]
+            ):
+                raise Exception(f"Schéma non respecté: sous-catégorie '{subcat_id}' inconnue pour catégorie '{cat['id']}'")
+
+    return transaction
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    transactions = [{
+        "id": f"tx_{i}",
+        "date": "2025-05-01",
+        "merchant_name": "Carrefour",
+        "amount": 52.30,
+        "category": {"id": "foodAndDrink", "subcategory": {"id": "groceries"}},
+        "payment_channel": "in store",
+        "pending": False,
+        "is_test_data": False,
+    } for i in range(count)]
+
+    candidates = [
+        ('ancien', lambda: [legacy_format_transaction(tx) for tx in transactions]),
+        ('compilé', lambda: [format_transaction(tx) for tx in transactions]),
+        ('lot', lambda: validate_transactions(transactions)),
+    ]
+    for label, fn in candidates:
+        duration = min(timeit.repeat(fn, number=1, repeat=5))
+        print(f"{label:>8}: {duration * 1000:.1f} ms pour {count} transactions "
+              f"({duration / count * 1e9:.0f} ns/transaction)")
+
+
+if __name__ == '__main__':
+    main()
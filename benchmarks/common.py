@@ -0,0 +1,136 @@
+"""
+Outils partagés par les scripts de benchmark.
+
+Les benchmarks tournent sur une base SQLite temporaire par défaut. Pour
+mesurer sur PostgreSQL, définir BENCH_DATABASE_URL avant de lancer le script.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_PATH not in sys.path:
+    sys.path.insert(0, ROOT_PATH)
+
+BENCH_USER_ID = 'bench-user'
+
+
+def get_bench_app():
+    """
+    Construit l'application Flask sur la base de benchmark, tables créées
+
+    Returns:
+        Flask: L'application configurée
+    """
+    database_url = os.getenv('BENCH_DATABASE_URL')
+    if not database_url:
+        db_path = os.path.join(tempfile.gettempdir(), 'cashsense_bench.db')
+        database_url = f'sqlite:///{db_path}'
+
+    from app import create_app
+    from migrations import initialize_database
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_url})
+    with app.app_context():
+        initialize_database()
+    return app
+
+
+def reset_bench_data(user_id=BENCH_USER_ID):
+    """Supprime les données de l'utilisateur de benchmark et crée l'utilisateur"""
+    from db_models import (
+        db, User, Transaction, MonthlyCategoryTotal, ImportJob, TransactionTombstone, ChangeSequence
+    )
+
+    for model in (Transaction, MonthlyCategoryTotal, ImportJob, TransactionTombstone, ChangeSequence):
+        db.session.execute(db.delete(model).where(model.userId == user_id))
+    if db.session.get(User, user_id) is None:
+        db.session.add(User(id=user_id, name='Benchmark'))
+    db.session.commit()
+
+
+def seed_transactions(count, user_id=BENCH_USER_ID, years=5, chunk_size=50000, seed=42):
+    """
+    Insère rapidement des transactions synthétiques pour un utilisateur
+
+    Args:
+        count (int): Nombre de transactions à insérer
+        user_id (str): Identifiant de l'utilisateur
+        years (int): Profondeur d'historique en années
+        chunk_size (int): Nombre de lignes par INSERT multi-lignes
+        seed (int): Graine du générateur aléatoire
+    """
+    from db_models import db, Transaction
+    from utils.category_registry import encode_category
+    from services.change_sequence import next_change_seq
+
+    rng = random.Random(seed)
+    today = date.today()
+    span = years * 365
+    categories = [('foodAndDrink', 'groceries'), ('shopping', 'clothing'),
+                  ('transport', 'taxi'), ('income', 'salary')]
+    table = Transaction.__table__
+
+    for start in range(0, count, chunk_size):
+        rows = []
+        change_seq = next_change_seq(user_id)
+        for i in range(start, min(start + chunk_size, count)):
+            category, subcategory = rng.choice(categories)
+            tx_date = today - timedelta(days=rng.randrange(span))
+            amount = round(rng.uniform(-200, 200), 2)
+            rows.append({
+                'id': f'bench_{i:09d}',
+                'userId': user_id,
+                'txDate': tx_date,
+                'merchantName': 'Benchmark',
+                'amountCents': round(amount * 100),
+                'paymentChannel': 'online',
+                'pending': False,
+                'categoryCode': encode_category(category, subcategory),
+                'isTestData': i % 2 == 0,
+                'isManual': i % 2 == 1,
+                'changeSeq': change_seq,
+            })
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+
+
+def timed(fn, repeat=5):
+    """
+    Exécute une fonction plusieurs fois et mesure sa durée
+
+    Returns:
+        dict: Durées minimale et médiane en millisecondes
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return {'min_ms': min(durations), 'median_ms': statistics.median(durations)}
+
+
+def explain(statement):
+    """
+    Retourne le plan d'exécution d'une requête selon le dialecte
+
+    Args:
+        statement: Requête SQLAlchemy (select)
+
+    Returns:
+        str: Plan d'exécution lisible
+    """
+    from db_models import db
+
+    dialect = db.engine.dialect
+    compiled = statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+    if dialect.name == 'postgresql':
+        rows = db.session.execute(db.text(f'EXPLAIN (ANALYZE, BUFFERS) {compiled}'))
+        return '\n'.join(row[0] for row in rows)
+
+    rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}'))
+    return '\n'.join(str(row[-1]) for row in rows)
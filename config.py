@@ -8,4 +8,98 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Configuration de la base de données
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///cashsense.db")
\ No newline at end of file
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///cashsense.db")
+
+# Cache des vérifications d'existence des utilisateurs (par processus). Une
+# suppression n'est invalidée que dans le worker qui l'a faite : les autres
+# workers acceptent l'utilisateur supprimé jusqu'à USER_CACHE_TTL secondes
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+# Durée de vie plus courte pour les utilisateurs introuvables (inscription récente)
+USER_CACHE_NEGATIVE_TTL = float(os.getenv("USER_CACHE_NEGATIVE_TTL", "5"))
+
+# Cache des réponses de lecture des transactions
+# 'local' : fichier SQLite partagé par tous les workers gunicorn de la machine
+# 'memory' : cache en mémoire du processus (un seul worker)
+# 'none' : désactivé
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "local")
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Fichier du cache 'local'. Vide par défaut : un fichier du répertoire
+# temporaire propre à la base de données et à l'instance de l'application,
+# pour que deux déploiements d'une même machine ne partagent pas leurs versions
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "")
+# Précision (en secondes) de la date de dernière lecture du cache 'local' :
+# une entrée lue n'est réécrite qu'une fois par intervalle, pas à chaque lecture
+RESPONSE_CACHE_ACCESS_RESOLUTION = float(os.getenv("RESPONSE_CACHE_ACCESS_RESOLUTION", "60"))
+
+# Sérialisation JSON des réponses
+# 'auto' : orjson s'il est installé, sinon json de la bibliothèque standard
+JSON_SERIALIZER = os.getenv("JSON_SERIALIZER", "auto")
+
+# Compression gzip/deflate des réponses (taille minimale en octets, niveau 1 à 9)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+
+# En-tête Server-Timing (temps SQL, sérialisation et total) sur chaque réponse.
+# Désactivé par défaut : il révèle le coût des requêtes à tout client.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+
+# Jeton exigé par GET /metrics et /metrics/pool (en-tête "Authorization:
+# Bearer <jeton>"). Vide par défaut : les métriques sont alors désactivées
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Création des tables et migrations au démarrage de l'application. Désactivé
+# par défaut : le schéma est géré par la commande `flask --app app init-db`
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() == "true"
+
+# Écriture des anciennes colonnes de Transaction (date, amount, category,
+# subcategory) tant qu'elles existent, pour les workers de la version
+# précédente pendant un déploiement progressif. À passer à false sur tous
+# les workers avant `flask --app app db-contract`, qui les supprime
+LEGACY_TRANSACTION_WRITES = os.getenv("LEGACY_TRANSACTION_WRITES", "true").lower() == "true"
+
+# Journalisation (voir utils/structured_logging.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# 'json' : une ligne JSON par enregistrement ; 'text' : lisible en développement
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Enregistrements en attente d'écriture au-delà desquels ils sont abandonnés
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Fraction gardée par logger sous WARNING, ex. "services.transaction_service=0.01"
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+# Import de relevés bancaires : lignes validées et commitées par paquet
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+# Synchronisation incrémentale (voir services/sync_service.py)
+# Conservation des suppressions ; un curseur qui n'a pas lu les suppressions
+# purgées repart de zéro
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", "90"))
+
+# Données du mode démo
+# 'stored' : transactions de démo générées puis stockées dans la table Transaction
+# 'lazy' : générées à la volée (graine par utilisateur et par mois), seules les
+#          transactions de démo saisies manuellement sont stockées
+DEMO_ENGINE = os.getenv("DEMO_ENGINE", "stored")
+# Sel des graines du moteur 'lazy' (le changer renouvelle les données de tous les utilisateurs)
+DEMO_SEED = os.getenv("DEMO_SEED", "cashsense-demo")
+# Nombre de mois générés gardés en mémoire (LRU, par processus)
+DEMO_CACHE_MONTHS = int(os.getenv("DEMO_CACHE_MONTHS", "2048"))
+
+# Serveur gunicorn (lu par gunicorn_config.py, sert aussi à dimensionner le pool)
+GUNICORN_WORKERS = int(os.getenv("GUNICORN_WORKERS", "4"))
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "2"))
+
+# Pool de connexions, par worker : une connexion par thread, plus un débordement
+# pour les connexions ouvertes hors session (registre des catégories)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(GUNICORN_THREADS)))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(GUNICORN_THREADS)))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))  # secondes entières (engine_from_config)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Durée maximale d'une requête SQL sur PostgreSQL (0 pour désactiver)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+
+# Pragmas appliqués à chaque connexion SQLite (développement)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
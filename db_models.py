@@ -28,37 +28,297 @@ class Transaction(db.Model):
     __tablename__ = 'Transaction'
     
     id = db.Column(db.String(36), primary_key=True)
-    date = db.Column(db.String(10), nullable=False)
     merchantName = db.Column(db.String(100))
-    amount = db.Column(db.Float, nullable=False)
+    # Date native et montant exact en centimes (remplacent les anciennes
+    # colonnes date et amount, retirées par les migrations)
+    txDate = db.Column(db.Date, nullable=False)
+    amountCents = db.Column(db.BigInteger, nullable=False)
     paymentChannel = db.Column(db.String(50))
     pending = db.Column(db.Boolean, default=False)
     
     userId = db.Column(db.String(36), db.ForeignKey('User.id'), nullable=False)
-    category = db.Column(db.String(100))
-    subcategory = db.Column(db.String(100))
+    # Code de la paire (catégorie, sous-catégorie) dans la table Category
+    # (remplace les anciennes colonnes category et subcategory, retirées par
+    # les migrations)
+    categoryCode = db.Column(db.SmallInteger, nullable=False)
     
     isTestData = db.Column(db.Boolean, default=False)
     isManual = db.Column(db.Boolean, default=False)
     
+    # Empreinte du contenu (date, montant, libellé) des transactions importées
+    # depuis un relevé bancaire, pour ignorer les lignes déjà importées
+    importHash = db.Column(db.String(32))
+    
     createdAt = db.Column(db.DateTime, default=datetime.utcnow)
     updatedAt = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Numéro de la dernière écriture de la ligne dans la séquence de
+    # l'utilisateur (voir services/change_sequence.py), lu par la synchronisation
+    changeSeq = db.Column(db.BigInteger, nullable=False)
+    
+    __table_args__ = (
+        # Lecture d'une fenêtre de dates pour un utilisateur (tri par date décroissante)
+        db.Index('ix_Transaction_user_txdate', userId, txDate.desc(), isManual, isTestData),
+        # Filtres d'égalité sur le type de transaction puis plage de dates,
+        # avec l'id en dernière clé pour la pagination keyset sur (txDate, id)
+        db.Index('ix_Transaction_user_flags_txdate', userId, isManual, isTestData, txDate.desc(), id.desc()),
+        # Déduplication des imports (les transactions saisies ont une empreinte NULL)
+        db.Index('ix_Transaction_user_import_hash', userId, importHash, unique=True),
+        # Synchronisation incrémentale : modifications depuis un curseur (changeSeq, id)
+        db.Index('ix_Transaction_user_change_seq', userId, changeSeq, id),
+    )
     
     def to_dict(self):
         """Convertit le modèle en dictionnaire pour l'API"""
-        return {
-            "id": self.id,
-            "date": self.date,
-            "amount": self.amount,
-            "merchant_name": self.merchantName,
-            "payment_channel": self.paymentChannel or ("online" if self.amount < 0 else "in store"),
-            "pending": self.pending,
+        return transaction_to_api(self)
+
+
+def transaction_to_api(row):
+    """
+    Convertit une transaction en dictionnaire pour l'API
+    
+    Accepte aussi bien une instance du modèle qu'une ligne SQLAlchemy Core
+    (par exemple renvoyée par INSERT ... RETURNING) exposant les mêmes colonnes.
+    """
+    from utils.category_registry import decode_category
+    
+    category, subcategory = decode_category(row.categoryCode)
+    return {
+        "id": row.id,
+        "date": row.txDate.isoformat(),
+        "amount": row.amountCents / 100,
+        "merchant_name": row.merchantName,
+        "payment_channel": row.paymentChannel or ("online" if row.amountCents < 0 else "in store"),
+        "pending": row.pending,
+        "category": {
+            "id": category,
+            "subcategory": {
+                "id": subcategory
+            }
+        },
+        "is_test_data": row.isTestData,
+        "is_manual": row.isManual
+    }
+
+
+# Colonnes lues pour construire la forme API d'une transaction, dans l'ordre
+# attendu par transactions_to_api
+TRANSACTION_API_COLUMNS = (
+    Transaction.id,
+    Transaction.txDate,
+    Transaction.amountCents,
+    Transaction.merchantName,
+    Transaction.paymentChannel,
+    Transaction.pending,
+    Transaction.categoryCode,
+    Transaction.isTestData,
+    Transaction.isManual,
+)
+
+
+def transactions_to_api(rows):
+    """
+    Convertit des lignes Core sélectionnant TRANSACTION_API_COLUMNS en dictionnaires pour l'API
+    
+    Équivalent de transaction_to_api appliqué à chaque ligne, sans accès par
+    attribut : chaque ligne est dépaquetée comme un tuple. La date, le
+    montant en centimes et le code de catégorie sont reconvertis au format
+    de l'API (YYYY-MM-DD, décimal, identifiants de catégorie).
+    
+    Args:
+        rows: Itérable de lignes (tuples) dans l'ordre de TRANSACTION_API_COLUMNS
+        
+    Returns:
+        list: Transactions au format API
+    """
+    from utils.category_registry import get_category_registry, decode_category
+    
+    decode = get_category_registry().decode
+    transactions = []
+    append = transactions.append
+    for (tx_id, tx_date, amount_cents, merchant_name, payment_channel, pending,
+         category_code, is_test_data, is_manual) in rows:
+        category, subcategory = decode(category_code) or decode_category(category_code)
+        append({
+            "id": tx_id,
+            "date": tx_date.isoformat(),
+            "amount": amount_cents / 100,
+            "merchant_name": merchant_name,
+            "payment_channel": payment_channel or ("online" if amount_cents < 0 else "in store"),
+            "pending": pending,
             "category": {
-                "id": self.category,
+                "id": category,
                 "subcategory": {
-                    "id": self.subcategory
+                    "id": subcategory
                 }
             },
-            "is_test_data": self.isTestData,
-            "is_manual": self.isManual
-        }
\ No newline at end of file
+            "is_test_data": is_test_data,
+            "is_manual": is_manual
+        })
+    return transactions
+
+
+class TransactionTombstone(db.Model):
+    """
+    Trace d'une transaction supprimée, renvoyée par la synchronisation
+    incrémentale (voir services/sync_service.py) aux clients qui l'avaient reçue
+    
+    Purgée après SYNC_TOMBSTONE_RETENTION_DAYS : un client dont la dernière
+    synchronisation est plus ancienne repart d'une synchronisation complète.
+    """
+    __tablename__ = 'TransactionTombstone'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    userId = db.Column(db.String(36), nullable=False)
+    transactionId = db.Column(db.String(36), nullable=False)
+    # Type de la transaction supprimée, pour ne renvoyer que celles du mode actuel
+    isTestData = db.Column(db.Boolean, nullable=False)
+    isManual = db.Column(db.Boolean, nullable=False)
+    deletedAt = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Numéro de la suppression dans la séquence de l'utilisateur
+    changeSeq = db.Column(db.BigInteger, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_TransactionTombstone_user_change_seq', userId, changeSeq, id),
+    )
+
+
+class ChangeSequence(db.Model):
+    """
+    Compteur des écritures sur les transactions de chaque utilisateur
+    (voir services/change_sequence.py)
+    """
+    __tablename__ = 'ChangeSequence'
+    
+    userId = db.Column(db.String(36), primary_key=True)
+    # Dernier numéro attribué
+    lastSeq = db.Column(db.BigInteger, nullable=False, default=0)
+    # Dernier numéro dont les traces de suppression ont été purgées : un
+    # curseur resté en deçà a manqué des suppressions
+    purgedSeq = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class MonthlyCategoryTotal(db.Model):
+    """
+    Cumul mensuel des transactions par catégorie, maintenu à chaque écriture
+    pour que les analyses ne parcourent pas toutes les transactions
+    """
+    __tablename__ = 'MonthlyCategoryTotal'
+    
+    userId = db.Column(db.String(36), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM
+    categoryCode = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    # Mêmes drapeaux que les transactions : chaque mode filtre le cumul
+    # avec le même prédicat que les transactions (analysis_service.mode_filter)
+    isTestData = db.Column(db.Boolean, primary_key=True)
+    isManual = db.Column(db.Boolean, primary_key=True)
+    
+    # Montants exacts en centimes : les cumuls ne dérivent pas au fil des deltas
+    incomeCents = db.Column(db.BigInteger, nullable=False, default=0)
+    expensesCents = db.Column(db.BigInteger, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    updatedAt = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Category(db.Model):
+    """
+    Codes des paires (catégorie, sous-catégorie), référence partagée par tous les processus
+    """
+    __tablename__ = 'Category'
+    
+    code = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    category = db.Column(db.String(100), nullable=False)
+    subcategory = db.Column(db.String(100), nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('category', 'subcategory', name='uq_Category_pair'),
+    )
+
+
+class DemoGeneration(db.Model):
+    """
+    Marqueur de génération des données de démo stockées d'un utilisateur
+    
+    Inséré avant les transactions générées, dans la même transaction : la clé
+    primaire garantit qu'un seul processus génère les données d'un utilisateur,
+    et le marqueur disparaît avec elles si la génération échoue.
+    """
+    __tablename__ = 'DemoGeneration'
+    
+    userId = db.Column(db.String(36), primary_key=True)
+    createdAt = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class SchemaMigration(db.Model):
+    """
+    Migrations de données déjà appliquées à la base (une ligne par migration)
+    """
+    __tablename__ = 'SchemaMigration'
+    
+    name = db.Column(db.String(100), primary_key=True)
+    appliedAt = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ImportJob(db.Model):
+    """
+    Import d'un relevé bancaire (CSV ou OFX) et sa progression
+    
+    Mis à jour dans la même transaction que chaque paquet de lignes inséré :
+    après une interruption, l'import reprend à la première ligne non validée.
+    """
+    __tablename__ = 'ImportJob'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    userId = db.Column(db.String(36), db.ForeignKey('User.id'), nullable=False)
+    format = db.Column(db.String(10), nullable=False)
+    fileName = db.Column(db.String(255))
+    amountSign = db.Column(db.String(10), nullable=False, default='bank')
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, completed, rejected, failed
+    
+    # Lignes du fichier traitées (validées en base), puis leur répartition
+    rowsProcessed = db.Column(db.Integer, nullable=False, default=0)
+    inserted = db.Column(db.Integer, nullable=False, default=0)
+    duplicates = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    # Premières erreurs par ligne (JSON) et cause d'un échec de l'import
+    errors = db.Column(db.Text)
+    error = db.Column(db.Text)
+    
+    createdAt = db.Column(db.DateTime, default=datetime.utcnow)
+    updatedAt = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convertit le modèle en dictionnaire pour l'API"""
+        return {
+            "id": self.id,
+            "format": self.format,
+            "file_name": self.fileName,
+            "status": self.status,
+            "rows_processed": self.rowsProcessed,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": json.loads(self.errors) if self.errors else [],
+            "error": self.error,
+            "created_at": self.createdAt.isoformat() if self.createdAt else None,
+            "updated_at": self.updatedAt.isoformat() if self.updatedAt else None
+        }
+
+
+class TransactionQuarantine(db.Model):
+    """
+    Transactions écartées par les migrations faute de pouvoir les convertir
+    (date illisible, montant absent)
+    
+    La ligne d'origine est conservée telle quelle (JSON de toutes ses
+    colonnes) pour être corrigée puis réinsérée à la main : elle n'est plus
+    lue par l'API, qui ne rencontre ainsi jamais de txDate ou amountCents NULL.
+    """
+    __tablename__ = 'TransactionQuarantine'
+    
+    id = db.Column(db.String(36), primary_key=True)
+    userId = db.Column(db.String(36), nullable=False)
+    # Colonnes qui n'ont pas pu être remplies, séparées par des virgules
+    reason = db.Column(db.String(100), nullable=False)
+    data = db.Column(db.Text, nullable=False)
+    quarantinedAt = db.Column(db.DateTime, default=datetime.utcnow)
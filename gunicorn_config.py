@@ -1,11 +1,12 @@
 import os
+from config import GUNICORN_THREADS, GUNICORN_WORKERS
 
 # Bind to the port specified by the environment variable PORT
 port = os.environ.get('PORT', 5000)
 bind = f"0.0.0.0:{port}"
 
-# Number of worker processes
-workers = 4
+# Number of worker processes (GUNICORN_WORKERS, also used to size the DB pool)
+workers = GUNICORN_WORKERS
 
 # Worker timeout in seconds
 timeout = 120
@@ -17,8 +18,31 @@ loglevel = 'info'
 accesslog = '-'  # Log to stdout
 errorlog = '-'   # Log to stderr
 
-# Enable threading
-threads = 2
+# Enable threading (GUNICORN_THREADS: one pooled DB connection per thread)
+threads = GUNICORN_THREADS
 
 # Preload the application
-preload_app = True
\ No newline at end of file
+preload_app = True
+
+
+def post_fork(server, worker):
+    """
+    Drop the DB connections inherited from the master process.
+
+    With preload_app the app is built by create_app() before the fork. It
+    opens no connection unless DB_AUTO_MIGRATE is set, but each worker must
+    never share the master's sockets: close=False leaves any of them to the
+    master. Pool wait statistics start from zero in each worker, and the log
+    writer thread (which does not survive the fork) is restarted.
+    """
+    from db_models import db
+    from utils.db_pool import POOL_STATS
+    from utils.structured_logging import restart_after_fork
+
+    restart_after_fork()
+
+    # The Flask app built by "app:create_app()" (already loaded with preload_app)
+    app = worker.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    POOL_STATS.reset()
\ No newline at end of file
@@ -0,0 +1,880 @@
+"""
+Migrations légères et idempotentes de la base de données.
+
+db.create_all() ne crée que les tables manquantes : les colonnes et index
+ajoutés au modèle après coup ne sont jamais appliqués aux tables existantes.
+Ce module rattrape ce décalage sans dépendre d'un outil de migration externe.
+
+Les changements de type suivent le schéma expand/backfill/switch/contract,
+sans arrêt du service pendant un déploiement progressif :
+- upgrade ajoute la nouvelle colonne (nullable) et la remplit par paquets,
+  chaque paquet dans sa propre transaction pour ne pas bloquer les
+  écritures. Le code déployé écrit les deux colonnes (voir
+  legacy_transaction_columns) ; les lignes écrites entre-temps par les
+  workers de la version précédente, qui ne connaissent que l'ancienne, sont
+  reprises à chaque upgrade ;
+- la contraction (commande db-contract, contract_legacy_columns) n'est
+  jamais lancée par upgrade : une fois tous les workers passés à la
+  nouvelle version et LEGACY_TRANSACTION_WRITES=false déployé, elle rejoue
+  le backfill, le vérifie puis supprime l'ancienne colonne et ses index.
+"""
+from datetime import datetime
+import json
+import logging
+from sqlalchemy import (
+    BigInteger, Date, MetaData, Table, and_, case, cast, column, delete, func, insert, inspect, or_, select,
+    table, text, update
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+from config import LEGACY_TRANSACTION_WRITES
+from db_models import (
+    db, Category, ChangeSequence, Transaction, TransactionQuarantine, TransactionTombstone, MonthlyCategoryTotal,
+    SchemaMigration
+)
+from utils.category_registry import DEFAULT_PAIR, sync_categories
+
+logger = logging.getLogger(__name__)
+
+# Index remplacés par une nouvelle définition, à supprimer des bases existantes
+OBSOLETE_INDEXES = {
+    'Transaction': [
+        'ix_Transaction_user_flags_date',
+        # Remplacés par les index sur la date native txDate
+        'ix_Transaction_user_date',
+        'ix_Transaction_user_flags_keyset',
+        # Remplacé par l'index sur le numéro de modification changeSeq
+        'ix_Transaction_user_updated',
+    ],
+    'TransactionTombstone': [
+        'ix_TransactionTombstone_user_deleted',
+    ],
+}
+
+# Tables entièrement dérivées des transactions : recréées puis reconstruites
+# quand leurs colonnes ne correspondent plus au modèle
+DERIVED_TABLES = [MonthlyCategoryTotal.__table__]
+
+# Nombre de lignes mises à jour par transaction lors d'un backfill
+BACKFILL_CHUNK_SIZE = 5000
+
+# Anciennes colonnes de Transaction, retirées du modèle mais encore présentes
+# (et écrites en parallèle par le code) dans les bases pas encore contractées
+LEGACY_COLUMNS = ('date', 'amount', 'category', 'subcategory')
+
+# Table Transaction avec ses anciennes colonnes (lues par les backfills)
+LEGACY_TRANSACTION = table(
+    'Transaction',
+    column('id'),
+    column('userId'),
+    column('updatedAt'),
+    column('date'),
+    column('amount'),
+    column('category'),
+    column('subcategory'),
+    column('txDate'),
+    column('amountCents'),
+    column('categoryCode'),
+)
+
+# Anciennes colonnes présentes en base, par URL de base (lues une fois par processus)
+_legacy_columns = {}
+
+
+def _column_names(engine, table_name):
+    """Noms des colonnes d'une table telle qu'elle est en base"""
+    return {info['name'] for info in inspect(engine).get_columns(table_name)}
+
+
+def legacy_transaction_columns(engine=None):
+    """
+    Anciennes colonnes de Transaction encore présentes en base
+
+    Lues une seule fois par processus : le code les écrit en parallèle des
+    nouvelles tant qu'elles existent, et contract_legacy_columns oublie le
+    résultat après les avoir supprimées.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        dict: Nom de l'ancienne colonne -> True si elle accepte NULL
+    """
+    engine = engine or db.engine
+    key = str(engine.url)
+    if key not in _legacy_columns:
+        _legacy_columns[key] = {
+            info['name']: info['nullable']
+            for info in inspect(engine).get_columns(Transaction.__tablename__)
+            if info['name'] in LEGACY_COLUMNS
+        }
+    return _legacy_columns[key]
+
+
+def rebuild_outdated_derived_tables(engine=None):
+    """
+    Recrée les tables dérivées dont les colonnes ont changé dans le modèle
+
+    Leur contenu est reconstruit ensuite par ensure_rollup.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Noms des tables recréées
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    rebuilt = []
+
+    for derived in DERIVED_TABLES:
+        if derived.name not in existing_tables:
+            continue
+
+        existing = {info['name'] for info in inspector.get_columns(derived.name)}
+        if existing == {model_column.name for model_column in derived.columns}:
+            continue
+
+        derived.drop(bind=engine)
+        derived.create(bind=engine)
+        logger.info(f"Table dérivée '{derived.name}' recréée")
+        rebuilt.append(derived.name)
+
+    return rebuilt
+
+
+def ensure_columns(engine=None):
+    """
+    Ajoute les colonnes déclarées dans les modèles mais absentes de la base
+
+    Les colonnes sont ajoutées sans contrainte NOT NULL ni valeur par défaut,
+    ce qui ne réécrit pas la table (opération instantanée sur PostgreSQL).
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Colonnes ajoutées, sous la forme 'Table.colonne'
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    added = []
+
+    for model_table in db.metadata.sorted_tables:
+        if model_table.name not in existing_tables:
+            continue
+
+        existing = {info['name'] for info in inspector.get_columns(model_table.name)}
+        for model_column in model_table.columns:
+            if model_column.name in existing:
+                continue
+
+            column_type = model_column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f'ALTER TABLE {preparer.format_table(model_table)} '
+                    f'ADD COLUMN {preparer.format_column(model_column)} {column_type}'
+                ))
+
+            logger.info(f"Colonne '{model_column.name}' ajoutée à la table '{model_table.name}'")
+            added.append(f'{model_table.name}.{model_column.name}')
+
+    return added
+
+
+def _backfill_in_chunks(engine, transactions, missing, values, chunk_size):
+    """
+    Met à jour par paquets les transactions qui vérifient une condition
+
+    Les lignes sont parcourues par identifiant croissant, un paquet par
+    transaction : la table reste accessible en écriture pendant le backfill.
+    Les identifiants étant aléatoires, une ligne insérée pendant un passage
+    peut l'être derrière la position courante : les passages se répètent
+    jusqu'à ce qu'un passage complet ne trouve plus aucune ligne. missing ne
+    doit donc sélectionner que des lignes que values remplit.
+
+    Args:
+        engine: Moteur SQLAlchemy
+        transactions: Table Transaction sur laquelle portent missing et values
+            (LEGACY_TRANSACTION pour lire les anciennes colonnes)
+        missing: Condition sélectionnant les lignes à remplir
+        values (dict): Valeurs à écrire (expressions SQL sur la ligne)
+        chunk_size (int): Nombre de lignes mises à jour par transaction
+
+    Returns:
+        int: Nombre de lignes mises à jour
+    """
+    columns = transactions.c
+    updated = 0
+    while True:
+        last_id = ''
+        found = 0
+        while True:
+            with engine.begin() as conn:
+                ids = conn.execute(
+                    select(columns.id).where(columns.id > last_id, missing).order_by(columns.id).limit(chunk_size)
+                ).scalars().all()
+                if not ids:
+                    break
+
+                conn.execute(update(transactions).where(columns.id.in_(ids)).values(
+                    # Un backfill ne modifie pas la transaction du point de vue de l'API
+                    updatedAt=columns.updatedAt,
+                    **values
+                ))
+
+            last_id = ids[-1]
+            found += len(ids)
+
+        updated += found
+        if not found:
+            return updated
+
+
+def _legacy_tx_date(engine):
+    """Expression de la date native tirée de l'ancienne colonne date (NULL si illisible)"""
+    columns = LEGACY_TRANSACTION.c
+    if engine.dialect.name == 'postgresql':
+        # Le cast d'une chaîne mal formée ferait échouer tout le paquet
+        return case((columns.date.op('~')(r'^\d{4}-\d{2}-\d{2}$'), cast(columns.date, Date)))
+    # SQLite stocke les dates en texte YYYY-MM-DD ; date() renvoie NULL si la chaîne est invalide
+    return func.date(columns.date)
+
+
+def backfill_transaction_columns(engine=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Remplit txDate et amountCents à partir de date et amount sur les lignes existantes
+
+    Rejoué à chaque upgrade tant que les anciennes colonnes existent, pour
+    les lignes écrites par les workers de la version précédente. Les dates
+    illisibles restent NULL : ces lignes sont ensuite écartées par
+    quarantine_invalid_transactions. Sans effet sur une base créée sans les
+    anciennes colonnes.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+        chunk_size (int): Nombre de lignes mises à jour par transaction
+
+    Returns:
+        int: Nombre de lignes mises à jour
+    """
+    engine = engine or db.engine
+    if not {'date', 'amount'} <= _column_names(engine, 'Transaction'):
+        return 0
+
+    columns = LEGACY_TRANSACTION.c
+    tx_date = _legacy_tx_date(engine)
+    amount_cents = cast(func.round(columns.amount * 100), BigInteger)
+
+    updated = _backfill_in_chunks(
+        engine,
+        LEGACY_TRANSACTION,
+        or_(
+            and_(columns.txDate.is_(None), tx_date.is_not(None)),
+            and_(columns.amountCents.is_(None), columns.amount.is_not(None))
+        ),
+        {
+            'txDate': func.coalesce(columns.txDate, tx_date),
+            'amountCents': func.coalesce(columns.amountCents, amount_cents),
+        },
+        chunk_size
+    )
+
+    logger.info(f"Backfill de txDate/amountCents: {updated} ligne(s) mise(s) à jour")
+    return updated
+
+
+def ensure_categories(engine=None):
+    """
+    Crée la table Category si besoin et y enregistre les paires du schéma
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Paires ajoutées
+    """
+    engine = engine or db.engine
+    Category.__table__.create(bind=engine, checkfirst=True)
+    return sync_categories(engine=engine)
+
+
+def _legacy_category_pair():
+    """Expressions de la paire (catégorie, sous-catégorie) tirée des anciennes colonnes"""
+    columns = LEGACY_TRANSACTION.c
+    return (func.coalesce(columns.category, DEFAULT_PAIR[0]),
+            func.coalesce(columns.subcategory, DEFAULT_PAIR[1]))
+
+
+def backfill_category_codes(engine=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Remplit categoryCode à partir de category et subcategory sur les lignes existantes
+
+    Les paires absentes du schéma (données antérieures à la validation des
+    catégories) reçoivent d'abord leur propre code. Une ligne écrite pendant
+    le backfill avec une paire encore inconnue est laissée au prochain
+    upgrade. Sans effet sur une base créée sans les anciennes colonnes.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+        chunk_size (int): Nombre de lignes mises à jour par transaction
+
+    Returns:
+        int: Nombre de lignes mises à jour
+    """
+    engine = engine or db.engine
+    if not {'category', 'subcategory'} <= _column_names(engine, 'Transaction'):
+        return 0
+
+    columns = LEGACY_TRANSACTION.c
+    category, subcategory = _legacy_category_pair()
+
+    with engine.connect() as conn:
+        pairs = [tuple(row) for row in conn.execute(
+            select(category, subcategory).where(columns.categoryCode.is_(None)).distinct()
+        )]
+    sync_categories(pairs, engine=engine)
+
+    code = select(Category.code).where(
+        Category.category == category,
+        Category.subcategory == subcategory
+    ).scalar_subquery()
+
+    updated = _backfill_in_chunks(engine, LEGACY_TRANSACTION,
+                                  and_(columns.categoryCode.is_(None), code.is_not(None)),
+                                  {'categoryCode': code}, chunk_size)
+    logger.info(f"Backfill de categoryCode: {updated} ligne(s) mise(s) à jour")
+    return updated
+
+
+def backfill_legacy_columns(engine=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Prépare l'arrêt des écritures sur les anciennes colonnes puis rejoue leurs backfills
+
+    Sur PostgreSQL, date et amount perdent leur contrainte NOT NULL : le code
+    cesse de les écrire quand LEGACY_TRANSACTION_WRITES=false (SQLite ne sait
+    pas retirer la contrainte ; le code continue alors de les écrire).
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+        chunk_size (int): Nombre de lignes mises à jour par transaction
+
+    Returns:
+        int: Nombre de lignes mises à jour
+    """
+    engine = engine or db.engine
+    existing = set(LEGACY_COLUMNS) & _column_names(engine, 'Transaction')
+    if not existing:
+        return 0
+
+    if engine.dialect.name == 'postgresql':
+        preparer = engine.dialect.identifier_preparer
+        with engine.begin() as conn:
+            for name in sorted(existing):
+                conn.execute(text(
+                    f'ALTER TABLE {preparer.quote("Transaction")} ALTER COLUMN {preparer.quote(name)} DROP NOT NULL'
+                ))
+
+    return backfill_transaction_columns(engine, chunk_size) + backfill_category_codes(engine, chunk_size)
+
+
+def quarantine_invalid_transactions(engine=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Déplace dans TransactionQuarantine les transactions dont les anciennes colonnes sont illisibles
+
+    Le backfill est rejoué juste avant : une ligne écrite depuis le précédent
+    par un worker de la version précédente est convertie, pas écartée. Seules
+    les lignes dont l'ancienne valeur ne peut pas être convertie (date
+    illisible, montant absent) sont retirées de Transaction et conservées
+    telles quelles (toutes leurs colonnes, en JSON) pour être corrigées à la
+    main, avec pour motif les anciennes colonnes en cause. Ces lignes n'ont
+    jamais pu être renvoyées par l'API ni comptées dans le cumul : aucune
+    trace de suppression n'est enregistrée pour la synchronisation.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+        chunk_size (int): Nombre de lignes déplacées par transaction
+
+    Returns:
+        int: Nombre de lignes mises en quarantaine
+    """
+    engine = engine or db.engine
+    if not {'date', 'amount'} <= _column_names(engine, 'Transaction'):
+        return 0
+
+    TransactionQuarantine.__table__.create(bind=engine, checkfirst=True)
+    backfill_transaction_columns(engine, chunk_size)
+
+    columns = LEGACY_TRANSACTION.c
+    unreadable = {
+        'date': and_(columns.txDate.is_(None), _legacy_tx_date(engine).is_(None)),
+        'amount': and_(columns.amountCents.is_(None), columns.amount.is_(None)),
+    }
+    # Table lue telle qu'elle est en base, anciennes colonnes comprises
+    transactions = Table(Transaction.__tablename__, MetaData(), autoload_with=engine)
+
+    moved = 0
+    while True:
+        with engine.begin() as conn:
+            invalid = conn.execute(
+                select(columns.id, *(condition.label(name) for name, condition in unreadable.items()))
+                .where(or_(*unreadable.values())).order_by(columns.id).limit(chunk_size)
+            ).mappings().all()
+            if not invalid:
+                break
+
+            reasons = {row['id']: ','.join(name for name in unreadable if row[name]) for row in invalid}
+            rows = conn.execute(select(transactions).where(transactions.c.id.in_(reasons))).mappings().all()
+            now = datetime.utcnow()
+            conn.execute(insert(TransactionQuarantine.__table__), [{
+                'id': row['id'],
+                'userId': row['userId'],
+                'reason': reasons[row['id']],
+                'data': json.dumps(dict(row), default=str),
+                'quarantinedAt': now
+            } for row in rows])
+            conn.execute(delete(transactions).where(transactions.c.id.in_(reasons)))
+
+        moved += len(invalid)
+
+    if moved:
+        logger.warning(f"{moved} transaction(s) illisible(s) déplacée(s) dans TransactionQuarantine")
+    return moved
+
+
+def sequence_legacy_transactions(engine=None):
+    """
+    Numérote les transactions écrites sans numéro de modification par la version précédente
+
+    Les workers de la version précédente n'écrivent ni changeSeq ni le
+    cumul : une fois leurs lignes remplies par le backfill, chaque
+    utilisateur concerné prend un numéro de son compteur, dans la même
+    transaction que la mise à jour de ses lignes (voir
+    services.change_sequence), puis son cumul est reconstruit. Sans effet sur
+    une base sans les anciennes colonnes.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        int: Nombre de lignes numérotées
+    """
+    from services.change_sequence import next_change_seq
+    from services.rollup_service import rebuild_rollup
+
+    engine = engine or db.engine
+    if not set(LEGACY_COLUMNS) & _column_names(engine, 'Transaction'):
+        return 0
+
+    transactions = Transaction.__table__
+    columns = transactions.c
+    unsequenced = and_(
+        columns.changeSeq.is_(None),
+        columns.txDate.is_not(None),
+        columns.amountCents.is_not(None),
+        columns.categoryCode.is_not(None)
+    )
+    with engine.connect() as conn:
+        user_ids = conn.execute(select(columns.userId).where(unsequenced).distinct()).scalars().all()
+        # Cumul vide : construit en entier par ensure_rollup
+        has_rollup = conn.execute(select(MonthlyCategoryTotal.userId).limit(1)).first()
+
+    updated = 0
+    for user_id in user_ids:
+        with engine.begin() as conn:
+            seq = next_change_seq(user_id, connection=conn)
+            updated += conn.execute(update(transactions).where(columns.userId == user_id, unsequenced).values(
+                changeSeq=seq, updatedAt=columns.updatedAt
+            )).rowcount
+        if has_rollup:
+            rebuild_rollup(user_id)
+
+    if updated:
+        logger.info(f"{updated} transaction(s) de la version précédente numérotée(s)")
+    return updated
+
+
+def _drop_index(engine, index_name):
+    """Supprime un index (CONCURRENTLY sur PostgreSQL, pour ne pas bloquer les écritures)"""
+    quoted = engine.dialect.identifier_preparer.quote(index_name)
+    if engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {quoted}'))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP INDEX IF EXISTS {quoted}'))
+
+
+def _contract_columns(engine, table_name, dropped, required):
+    """
+    Supprime d'anciennes colonnes et leurs index, puis impose NOT NULL à leurs remplaçantes
+
+    SQLite ne sait pas ajouter NOT NULL à une colonne existante : la
+    contrainte n'y vaut que pour les bases créées depuis le modèle.
+
+    Args:
+        engine: Moteur SQLAlchemy
+        table_name (str): Nom de la table
+        dropped (list): Anciennes colonnes à supprimer (ignorées si absentes)
+        required (list): Colonnes qui les remplacent, remplies par le backfill
+
+    Returns:
+        list: Colonnes supprimées
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    quoted_table = preparer.quote(table_name)
+    dropped = [name for name in dropped if name in _column_names(engine, table_name)]
+
+    # Une colonne indexée ne peut pas être supprimée sous SQLite
+    for index in inspector.get_indexes(table_name):
+        if set(index['column_names']) & set(dropped):
+            _drop_index(engine, index['name'])
+            logger.info(f"Index '{index['name']}' supprimé avec les colonnes {', '.join(dropped)}")
+
+    for name in dropped:
+        with engine.begin() as conn:
+            conn.execute(text(f'ALTER TABLE {quoted_table} DROP COLUMN {preparer.quote(name)}'))
+        logger.info(f"Colonne '{name}' supprimée de la table '{table_name}'")
+
+    _require_columns(engine, table_name, required)
+    return dropped
+
+
+def _require_columns(engine, table_name, required):
+    """Impose NOT NULL à des colonnes remplies (PostgreSQL seulement, voir _contract_columns)"""
+    if engine.dialect.name != 'postgresql':
+        return
+
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for name in required:
+            conn.execute(text(
+                f'ALTER TABLE {preparer.quote(table_name)} ALTER COLUMN {preparer.quote(name)} SET NOT NULL'
+            ))
+
+
+def contract_transaction_columns(engine=None):
+    """
+    Supprime date et amount, remplacées par txDate et amountCents
+
+    Le backfill est vérifié d'abord : toute transaction sans txDate ou
+    amountCents, ou dont les valeurs ne correspondent pas aux anciennes
+    colonnes (à un demi-centime près, l'arrondi de Python et celui de la
+    base pouvant différer), arrête la contraction sans rien supprimer.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Colonnes supprimées
+
+    Raises:
+        RuntimeError: Si des transactions n'ont pas été correctement remplies
+    """
+    engine = engine or db.engine
+    if {'date', 'amount'} & _column_names(engine, 'Transaction'):
+        columns = LEGACY_TRANSACTION.c
+        tx_date = _legacy_tx_date(engine)
+        with engine.connect() as conn:
+            # Anciennes colonnes NULL : ligne écrite avec LEGACY_TRANSACTION_WRITES=false
+            mismatched = conn.execute(select(func.count()).select_from(LEGACY_TRANSACTION).where(or_(
+                columns.txDate.is_(None),
+                columns.amountCents.is_(None),
+                and_(columns.date.is_not(None), or_(tx_date.is_(None), columns.txDate != tx_date)),
+                and_(columns.amount.is_not(None), func.abs(columns.amountCents - columns.amount * 100) > 0.5)
+            ))).scalar()
+        if mismatched:
+            raise RuntimeError(f"{mismatched} transaction(s) sans txDate/amountCents ou différentes de date/amount : "
+                               f"colonnes date et amount conservées")
+
+    return _contract_columns(engine, 'Transaction', ['date', 'amount'], ['txDate', 'amountCents'])
+
+
+def contract_category_columns(engine=None):
+    """
+    Supprime category et subcategory, remplacées par categoryCode
+
+    Comme contract_transaction_columns, le backfill est vérifié d'abord :
+    une transaction sans code, ou dont le code ne désigne pas la paire de
+    ses anciennes colonnes, arrête la contraction.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Colonnes supprimées
+
+    Raises:
+        RuntimeError: Si des transactions n'ont pas été correctement remplies
+    """
+    engine = engine or db.engine
+    if {'category', 'subcategory'} <= _column_names(engine, 'Transaction'):
+        columns = LEGACY_TRANSACTION.c
+        category, subcategory = _legacy_category_pair()
+        matching = select(Category.code).where(
+            Category.code == columns.categoryCode,
+            Category.category == category,
+            Category.subcategory == subcategory
+        ).exists()
+        with engine.connect() as conn:
+            mismatched = conn.execute(select(func.count()).select_from(LEGACY_TRANSACTION).where(or_(
+                columns.categoryCode.is_(None),
+                and_(or_(columns.category.is_not(None), columns.subcategory.is_not(None)), ~matching)
+            ))).scalar()
+        if mismatched:
+            raise RuntimeError(f"{mismatched} transaction(s) sans categoryCode ou différent de category/subcategory : "
+                               f"colonnes category et subcategory conservées")
+
+    return _contract_columns(engine, 'Transaction', ['category', 'subcategory'], ['categoryCode'])
+
+
+def contract_legacy_columns(engine=None):
+    """
+    Supprime les anciennes colonnes de Transaction (commande db-contract)
+
+    Jamais lancée par upgrade : les workers de la version précédente
+    écrivent encore ces colonnes pendant un déploiement progressif. À lancer
+    une fois tous les workers passés à la nouvelle version avec
+    LEGACY_TRANSACTION_WRITES=false. Les backfills, la quarantaine et la
+    numérotation sont rejoués d'abord pour les lignes écrites entre-temps,
+    puis vérifiés par contract_transaction_columns et
+    contract_category_columns.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Colonnes supprimées
+
+    Raises:
+        RuntimeError: Si le code écrit encore les anciennes colonnes, ou si
+            des transactions n'ont pas été correctement remplies
+    """
+    if LEGACY_TRANSACTION_WRITES:
+        raise RuntimeError("LEGACY_TRANSACTION_WRITES est actif : déployer LEGACY_TRANSACTION_WRITES=false "
+                           "sur tous les workers avant de supprimer les anciennes colonnes")
+
+    engine = engine or db.engine
+    backfill_legacy_columns(engine)
+    quarantine_invalid_transactions(engine)
+    sequence_legacy_transactions(engine)
+
+    dropped = contract_transaction_columns(engine) + contract_category_columns(engine)
+    _require_columns(engine, 'Transaction', ['changeSeq'])
+    _require_columns(engine, 'TransactionTombstone', ['changeSeq'])
+    _legacy_columns.pop(str(engine.url), None)
+    return dropped
+
+
+# Migrations de données, appliquées une seule fois dans l'ordre
+def backfill_change_sequence(engine=None, chunk_size=BACKFILL_CHUNK_SIZE):
+    """
+    Donne le numéro de modification 0 aux transactions et suppressions existantes
+
+    Les numéros attribués ensuite commencent à 1 : un client qui repart
+    d'une synchronisation complète reçoit les lignes existantes avec les
+    autres, et les anciennes suppressions ne concernent aucune copie locale.
+    Les lignes pas encore remplies par le backfill sont laissées à
+    sequence_legacy_transactions. NOT NULL n'est imposé qu'à la contraction,
+    les workers de la version précédente n'écrivant pas changeSeq.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+        chunk_size (int): Nombre de lignes mises à jour par transaction
+
+    Returns:
+        int: Nombre de lignes mises à jour
+    """
+    engine = engine or db.engine
+    ChangeSequence.__table__.create(bind=engine, checkfirst=True)
+    transactions = Transaction.__table__
+    columns = transactions.c
+    unsequenced = and_(
+        columns.changeSeq.is_(None),
+        columns.txDate.is_not(None),
+        columns.amountCents.is_not(None),
+        columns.categoryCode.is_not(None)
+    )
+    updated = _backfill_in_chunks(engine, transactions, unsequenced, {'changeSeq': 0}, chunk_size)
+
+    # Table bornée par la durée de conservation : une seule transaction
+    with engine.begin() as conn:
+        updated += conn.execute(update(TransactionTombstone.__table__).where(
+            TransactionTombstone.__table__.c.changeSeq.is_(None)
+        ).values(changeSeq=0)).rowcount
+
+    logger.info(f"Backfill de changeSeq: {updated} ligne(s) mise(s) à jour")
+    return updated
+
+
+# (les backfills des anciennes colonnes sont rejoués à chaque upgrade)
+DATA_MIGRATIONS = [
+    ('sync_change_sequence', backfill_change_sequence),
+]
+
+
+def apply_data_migrations(engine=None):
+    """
+    Applique les migrations de données pas encore enregistrées dans SchemaMigration
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        dict: Nom de migration -> nombre de lignes mises à jour
+    """
+    engine = engine or db.engine
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(SchemaMigration.name)).scalars())
+
+    results = {}
+    for name, migration in DATA_MIGRATIONS:
+        if name in applied:
+            continue
+        results[name] = migration(engine)
+        try:
+            with engine.begin() as conn:
+                conn.execute(SchemaMigration.__table__.insert().values(name=name))
+        except IntegrityError:
+            # Appliquée en parallèle par un autre processus (migrations idempotentes)
+            pass
+        logger.info(f"Migration de données '{name}' appliquée")
+
+    return results
+
+
+def ensure_indexes(engine=None):
+    """
+    Crée les index déclarés dans les modèles mais absents de la base
+
+    Sur PostgreSQL, les index sont créés avec CONCURRENTLY pour ne pas
+    bloquer les écritures sur une table volumineuse.
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Noms des index créés
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    for model_table in db.metadata.sorted_tables:
+        if model_table.name not in existing_tables:
+            continue
+
+        existing = {index['name'] for index in inspector.get_indexes(model_table.name)}
+        for index in model_table.indexes:
+            if index.name in existing:
+                continue
+
+            if engine.dialect.name == 'postgresql':
+                # CREATE INDEX CONCURRENTLY est interdit dans une transaction
+                ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+                ddl = ddl.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY IF NOT EXISTS', 1)
+                with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                    conn.execute(text(ddl))
+            else:
+                index.create(bind=engine)
+
+            logger.info(f"Index '{index.name}' créé sur la table '{model_table.name}'")
+            created.append(index.name)
+
+    return created
+
+
+def drop_obsolete_indexes(engine=None):
+    """
+    Supprime les index dont la définition a été remplacée dans les modèles
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Noms des index supprimés
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    dropped = []
+
+    for table_name, index_names in OBSOLETE_INDEXES.items():
+        if table_name not in existing_tables:
+            continue
+
+        existing = {index['name'] for index in inspector.get_indexes(table_name)}
+        for index_name in index_names:
+            if index_name not in existing:
+                continue
+
+            _drop_index(engine, index_name)
+            logger.info(f"Index obsolète '{index_name}' supprimé")
+            dropped.append(index_name)
+
+    return dropped
+
+
+def ensure_rollup():
+    """
+    Construit le cumul mensuel d'une base existante s'il est encore vide
+
+    Returns:
+        int: Nombre de lignes de cumul écrites
+    """
+    from services.rollup_service import rebuild_rollup
+
+    has_rollup = db.session.execute(db.select(MonthlyCategoryTotal.userId).limit(1)).first()
+    has_transactions = db.session.execute(db.select(Transaction.id).limit(1)).first()
+    if has_rollup or not has_transactions:
+        return 0
+
+    written = rebuild_rollup()
+    logger.info(f"Cumul mensuel initialisé ({written} lignes)")
+    return written
+
+
+def initialize_database():
+    """
+    Crée les tables manquantes puis applique les migrations
+
+    Opération explicite (commande init-db, ou DB_AUTO_MIGRATE) : démarrer
+    l'application ne touche jamais au schéma de la base.
+
+    Returns:
+        dict: Résumé des opérations effectuées (voir upgrade)
+    """
+    db.create_all()
+    return upgrade()
+
+
+def upgrade(engine=None):
+    """
+    Applique toutes les migrations sur une base existante
+
+    Args:
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        dict: Résumé des opérations effectuées
+    """
+    # Les index sont créés après le backfill, sur des colonnes déjà remplies ;
+    # la contraction est une commande à part (contract_legacy_columns)
+    return {
+        'tables_rebuilt': rebuild_outdated_derived_tables(engine),
+        'columns_added': ensure_columns(engine),
+        'categories_added': ensure_categories(engine),
+        'legacy_backfilled': backfill_legacy_columns(engine),
+        'quarantined': quarantine_invalid_transactions(engine),
+        'data_migrations': apply_data_migrations(engine),
+        'legacy_sequenced': sequence_legacy_transactions(engine),
+        'indexes_created': ensure_indexes(engine),
+        'indexes_dropped': drop_obsolete_indexes(engine),
+        'rollup_rows': ensure_rollup()
+    }
@@ -0,0 +1,240 @@
+"""
+Service d'analyse des dépenses (agrégations côté base de données)
+"""
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
+from services.mode_service import get_current_mode, is_lazy_demo
+from services.demo_service import summarize_generated
+from services.rollup_service import month_of, income_cents, expenses_cents
+from utils.category_registry import decode_category
+from db_models import db, Transaction, MonthlyCategoryTotal
+from operator import itemgetter
+import calendar
+
+# Ligne agrégée (montants en centimes), de même forme que les lignes SQL
+SummaryRow = namedtuple("SummaryRow", ["month", "categoryCode", "income", "expenses", "count"])
+
+def parse_date_range(start_date=None, end_date=None, days=30):
+    """
+    Valide et normalise une plage de dates
+
+    Args:
+        start_date (str, optional): Date de début au format YYYY-MM-DD
+        end_date (str, optional): Date de fin au format YYYY-MM-DD (aujourd'hui par défaut)
+        days (int): Nombre de jours avant end_date si start_date n'est pas fournie
+
+    Returns:
+        tuple: (start_date, end_date) au format YYYY-MM-DD
+
+    Raises:
+        ValueError: Si une date est invalide ou si la plage est inversée
+    """
+    try:
+        end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
+        start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else end - timedelta(days=days)
+    except (TypeError, ValueError):
+        raise ValueError("Les dates doivent être au format YYYY-MM-DD")
+
+    if start > end:
+        raise ValueError("La date de début doit précéder la date de fin")
+
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+def mode_filter(model=Transaction):
+    """
+    Retourne le filtre sur le type de transaction correspondant au mode actuel
+
+    Args:
+        model: Modèle portant les colonnes isTestData et isManual
+            (Transaction, TransactionTombstone pour les suppressions,
+            MonthlyCategoryTotal pour le cumul)
+    """
+    if is_lazy_demo():
+        # Seules les transactions de démo manuelles sont stockées
+        return (model.isTestData == True) & (model.isManual == True)  # noqa: E712
+    if get_current_mode() == 'demo':
+        return model.isTestData == True  # noqa: E712
+    return model.isManual == True  # noqa: E712
+
+def is_month_aligned(start_date, end_date):
+    """
+    Indique si une plage couvre exactement des mois entiers
+
+    Args:
+        start_date (str): Date de début au format YYYY-MM-DD
+        end_date (str): Date de fin au format YYYY-MM-DD
+
+    Returns:
+        bool: True si la plage commence un 1er et finit un dernier jour de mois
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    return start.day == 1 and end.day == calendar.monthrange(end.year, end.month)[1]
+
+def get_summary(user_id, start_date=None, end_date=None, days=30):
+    """
+    Agrège les transactions d'un utilisateur par mois, catégorie et sous-catégorie
+
+    L'agrégation est faite en SQL (GROUP BY) : la taille du résultat dépend du
+    nombre de catégories et de mois, pas du nombre de transactions. Les plages
+    couvrant des mois entiers sont lues directement dans la table de cumul
+    MonthlyCategoryTotal, en O(mois) quel que soit le volume de transactions.
+    Avec le moteur de démo 'lazy', les mois générés sont agrégés en mémoire.
+    Les montants négatifs sont des revenus, les montants positifs des dépenses ;
+    les sommes sont faites en centimes entiers, donc exactes.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        start_date (str, optional): Date de début au format YYYY-MM-DD
+        end_date (str, optional): Date de fin au format YYYY-MM-DD
+        days (int): Nombre de jours à remonter si start_date n'est pas fournie
+
+    Returns:
+        dict: Totaux globaux, par mois et par catégorie
+
+    Raises:
+        ValueError: Si l'ID utilisateur est absent ou si les dates sont invalides
+    """
+    if not user_id:
+        raise ValueError("L'ID utilisateur est requis")
+
+    start_date, end_date = parse_date_range(start_date, end_date, days)
+
+    if is_lazy_demo():
+        return build_summary(_lazy_demo_totals(user_id, start_date, end_date), start_date, end_date)
+
+    if is_month_aligned(start_date, end_date):
+        return build_summary(_read_monthly_totals(user_id, start_date, end_date), start_date, end_date)
+
+    return build_summary(db.session.execute(_grouped_statement(user_id, start_date, end_date)), start_date, end_date)
+
+def _grouped_statement(user_id, start_date, end_date):
+    """
+    Requête d'agrégation des transactions stockées du mode actuel par mois et code de catégorie
+
+    Returns:
+        Select: Lignes (month, categoryCode, income, expenses, count),
+        montants en centimes
+    """
+    month = month_of(Transaction.txDate)
+    return select(
+        month.label("month"),
+        Transaction.categoryCode,
+        income_cents(Transaction.amountCents).label("income"),
+        expenses_cents(Transaction.amountCents).label("expenses"),
+        func.count().label("count")
+    ).where(
+        Transaction.userId == user_id,
+        Transaction.txDate >= date.fromisoformat(start_date),
+        Transaction.txDate <= date.fromisoformat(end_date),
+        mode_filter()
+    ).group_by(
+        month, Transaction.categoryCode
+    )
+
+def _lazy_demo_totals(user_id, start_date, end_date):
+    """
+    Agrège les transactions de démo du moteur 'lazy' : mois générés et saisies manuelles stockées
+
+    Le cumul MonthlyCategoryTotal ne contient pas les mois générés : les
+    totaux sont calculés sur les transactions générées (gardées en LRU) et
+    complétés par l'agrégation SQL des quelques transactions stockées.
+
+    Returns:
+        list: Lignes SummaryRow, montants en centimes
+    """
+    totals = summarize_generated(user_id, date.fromisoformat(start_date), date.fromisoformat(end_date))
+    for row in db.session.execute(_grouped_statement(user_id, start_date, end_date)):
+        total = totals.setdefault((row.month, row.categoryCode), [0, 0, 0])
+        total[0] += int(row.income or 0)
+        total[1] += int(row.expenses or 0)
+        total[2] += row.count
+    return [SummaryRow(month, code, *values) for (month, code), values in totals.items()]
+
+def _read_monthly_totals(user_id, start_date, end_date):
+    """
+    Lit les cumuls mensuels d'un utilisateur pour une plage de mois entiers
+
+    Le cumul porte les drapeaux isTestData et isManual des transactions : il
+    est filtré par le même prédicat que les lectures de transactions
+    (mode_filter), puis les cumuls des deux valeurs de l'autre drapeau sont
+    additionnés.
+
+    Returns:
+        list: Lignes (month, categoryCode, income, expenses, count),
+        montants en centimes
+    """
+    statement = select(
+        MonthlyCategoryTotal.month,
+        MonthlyCategoryTotal.categoryCode,
+        func.sum(MonthlyCategoryTotal.incomeCents).label("income"),
+        func.sum(MonthlyCategoryTotal.expensesCents).label("expenses"),
+        func.sum(MonthlyCategoryTotal.count).label("count")
+    ).where(
+        MonthlyCategoryTotal.userId == user_id,
+        mode_filter(MonthlyCategoryTotal),
+        MonthlyCategoryTotal.month >= start_date[:7],
+        MonthlyCategoryTotal.month <= end_date[:7],
+        MonthlyCategoryTotal.count > 0
+    ).group_by(
+        MonthlyCategoryTotal.month,
+        MonthlyCategoryTotal.categoryCode
+    )
+    return db.session.execute(statement).all()
+
+def build_summary(rows, start_date, end_date):
+    """
+    Construit la réponse de synthèse à partir de lignes agrégées
+
+    Les codes de catégorie sont décodés puis les lignes triées par mois,
+    catégorie et sous-catégorie.
+
+    Args:
+        rows: Lignes (month, categoryCode, income, expenses, count),
+            montants en centimes
+        start_date (str): Date de début de la plage
+        end_date (str): Date de fin de la plage
+
+    Returns:
+        dict: Totaux globaux, par mois et par catégorie
+    """
+    by_category = []
+    by_month = {}
+    totals = {"income": 0, "expenses": 0, "count": 0}
+
+    for row in rows:
+        income = int(row.income or 0)
+        expenses = int(row.expenses or 0)
+        category, subcategory = decode_category(row.categoryCode)
+
+        by_category.append({
+            "month": row.month,
+            "category": category,
+            "subcategory": subcategory,
+            "income": income / 100,
+            "expenses": expenses / 100,
+            "count": row.count
+        })
+
+        month_totals = by_month.setdefault(row.month, {"income": 0, "expenses": 0, "count": 0})
+        for target in (month_totals, totals):
+            target["income"] += income
+            target["expenses"] += expenses
+            target["count"] += row.count
+
+    def _format(values):
+        return {
+            "income": values["income"] / 100,
+            "expenses": values["expenses"] / 100,
+            "net": (values["income"] - values["expenses"]) / 100,
+            "count": values["count"]
+        }
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "totals": _format(totals),
+        "by_month": [dict(month=month, **_format(values)) for month, values in sorted(by_month.items())],
+        "by_category": sorted(by_category, key=itemgetter("month", "category", "subcategory"))
+    }
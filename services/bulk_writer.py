@@ -0,0 +1,155 @@
+"""
+Écriture des transactions par INSERT multi-lignes (ajouts, imports, génération des données de test)
+"""
+from datetime import date, datetime
+from functools import lru_cache
+from sqlalchemy import Column, Float, MetaData, String, insert
+from config import LEGACY_TRANSACTION_WRITES
+from migrations import legacy_transaction_columns
+from utils.category_utils import extract_category_data
+from utils.category_registry import decode_category, encode_category
+from db_models import db, Transaction, TRANSACTION_API_COLUMNS, transactions_to_api
+from services.rollup_service import record_inserted
+from services.change_sequence import stamp_rows
+import uuid
+
+# Nombre de lignes par INSERT multi-lignes
+DEFAULT_CHUNK_SIZE = 1000
+
+# Anciennes colonnes de Transaction (type, valeur tirée de la ligne), écrites
+# en parallèle des nouvelles tant qu'elles existent en base : les workers de
+# la version précédente lisent encore ces colonnes pendant un déploiement
+LEGACY_VALUES = {
+    "date": (String(10), lambda row: row["txDate"].isoformat()),
+    "amount": (Float, lambda row: row["amountCents"] / 100),
+    "category": (String(100), lambda row: decode_category(row["categoryCode"])[0]),
+    "subcategory": (String(100), lambda row: decode_category(row["categoryCode"])[1]),
+}
+
+def parse_transaction_date(value):
+    """
+    Convertit une date au format API (YYYY-MM-DD) en date native
+
+    Args:
+        value (str): Date au format YYYY-MM-DD
+
+    Returns:
+        date: Date correspondante
+
+    Raises:
+        ValueError: Si la date n'est pas au format YYYY-MM-DD ou n'existe pas
+    """
+    # date.fromisoformat accepte d'autres formats ISO 8601 : imposer YYYY-MM-DD
+    if isinstance(value, str) and len(value) == 10 and value[4] == "-" and value[7] == "-":
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    raise ValueError(f"Date invalide '{value}' : format YYYY-MM-DD attendu")
+
+def to_cents(amount):
+    """
+    Convertit un montant décimal en centimes entiers (arrondi au centime le plus proche)
+
+    Args:
+        amount (float): Montant au format API
+
+    Returns:
+        int: Montant en centimes
+    """
+    return round(amount * 100)
+
+def build_transaction_row(user_id, tx_data, is_test=False, is_manual=True):
+    """
+    Convertit une transaction au format API en ligne prête à insérer
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        tx_data (dict): Données de la transaction au format API
+        is_test (bool): Indique si c'est une transaction de test
+        is_manual (bool): Indique si c'est une transaction manuelle
+
+    Returns:
+        dict: Valeurs des colonnes de la table Transaction
+
+    Raises:
+        ValueError: Si la date n'est pas au format YYYY-MM-DD
+    """
+    category_id, subcategory_id = extract_category_data(tx_data)
+    amount = tx_data.get("amount", 0)
+    tx_date = parse_transaction_date(tx_data.get("date", datetime.now().strftime("%Y-%m-%d")))
+
+    return {
+        "id": tx_data.get("id", f"tx_{uuid.uuid4().hex}"),
+        "userId": user_id,
+        "amountCents": to_cents(amount),
+        "txDate": tx_date,
+        "merchantName": tx_data.get("merchant_name", "Unknown"),
+        "paymentChannel": tx_data.get("payment_channel", ""),
+        "pending": tx_data.get("pending", False),
+        "categoryCode": encode_category(category_id, subcategory_id),
+        "isTestData": is_test,
+        "isManual": is_manual,
+    }
+
+def legacy_write_columns():
+    """
+    Anciennes colonnes à écrire : toutes celles encore présentes tant que
+    LEGACY_TRANSACTION_WRITES est actif, sinon celles qui refusent NULL
+    (SQLite, où la contrainte ne peut pas être retirée)
+    """
+    return tuple(
+        name for name, nullable in legacy_transaction_columns().items()
+        if LEGACY_TRANSACTION_WRITES or not nullable
+    )
+
+@lru_cache(maxsize=None)
+def _insert_table(legacy_names):
+    """Table Transaction du modèle complétée des anciennes colonnes écrites"""
+    if not legacy_names:
+        return Transaction.__table__
+    table = Transaction.__table__.to_metadata(MetaData())
+    for name in legacy_names:
+        table.append_column(Column(name, LEGACY_VALUES[name][0]))
+    return table
+
+def bulk_insert_transactions(rows, chunk_size=DEFAULT_CHUNK_SIZE, returning=False):
+    """
+    Insère des transactions par paquets d'INSERT multi-lignes.
+
+    Les paquets, ainsi que la mise à jour du cumul mensuel, sont exécutés
+    dans la transaction courante de la session : l'appelant reste
+    responsable du commit.
+
+    Args:
+        rows (list): Lignes construites avec build_transaction_row
+        chunk_size (int): Nombre de lignes par paquet
+        returning (bool): Renvoyer les transactions insérées (INSERT ... RETURNING)
+
+    Returns:
+        list: Transactions insérées au format API si returning, sinon liste vide
+    """
+    # Un seul numéro de modification par utilisateur pour tout le lot
+    stamp_rows(rows)
+
+    legacy_names = legacy_write_columns()
+    table = _insert_table(legacy_names)
+    statement = insert(table)
+    if returning:
+        statement = statement.returning(*(table.c[column.key] for column in TRANSACTION_API_COLUMNS))
+
+    inserted = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        values = chunk
+        if legacy_names:
+            values = [
+                dict(row, **{name: LEGACY_VALUES[name][1](row) for name in legacy_names})
+                for row in chunk
+            ]
+        result = db.session.execute(statement, values)
+        if returning:
+            inserted.extend(transactions_to_api(result))
+        record_inserted(chunk)
+
+    return inserted
@@ -0,0 +1,88 @@
+"""
+Numéro de modification par utilisateur, pour la synchronisation incrémentale.
+
+Chaque écriture sur les transactions d'un utilisateur (insertion, trace de
+suppression) prend le numéro suivant de son compteur ChangeSequence, dans
+la même transaction de base de données que l'écriture. L'incrément
+verrouille la ligne du compteur jusqu'au commit : une écriture concurrente
+attend, prend le numéro suivant et est validée après. Les numéros sont donc
+visibles dans l'ordre où ils sont attribués, quelle que soit la durée de
+l'écriture (un lot de 50 000 lignes ou un paquet d'import), et un curseur
+posé sur le dernier numéro lu ne peut jamais passer devant une écriture
+encore en cours.
+"""
+from importlib import import_module
+from sqlalchemy import insert, select, update
+from db_models import db, ChangeSequence
+from services.rollup_service import UPSERT_DIALECTS
+
+
+def next_change_seq(user_id, connection=None):
+    """
+    Réserve le numéro de modification suivant d'un utilisateur dans la transaction courante
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        connection: Connexion dont la transaction est utilisée (par défaut la
+            session, voir migrations.sequence_legacy_transactions)
+
+    Returns:
+        int: Numéro attribué (le premier vaut 1)
+    """
+    table = ChangeSequence.__table__
+    executor = connection if connection is not None else db.session
+    dialect = (connection if connection is not None else db.engine).dialect.name
+    if dialect in UPSERT_DIALECTS:
+        statement = import_module(UPSERT_DIALECTS[dialect]).insert(table).values(
+            userId=user_id, lastSeq=1, purgedSeq=0
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.userId],
+            set_={"lastSeq": table.c.lastSeq + 1}
+        ).returning(table.c.lastSeq)
+        return executor.execute(statement).scalar_one()
+
+    # Dialecte sans upsert : verrou explicite sur la ligne du compteur
+    current = executor.execute(
+        select(table.c.lastSeq).where(table.c.userId == user_id).with_for_update()
+    ).scalar()
+    if current is None:
+        executor.execute(insert(table).values(userId=user_id, lastSeq=1, purgedSeq=0))
+        return 1
+    executor.execute(update(table).where(table.c.userId == user_id).values(lastSeq=current + 1))
+    return current + 1
+
+
+def stamp_rows(rows):
+    """
+    Attribue à des lignes de transactions le numéro de modification de leur utilisateur
+
+    Toutes les lignes d'un même utilisateur reçoivent le même numéro (un
+    seul incrément par utilisateur et par appel).
+
+    Args:
+        rows (list): Lignes de la table Transaction (dict de colonnes), complétées sur place
+    """
+    seqs = {}
+    for row in rows:
+        user_id = row["userId"]
+        if user_id not in seqs:
+            seqs[user_id] = next_change_seq(user_id)
+        row["changeSeq"] = seqs[user_id]
+
+
+def get_change_sequence(user_id):
+    """
+    Lit le compteur validé d'un utilisateur
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+
+    Returns:
+        tuple: (dernier numéro attribué, dernier numéro dont les traces de
+        suppression ont été purgées), (0, 0) sans écriture
+    """
+    row = db.session.execute(
+        select(ChangeSequence.lastSeq, ChangeSequence.purgedSeq).where(ChangeSequence.userId == user_id)
+    ).first()
+    return (row.lastSeq, row.purgedSeq) if row else (0, 0)
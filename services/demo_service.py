@@ -0,0 +1,150 @@
+"""
+Moteur de démo paresseux (DEMO_ENGINE='lazy').
+
+Les transactions de démo générées ne sont pas stockées : chaque mois est
+produit à la demande par utils.mock_data avec une graine dérivée de
+l'utilisateur et du mois, donc toujours identique d'une requête à l'autre.
+Seuls les mois de la fenêtre demandée sont calculés, et les derniers mois
+générés sont gardés en mémoire (LRU). Les transactions de démo saisies
+manuellement restent en base et sont fusionnées avec les mois générés.
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
+import hashlib
+import heapq
+import random
+
+from config import DEMO_CACHE_MONTHS, DEMO_SEED
+from db_models import TRANSACTION_API_COLUMNS, transactions_to_api
+from services.bulk_writer import build_transaction_row, to_cents
+from utils.category_registry import encode_category
+from utils.mock_data import generate_monthly_transactions
+
+# Nombre minimal de transactions par mois (comme get_mock_transactions)
+MONTHLY_MIN_COUNT = 15
+
+# Ordre des transactions renvoyées, identique à l'ordre SQL (txDate, id) décroissants
+SORT_KEY = itemgetter("date", "id")
+
+_API_COLUMN_NAMES = tuple(column.key for column in TRANSACTION_API_COLUMNS)
+
+def demo_window(days):
+    """
+    Retourne la fenêtre de dates lue pour 'days' jours (même borne que les lectures en base)
+
+    Returns:
+        tuple: (date de début, date de fin) en dates natives
+    """
+    today = datetime.now().date()
+    return today - timedelta(days=days), today
+
+def demo_seed(user_id, year, month):
+    """
+    Dérive la graine d'un mois de démo d'un utilisateur
+
+    Le hachage rend les graines indépendantes entre utilisateurs et entre mois,
+    et stables d'un processus à l'autre (contrairement à hash()).
+
+    Returns:
+        int: Graine du générateur
+    """
+    key = f"{DEMO_SEED}:{user_id}:{year:04d}-{month:02d}".encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+@lru_cache(maxsize=DEMO_CACHE_MONTHS)
+def generate_demo_month(user_id, year, month):
+    """
+    Génère (ou relit dans le LRU) le mois complet de démo d'un utilisateur
+
+    Les transactions passent par build_transaction_row puis transactions_to_api,
+    comme si elles avaient été stockées puis relues : la forme API est identique.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        year (int): Année
+        month (int): Mois (1 à 12)
+
+    Returns:
+        tuple: Transactions du mois au format API, triées par (date, id)
+        décroissants. Partagées entre les appels : ne pas les modifier.
+    """
+    rng = random.Random(demo_seed(user_id, year, month))
+    generated = generate_monthly_transactions(year, month, min_count=MONTHLY_MIN_COUNT, rng=rng)
+    rows = [build_transaction_row(user_id, tx_data, is_test=True, is_manual=False)
+            for tx_data in generated]
+    transactions = transactions_to_api(
+        tuple(row[name] for name in _API_COLUMN_NAMES) for row in rows
+    )
+    return tuple(sorted(transactions, key=SORT_KEY, reverse=True))
+
+def _months_desc(start, end):
+    """Énumère les (année, mois) de end à start, du plus récent au plus ancien"""
+    year, month = end.year, end.month
+    while (year, month) >= (start.year, start.month):
+        yield year, month
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+
+def iter_generated_transactions(user_id, start, end, before=None):
+    """
+    Parcourt les transactions générées d'une plage de dates, mois par mois
+
+    Les mois ne sont générés qu'au moment où le parcours les atteint, et
+    seulement jusqu'à aujourd'hui : la suite du mois en cours apparaît au
+    fil des jours.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        start (date): Première date incluse
+        end (date): Dernière date incluse
+        before (tuple, optional): Clé (date ISO, id) exclusive, pour la pagination
+
+    Yields:
+        dict: Transaction au format API, triées par (date, id) décroissants
+    """
+    end = min(end, datetime.now().date())
+    if before:
+        end = min(end, date.fromisoformat(before[0]))
+
+    start_iso, end_iso = start.isoformat(), end.isoformat()
+    for year, month in _months_desc(start, end):
+        for transaction in generate_demo_month(user_id, year, month):
+            if transaction["date"] > end_iso or (before and SORT_KEY(transaction) >= before):
+                continue
+            if transaction["date"] < start_iso:
+                break
+            yield transaction
+
+def merge_transactions(*streams):
+    """
+    Fusionne des flux de transactions triés par (date, id) décroissants
+
+    Returns:
+        iterator: Transactions des flux, dans le même ordre
+    """
+    return heapq.merge(*streams, key=SORT_KEY, reverse=True)
+
+def summarize_generated(user_id, start, end):
+    """
+    Agrège les transactions générées d'une plage par mois et code de catégorie
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        start (date): Première date incluse
+        end (date): Dernière date incluse
+
+    Returns:
+        dict: (month, categoryCode) -> [revenus en centimes, dépenses en centimes, nombre]
+    """
+    totals = {}
+    for transaction in iter_generated_transactions(user_id, start, end):
+        category = transaction["category"]
+        code = encode_category(category["id"], category["subcategory"]["id"])
+        total = totals.setdefault((transaction["date"][:7], code), [0, 0, 0])
+        amount_cents = to_cents(transaction["amount"])
+        if amount_cents < 0:
+            total[0] -= amount_cents
+        else:
+            total[1] += amount_cents
+        total[2] += 1
+    return totals
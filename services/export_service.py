@@ -0,0 +1,142 @@
+"""
+Export des transactions d'une plage de dates (CSV ou XLSX), en flux.
+
+Les lignes sont lues par paquets avec yield_per (curseur côté serveur sur
+PostgreSQL) et passées une à une à l'écrivain du format demandé : la
+mémoire reste constante quelle que soit la plage, et les premiers octets
+partent dès le premier paquet lu.
+"""
+from datetime import date
+from itertools import chain
+
+from sqlalchemy import select
+
+from db_models import db, Transaction, TRANSACTION_API_COLUMNS, transactions_to_api
+from services.analysis_service import mode_filter, parse_date_range
+from services.demo_service import iter_generated_transactions, merge_transactions
+from services.mode_service import is_lazy_demo
+from utils.category_registry import decode_category, get_category_registry
+from utils.export_writers import iter_csv, iter_xlsx
+
+# Nombre de lignes lues en base et écrites par morceau de réponse
+EXPORT_CHUNK_SIZE = 1000
+
+# Colonnes exportées et leur type (voir utils/export_writers.py)
+EXPORT_COLUMNS = (
+    ("id", "text"),
+    ("date", "date"),
+    ("amount", "money"),
+    ("merchant_name", "text"),
+    ("payment_channel", "text"),
+    ("pending", "bool"),
+    ("category", "text"),
+    ("subcategory", "text"),
+    ("is_test_data", "bool"),
+    ("is_manual", "bool"),
+)
+
+# Format -> (écrivain, type MIME, extension)
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv", "csv"),
+    "xlsx": (iter_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+def _stored_partitions(user_id, start, end, chunk_size):
+    """
+    Lit les transactions stockées du mode actuel, de la plus récente à la plus ancienne
+
+    Yields:
+        list: Paquets d'au plus chunk_size lignes dans l'ordre de TRANSACTION_API_COLUMNS
+    """
+    statement = select(*TRANSACTION_API_COLUMNS).where(
+        Transaction.userId == user_id,
+        Transaction.txDate >= start,
+        Transaction.txDate <= end,
+        Transaction.changeSeq.is_not(None),
+        mode_filter()
+    ).order_by(Transaction.txDate.desc(), Transaction.id.desc())
+    result = db.session.execute(statement, execution_options={"yield_per": chunk_size})
+    yield from result.partitions()
+
+
+def _export_row(row, decode):
+    """Convertit une ligne SQL (TRANSACTION_API_COLUMNS) en ligne d'export"""
+    (tx_id, tx_date, amount_cents, merchant_name, payment_channel, pending,
+     category_code, is_test_data, is_manual) = row
+    category, subcategory = decode(category_code) or decode_category(category_code)
+    return (
+        tx_id, tx_date, amount_cents, merchant_name,
+        payment_channel or ("online" if amount_cents < 0 else "in store"),
+        pending, category, subcategory, is_test_data, is_manual
+    )
+
+
+def _api_export_row(transaction):
+    """Convertit une transaction au format API en ligne d'export"""
+    category = transaction["category"]
+    return (
+        transaction["id"], date.fromisoformat(transaction["date"]), round(transaction["amount"] * 100),
+        transaction["merchant_name"], transaction["payment_channel"], transaction["pending"],
+        category["id"], category["subcategory"]["id"], transaction["is_test_data"], transaction["is_manual"]
+    )
+
+
+def iter_export_rows(user_id, start, end, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Parcourt les transactions à exporter selon le mode, sans les charger toutes en mémoire
+
+    Avec le moteur de démo 'lazy', les mois générés sont fusionnés avec les
+    transactions de démo stockées, comme pour la lecture des transactions.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        start (date): Première date incluse
+        end (date): Dernière date incluse
+        chunk_size (int): Nombre de lignes lues par paquet
+
+    Yields:
+        tuple: Lignes dans l'ordre de EXPORT_COLUMNS (date native, montant en centimes)
+    """
+    if is_lazy_demo():
+        stored = chain.from_iterable(map(transactions_to_api, _stored_partitions(user_id, start, end, chunk_size)))
+        merged = merge_transactions(iter_generated_transactions(user_id, start, end), stored)
+        yield from map(_api_export_row, merged)
+        return
+
+    decode = get_category_registry().decode
+    for rows in _stored_partitions(user_id, start, end, chunk_size):
+        for row in rows:
+            yield _export_row(row, decode)
+
+
+def export_transactions(user_id, export_format="csv", start_date=None, end_date=None, days=30):
+    """
+    Prépare l'export des transactions d'un utilisateur sur une plage de dates
+
+    Les paramètres sont validés ici : les erreurs sont levées avant l'envoi
+    du premier octet, la lecture ne commence qu'au parcours du flux.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        export_format (str): 'csv' ou 'xlsx'
+        start_date (str, optional): Date de début au format YYYY-MM-DD
+        end_date (str, optional): Date de fin au format YYYY-MM-DD (aujourd'hui par défaut)
+        days (int): Nombre de jours avant end_date si start_date n'est pas fournie
+
+    Returns:
+        tuple: (flux d'octets, type MIME, nom de fichier)
+
+    Raises:
+        ValueError: Si l'ID utilisateur manque, le format est inconnu ou les dates invalides
+    """
+    if not user_id:
+        raise ValueError("L'ID utilisateur est requis pour exporter les transactions")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu: {export_format} (attendu: {', '.join(EXPORT_FORMATS)})")
+
+    start_date, end_date = parse_date_range(start_date, end_date, days)
+    writer, mimetype, extension = EXPORT_FORMATS[export_format]
+    rows = iter_export_rows(user_id, date.fromisoformat(start_date), date.fromisoformat(end_date))
+    body = writer(EXPORT_COLUMNS, rows, batch_size=EXPORT_CHUNK_SIZE)
+    return body, mimetype, f"transactions_{start_date}_{end_date}.{extension}"
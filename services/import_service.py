@@ -0,0 +1,419 @@
+"""
+Import de relevés bancaires (CSV ou OFX) dans les transactions manuelles.
+
+Le fichier est lu en flux (voir utils/import_readers.py). Chaque ligne est
+mise au format de schemas/transaction.json, puis les lignes sont validées,
+insérées et commitées par paquets de IMPORT_CHUNK_SIZE, avec la progression
+de l'import (ImportJob) dans la même transaction : un import interrompu
+reprend après le dernier paquet validé.
+
+Chaque transaction importée porte une empreinte de son contenu (date,
+montant, libellé) unique par utilisateur : réimporter un relevé, ou deux
+relevés qui se chevauchent, n'ajoute que les lignes encore inconnues.
+"""
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+
+from sqlalchemy import select
+
+from config import IMPORT_CHUNK_SIZE
+from db_models import db, ImportJob, Transaction
+from services.bulk_writer import build_transaction_row, bulk_insert_transactions
+from utils.category_registry import DEFAULT_PAIR, schema_pairs
+from utils.import_readers import IMPORT_READERS
+from utils.response_cache import bump_user_version
+from utils.transaction_validator import validate_transactions
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Extension du fichier -> format d'import
+IMPORT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.txt': 'csv',
+    '.ofx': 'ofx',
+    '.qfx': 'ofx',
+}
+
+# Convention de signe des montants du fichier
+# 'bank' : négatif au débit (relevés bancaires), inversé à l'import
+# 'api' : négatif pour un revenu, comme l'API (fichier exporté par /api/export)
+AMOUNT_SIGNS = ('bank', 'api')
+
+# Formats de date acceptés, dans l'ordre d'essai (jour avant mois)
+IMPORT_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y%m%d', '%Y/%m/%d', '%d/%m/%y')
+
+# Erreurs par ligne conservées dans la progression de l'import
+MAX_REPORTED_ERRORS = 100
+
+# Longueur de la colonne merchantName
+MERCHANT_MAX_LENGTH = 100
+
+_TRUE_VALUES = ('true', '1', 'yes', 'oui')
+
+# Erreurs dues au contenu du fichier (et non au serveur) : l'import est
+# alors refusé ('rejected') plutôt qu'interrompu ('failed')
+IMPORT_INPUT_ERRORS = (ValueError, csv.Error, UnicodeError)
+
+
+def resolve_import_format(import_format=None, file_name=None):
+    """
+    Détermine le format d'import, d'après le paramètre ou l'extension du fichier
+
+    Args:
+        import_format (str, optional): 'csv' ou 'ofx'
+        file_name (str, optional): Nom du fichier envoyé
+
+    Returns:
+        str: Format d'import
+
+    Raises:
+        ValueError: Si le format est inconnu ou ne peut pas être déduit
+    """
+    if not import_format and file_name:
+        import_format = IMPORT_EXTENSIONS.get(os.path.splitext(file_name)[1].lower())
+    if not import_format:
+        raise ValueError("Format d'import requis (csv ou ofx)")
+
+    import_format = import_format.lower()
+    if import_format not in IMPORT_READERS:
+        raise ValueError(f"Format d'import inconnu: {import_format} (attendu: {', '.join(IMPORT_READERS)})")
+    return import_format
+
+
+@lru_cache(maxsize=4096)
+def parse_import_date(value):
+    """
+    Convertit une date de relevé en date native
+
+    Les lignes d'un relevé partagent peu de dates : chacune n'est analysée
+    qu'une fois.
+
+    Args:
+        value (str): Date (YYYY-MM-DD, JJ/MM/AAAA, AAAAMMJJ...), éventuellement suivie d'une heure
+
+    Returns:
+        date: Date correspondante
+
+    Raises:
+        ValueError: Si la date n'est dans aucun format reconnu
+    """
+    text = (value or '').strip().split('T')[0].split(' ')[0]
+    for date_format in IMPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Date invalide '{value}'")
+
+
+def parse_amount_cents(value):
+    """
+    Convertit un montant de relevé en centimes
+
+    Accepte la virgule ou le point décimal, les séparateurs de milliers
+    (espace, point ou virgule), un symbole monétaire et les montants
+    négatifs entre parenthèses.
+
+    Args:
+        value (str): Montant, ex. '-1 234,56 €' ou '(12.50)'
+
+    Returns:
+        int: Montant en centimes (0 si la valeur est vide)
+
+    Raises:
+        ValueError: Si le montant est illisible
+    """
+    text = re.sub(r'[\s€$£+]', '', value or '')
+    if not text:
+        return 0
+
+    negative = text.startswith('(') and text.endswith(')')
+    text = text.strip('()')
+    # Le dernier séparateur est le séparateur décimal, les autres groupent les milliers
+    separators = [index for index, char in enumerate(text) if char in ',.']
+    if separators:
+        last = separators[-1]
+        text = text[:last].replace(',', '').replace('.', '') + '.' + text[last + 1:]
+
+    try:
+        cents = int((Decimal(text) * 100).quantize(Decimal(1)))
+    except InvalidOperation:
+        raise ValueError(f"Montant invalide '{value}'") from None
+    return -cents if negative else cents
+
+
+def _record_cents(record):
+    """Montant d'un enregistrement en centimes, d'une colonne unique ou des colonnes débit/crédit"""
+    if record.get('amount'):
+        return parse_amount_cents(record['amount'])
+    return parse_amount_cents(record.get('credit')) - abs(parse_amount_cents(record.get('debit')))
+
+
+def import_hash(user_id, tx_date, amount_cents, merchant_name, discriminator):
+    """
+    Empreinte du contenu d'une transaction importée
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        tx_date (date): Date de la transaction
+        amount_cents (int): Montant en centimes (convention de l'API)
+        merchant_name (str): Libellé
+        discriminator (str): Référence de la banque, ou rang parmi les lignes
+            identiques du même jour
+
+    Returns:
+        str: Empreinte hexadécimale (32 caractères)
+    """
+    key = '\x1f'.join((user_id, tx_date.isoformat(), str(amount_cents), merchant_name.casefold(), discriminator))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def iter_import_candidates(user_id, records, amount_sign='bank'):
+    """
+    Met les enregistrements d'un relevé au format de schemas/transaction.json
+
+    Deux lignes identiques un même jour (deux cafés au même prix) restent
+    distinctes : sans référence de la banque, leur rang parmi les lignes
+    identiques (date, montant, libellé) du fichier entre dans l'empreinte.
+    Le décompte couvre tout le fichier, quel que soit l'ordre des lignes :
+    un relevé non trié par date donne les mêmes empreintes qu'une fois trié.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        records: Enregistrements d'un lecteur de utils/import_readers.py
+        amount_sign (str): Convention de signe du fichier (voir AMOUNT_SIGNS)
+
+    Yields:
+        tuple: (transaction, empreinte, None), ou (None, None, erreur) pour une ligne illisible
+    """
+    pairs = frozenset(schema_pairs())
+    occurrences = {}
+
+    for record in records:
+        try:
+            tx_date = parse_import_date(record.get('date'))
+            amount_cents = _record_cents(record)
+        except ValueError as e:
+            yield None, None, str(e)
+            continue
+
+        if amount_sign == 'bank':
+            amount_cents = -amount_cents
+        merchant_name = ' '.join((record.get('merchant') or '').split())[:MERCHANT_MAX_LENGTH] or 'Unknown'
+
+        if record.get('reference'):
+            discriminator = 'ref:' + record['reference']
+        else:
+            key = (tx_date, amount_cents, merchant_name.casefold())
+            discriminator = str(occurrences.get(key, 0))
+            occurrences[key] = occurrences.get(key, 0) + 1
+        digest = import_hash(user_id, tx_date, amount_cents, merchant_name, discriminator)
+
+        # Catégories propres à la banque : inconnues du schéma, donc non classées
+        pair = (record.get('category'), record.get('subcategory'))
+        category, subcategory = pair if pair in pairs else DEFAULT_PAIR
+
+        yield {
+            "id": f"imp_{digest}",
+            "date": tx_date.isoformat(),
+            "merchant_name": merchant_name,
+            "amount": amount_cents / 100,
+            "category": {
+                "id": category,
+                "subcategory": {
+                    "id": subcategory
+                }
+            },
+            "payment_channel": record.get('payment_channel') or 'other',
+            "pending": (record.get('pending') or '').lower() in _TRUE_VALUES,
+            "is_test_data": False
+        }, digest, None
+
+
+def _import_chunk(job, user_id, chunk, errors):
+    """
+    Valide et insère un paquet de lignes, puis enregistre la progression de l'import
+
+    Args:
+        job (ImportJob): Import en cours
+        user_id (str): Identifiant de l'utilisateur
+        chunk (list): Paires (numéro de ligne, candidat de iter_import_candidates)
+        errors (list): Erreurs par ligne déjà signalées (complétée sur place)
+
+    Returns:
+        int: Nombre de transactions insérées
+    """
+    def report(row_number, error):
+        job.failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": row_number, "error": error})
+
+    candidates = []
+    for row_number, (transaction, digest, error) in chunk:
+        if error:
+            report(row_number, error)
+        else:
+            candidates.append((row_number, transaction, digest))
+
+    # Valider le paquet en une passe
+    invalid = validate_transactions([transaction for _, transaction, _ in candidates])
+    rows = {}
+    for index, (row_number, transaction, digest) in enumerate(candidates):
+        if index in invalid:
+            report(row_number, "; ".join(str(e) for e in invalid[index]))
+        elif digest in rows:
+            # Même référence de la banque deux fois dans le fichier
+            job.duplicates += 1
+        else:
+            row = build_transaction_row(user_id, transaction, is_manual=True)
+            row["importHash"] = digest
+            rows[digest] = row
+
+    # Écarter les lignes déjà importées (index unique sur userId, importHash)
+    existing = set(db.session.scalars(
+        select(Transaction.importHash).where(
+            Transaction.userId == user_id,
+            Transaction.importHash.in_(list(rows))
+        )
+    )) if rows else set()
+    new_rows = [row for digest, row in rows.items() if digest not in existing]
+
+    bulk_insert_transactions(new_rows)
+    job.inserted += len(new_rows)
+    job.duplicates += len(existing)
+    job.rowsProcessed += len(chunk)
+    job.errors = json.dumps(errors)
+    db.session.commit()
+    return len(new_rows)
+
+
+def _load_job(user_id, job_id):
+    """Retourne l'import d'un utilisateur, ou None s'il n'existe pas"""
+    job = db.session.get(ImportJob, job_id)
+    return job if job is not None and job.userId == user_id else None
+
+
+def get_import_job(user_id, job_id):
+    """
+    Retourne la progression d'un import
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        job_id (str): Identifiant de l'import
+
+    Returns:
+        dict: Progression de l'import, ou None s'il n'existe pas
+    """
+    job = _load_job(user_id, job_id)
+    return job.to_dict() if job is not None else None
+
+
+def import_transactions(user_id, stream, import_format=None, file_name=None, amount_sign='bank',
+                        resume=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Importe un relevé bancaire dans les transactions manuelles d'un utilisateur
+
+    Pour reprendre un import interrompu, renvoyer le même fichier avec son
+    identifiant (resume) : les lignes des paquets déjà validés sont lues
+    sans être retraitées, le format et la convention de signe de l'import
+    d'origine sont conservés.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        stream: Flux binaire du fichier
+        import_format (str, optional): 'csv' ou 'ofx' (déduit de file_name sinon)
+        file_name (str, optional): Nom du fichier
+        amount_sign (str): Convention de signe des montants (voir AMOUNT_SIGNS)
+        resume (str, optional): Identifiant d'un import à reprendre
+        chunk_size (int): Nombre de lignes validées et commitées par paquet
+
+    Returns:
+        dict: Progression finale de l'import (status 'completed', 'rejected'
+        si le contenu du fichier est invalide, ou 'failed' pour une erreur du
+        serveur, avec la cause dans 'error')
+
+    Raises:
+        ValueError: Si un paramètre est invalide ou si l'en-tête du fichier est illisible
+    """
+    if not user_id:
+        raise ValueError("L'ID utilisateur est requis pour importer des transactions")
+
+    if resume:
+        job = _load_job(user_id, resume)
+        if job is None:
+            raise ValueError(f"Import inconnu: {resume}")
+        if job.status == 'completed':
+            raise ValueError(f"L'import {resume} est déjà terminé")
+        import_format, amount_sign = job.format, job.amountSign
+    else:
+        import_format = resolve_import_format(import_format, file_name)
+        if amount_sign not in AMOUNT_SIGNS:
+            raise ValueError(f"Convention de signe inconnue: {amount_sign} (attendu: {', '.join(AMOUNT_SIGNS)})")
+        job = None
+
+    # L'en-tête CSV est lu ici : un fichier illisible n'ouvre pas d'import
+    records = IMPORT_READERS[import_format](stream)
+
+    if job is None:
+        job = ImportJob(id=str(uuid.uuid4()), userId=user_id, format=import_format,
+                        fileName=file_name, amountSign=amount_sign)
+        db.session.add(job)
+    job.status = 'running'
+    job.error = None
+    db.session.commit()
+
+    start = time.perf_counter()
+    errors = json.loads(job.errors) if job.errors else []
+    skip = job.rowsProcessed
+    inserted = 0
+    chunk = []
+    try:
+        for row_number, candidate in enumerate(iter_import_candidates(user_id, records, amount_sign), start=1):
+            # Lignes des paquets déjà validés lors d'une exécution précédente
+            if row_number <= skip:
+                continue
+            chunk.append((row_number, candidate))
+            if len(chunk) >= chunk_size:
+                inserted += _import_chunk(job, user_id, chunk, errors)
+                chunk = []
+        if chunk:
+            inserted += _import_chunk(job, user_id, chunk, errors)
+
+        job.status = 'completed'
+        db.session.commit()
+    except IMPORT_INPUT_ERRORS as e:
+        db.session.rollback()
+        logger.warning("Import refusé", extra={'job_id': job.id, 'rows_processed': job.rowsProcessed, 'error': str(e)})
+        job.status = 'rejected'
+        job.error = str(e)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Import interrompu", extra={'job_id': job.id, 'rows_processed': job.rowsProcessed})
+        job.status = 'failed'
+        job.error = str(e)
+        db.session.commit()
+    finally:
+        if inserted:
+            bump_user_version(user_id)
+
+    logger.info("Import de relevé traité", extra={
+        'job_id': job.id,
+        'status': job.status,
+        'rows_processed': job.rowsProcessed,
+        'inserted': job.inserted,
+        'duplicates': job.duplicates,
+        'failed': job.failed,
+        'duration_ms': round((time.perf_counter() - start) * 1000, 2)
+    })
+    return job.to_dict()
@@ -2,6 +2,7 @@
 Module de gestion du mode de l'application (prod ou demo)
 """
 from flask import current_app
+from config import DEMO_ENGINE
 
 def get_current_mode():
     """
@@ -33,4 +34,13 @@ def is_demo_mode():
     Returns:
         bool: True si en mode demo, False sinon
     """
-    return get_current_mode() == 'demo'
\ No newline at end of file
+    return get_current_mode() == 'demo'
+
+def is_lazy_demo():
+    """
+    Vérifie si le mode demo sert des données générées à la volée (DEMO_ENGINE='lazy')
+    
+    Returns:
+        bool: True si en mode demo avec le moteur 'lazy'
+    """
+    return is_demo_mode() and DEMO_ENGINE == 'lazy'
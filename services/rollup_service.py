@@ -0,0 +1,228 @@
+"""
+Maintenance de la table de cumul mensuel MonthlyCategoryTotal.
+
+Chaque écriture de transactions applique ses deltas (revenus et dépenses en
+centimes, nombre) au cumul dans la même transaction de base de données, de sorte que
+les analyses lisent O(mois) lignes quel que soit le volume de transactions.
+"""
+from datetime import datetime
+from importlib import import_module
+from sqlalchemy import case, delete, func, select
+from db_models import db, Transaction, MonthlyCategoryTotal
+
+# Clé d'un cumul : (userId, month, categoryCode, isTestData, isManual)
+ROLLUP_KEY = ("userId", "month", "categoryCode", "isTestData", "isManual")
+
+def aggregate_rows(rows, sign=1):
+    """
+    Agrège des lignes de transactions en deltas de cumul
+
+    Args:
+        rows (list): Lignes de la table Transaction (dict de colonnes)
+        sign (int): 1 pour des insertions, -1 pour des suppressions
+
+    Returns:
+        dict: Clé de cumul -> [revenus en centimes, dépenses en centimes, nombre]
+    """
+    deltas = {}
+    for row in rows:
+        key = (row["userId"], row["txDate"].isoformat()[:7], row["categoryCode"],
+               bool(row["isTestData"]), bool(row["isManual"]))
+        delta = deltas.setdefault(key, [0, 0, 0])
+        amount_cents = row["amountCents"]
+        if amount_cents < 0:
+            delta[0] -= sign * amount_cents
+        else:
+            delta[1] += sign * amount_cents
+        delta[2] += sign
+    return deltas
+
+def month_of(column):
+    """
+    Expression SQL du mois (YYYY-MM) d'une colonne Date
+
+    SQLite stocke les dates en texte YYYY-MM-DD ; PostgreSQL a besoin de to_char.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(column, 'YYYY-MM')
+    return func.substr(column, 1, 7)
+
+def income_cents(column):
+    """Somme SQL des montants négatifs (revenus), en valeur absolue"""
+    return func.sum(case((column < 0, -column), else_=0))
+
+def expenses_cents(column):
+    """Somme SQL des montants positifs (dépenses)"""
+    return func.sum(case((column > 0, column), else_=0))
+
+def _grouped_totals_query(*conditions):
+    """
+    Requête d'agrégation des transactions selon la clé de cumul
+
+    Les lignes sans numéro de modification, écrites par la version
+    précédente pendant un déploiement, ne sont comptées qu'une fois reprises
+    par migrations.sequence_legacy_transactions.
+    """
+    month = month_of(Transaction.txDate)
+    return select(
+        Transaction.userId,
+        month.label("month"),
+        Transaction.categoryCode,
+        Transaction.isTestData,
+        Transaction.isManual,
+        income_cents(Transaction.amountCents).label("income"),
+        expenses_cents(Transaction.amountCents).label("expenses"),
+        func.count().label("count")
+    ).where(Transaction.changeSeq.is_not(None), *conditions).group_by(
+        Transaction.userId, month, Transaction.categoryCode, Transaction.isTestData, Transaction.isManual
+    )
+
+# Dialectes supportant INSERT ... ON CONFLICT DO UPDATE (module importé à
+# la première écriture : celui du moteur configuré, pas les deux au démarrage)
+UPSERT_DIALECTS = {'postgresql': 'sqlalchemy.dialects.postgresql', 'sqlite': 'sqlalchemy.dialects.sqlite'}
+
+def _upsert_statement():
+    """
+    Construit un INSERT ... ON CONFLICT DO UPDATE qui ajoute les deltas au cumul
+
+    La requête est exécutée en executemany : sa forme ne dépend pas du nombre
+    de cumuls, elle reste donc dans le cache de compilation de SQLAlchemy.
+    """
+    table = MonthlyCategoryTotal.__table__
+    statement = import_module(UPSERT_DIALECTS[db.engine.dialect.name]).insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=list(ROLLUP_KEY),
+        set_={
+            "incomeCents": table.c.incomeCents + statement.excluded.incomeCents,
+            "expensesCents": table.c.expensesCents + statement.excluded.expensesCents,
+            "count": table.c.count + statement.excluded.count,
+            "updatedAt": statement.excluded.updatedAt
+        }
+    )
+
+def apply_deltas(deltas):
+    """
+    Applique des deltas au cumul dans la transaction courante de la session
+
+    Args:
+        deltas (dict): Clé de cumul -> [revenus en centimes, dépenses en centimes, nombre]
+    """
+    if not deltas:
+        return
+
+    now = datetime.utcnow()
+    values = [
+        dict(zip(ROLLUP_KEY, key), incomeCents=income, expensesCents=expenses, count=count, updatedAt=now)
+        for key, (income, expenses, count) in deltas.items()
+    ]
+
+    if db.engine.dialect.name in UPSERT_DIALECTS:
+        db.session.execute(_upsert_statement(), values)
+    else:
+        # Dialecte sans upsert : lecture puis mise à jour ligne par ligne
+        for value in values:
+            key = tuple(value[column] for column in ROLLUP_KEY)
+            total = db.session.get(MonthlyCategoryTotal, key)
+            if total is None:
+                db.session.add(MonthlyCategoryTotal(**value))
+            else:
+                total.incomeCents += value["incomeCents"]
+                total.expensesCents += value["expensesCents"]
+                total.count += value["count"]
+
+    # Les cumuls vidés par des suppressions n'ont plus de raison d'exister
+    emptied_users = {key[0] for key, (_, _, count) in deltas.items() if count < 0}
+    if emptied_users:
+        db.session.execute(delete(MonthlyCategoryTotal).where(
+            MonthlyCategoryTotal.userId.in_(emptied_users),
+            MonthlyCategoryTotal.count <= 0
+        ))
+
+def record_inserted(rows):
+    """
+    Ajoute au cumul des transactions en cours d'insertion
+
+    Args:
+        rows (list): Lignes de la table Transaction (dict de colonnes)
+    """
+    apply_deltas(aggregate_rows(rows))
+
+def record_deleted(*conditions):
+    """
+    Retire du cumul les transactions qui vont être supprimées
+
+    À appeler avant le DELETE, avec les mêmes conditions.
+
+    Args:
+        *conditions: Conditions SQLAlchemy sélectionnant les transactions supprimées
+    """
+    deltas = {}
+    for row in db.session.execute(_grouped_totals_query(*conditions)):
+        key = (row.userId, row.month, row.categoryCode, bool(row.isTestData), bool(row.isManual))
+        deltas[key] = [-int(row.income or 0), -int(row.expenses or 0), -row.count]
+    apply_deltas(deltas)
+
+def rebuild_rollup(user_id=None):
+    """
+    Recalcule entièrement le cumul à partir des transactions
+
+    Args:
+        user_id (str, optional): Limiter la reconstruction à un utilisateur
+
+    Returns:
+        int: Nombre de lignes de cumul écrites
+    """
+    conditions = [Transaction.userId == user_id] if user_id else []
+    rollup_conditions = [MonthlyCategoryTotal.userId == user_id] if user_id else []
+
+    db.session.execute(delete(MonthlyCategoryTotal).where(*rollup_conditions))
+
+    now = datetime.utcnow()
+    values = [
+        dict(userId=row.userId, month=row.month, categoryCode=row.categoryCode,
+             isTestData=bool(row.isTestData), isManual=bool(row.isManual), incomeCents=int(row.income or 0),
+             expensesCents=int(row.expenses or 0), count=row.count, updatedAt=now)
+        for row in db.session.execute(_grouped_totals_query(*conditions))
+    ]
+    if values:
+        db.session.execute(MonthlyCategoryTotal.__table__.insert(), values)
+
+    db.session.commit()
+    return len(values)
+
+def verify_rollup(user_id=None):
+    """
+    Compare le cumul stocké avec un recalcul à partir des transactions
+
+    Les montants étant en centimes entiers, la comparaison est exacte.
+
+    Args:
+        user_id (str, optional): Limiter la vérification à un utilisateur
+
+    Returns:
+        list: Écarts détectés, un dict par clé de cumul divergente
+    """
+    conditions = [Transaction.userId == user_id] if user_id else []
+    rollup_conditions = [MonthlyCategoryTotal.userId == user_id] if user_id else []
+
+    expected = {}
+    for row in db.session.execute(_grouped_totals_query(*conditions)):
+        key = (row.userId, row.month, row.categoryCode, bool(row.isTestData), bool(row.isManual))
+        expected[key] = (int(row.income or 0), int(row.expenses or 0), row.count)
+
+    stored = {}
+    for total in db.session.scalars(select(MonthlyCategoryTotal).where(*rollup_conditions)):
+        key = (total.userId, total.month, total.categoryCode, bool(total.isTestData), bool(total.isManual))
+        stored[key] = (total.incomeCents, total.expensesCents, total.count)
+
+    drifts = []
+    for key in sorted(set(expected) | set(stored), key=str):
+        expected_values = expected.get(key, (0, 0, 0))
+        stored_values = stored.get(key, (0, 0, 0))
+        if expected_values != stored_values:
+            drifts.append({
+                "key": dict(zip(ROLLUP_KEY, key)),
+                "expected": dict(zip(("incomeCents", "expensesCents", "count"), expected_values)),
+                "stored": dict(zip(("incomeCents", "expensesCents", "count"), stored_values))
+            })
+    return drifts
@@ -0,0 +1,211 @@
+"""
+Synchronisation incrémentale des transactions.
+
+Un client garde une copie locale des transactions du mode actuel et ne
+demande que ce qui a changé depuis sa dernière synchronisation : les
+transactions créées ou modifiées (lues dans l'ordre de (changeSeq, id) par
+l'index ix_Transaction_user_change_seq) et les transactions supprimées (table
+TransactionTombstone, alimentée au moment de chaque suppression).
+
+Le curseur, émis par le serveur, contient la position atteinte dans chacun
+des deux flux. Les positions sont des numéros de modification attribués par
+services/change_sequence.py dans la transaction de l'écriture et visibles
+dans l'ordre de leur attribution : une écriture encore en cours ne peut pas
+se retrouver derrière le curseur d'un client, sans fenêtre d'attente.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import DateTime, and_, delete, exists, func, insert, literal, or_, select, tuple_, update
+
+from config import SYNC_TOMBSTONE_RETENTION_DAYS
+from db_models import (
+    db, ChangeSequence, Transaction, TransactionTombstone, TRANSACTION_API_COLUMNS, transactions_to_api
+)
+from services.analysis_service import mode_filter
+from services.change_sequence import get_change_sequence, next_change_seq
+from services.mode_service import get_current_mode, is_lazy_demo
+from utils.pagination import encode_cursor, decode_cursor, parse_page_size
+
+# Valeurs du curseur : mode, position dans les modifications (changeSeq, id)
+# puis dans les suppressions (changeSeq, id ; id absent : numéro lu en entier)
+SYNC_CURSOR_SIZE = 5
+
+
+def record_tombstones(*conditions):
+    """
+    Enregistre la suppression des transactions qui vont être supprimées
+
+    À appeler avant le DELETE, avec les mêmes conditions et dans la même
+    transaction (comme services.rollup_service.record_deleted).
+
+    Args:
+        *conditions: Conditions SQLAlchemy sélectionnant les transactions supprimées
+    """
+    user_ids = db.session.scalars(select(Transaction.userId).where(*conditions).distinct()).all()
+    for user_id in user_ids:
+        db.session.execute(insert(TransactionTombstone).from_select(
+            ['userId', 'transactionId', 'isTestData', 'isManual', 'deletedAt', 'changeSeq'],
+            select(
+                Transaction.userId,
+                Transaction.id,
+                Transaction.isTestData,
+                Transaction.isManual,
+                literal(datetime.utcnow(), DateTime),
+                literal(next_change_seq(user_id))
+            ).where(*conditions, Transaction.userId == user_id)
+        ))
+
+
+def purge_tombstones(retention_days=SYNC_TOMBSTONE_RETENTION_DAYS):
+    """
+    Supprime les traces de suppression plus anciennes que la durée de conservation
+
+    Le dernier numéro purgé est retenu par utilisateur : un curseur resté en
+    deçà provoque une synchronisation complète.
+
+    Args:
+        retention_days (int): Durée de conservation en jours
+
+    Returns:
+        int: Nombre de traces supprimées
+    """
+    limit = datetime.utcnow() - timedelta(days=retention_days)
+    tombstone = TransactionTombstone
+    purged = db.session.execute(
+        select(tombstone.userId, func.max(tombstone.changeSeq).label('seq'))
+        .where(tombstone.deletedAt < limit)
+        .group_by(tombstone.userId)
+    ).all()
+
+    deleted = 0
+    for user_id, seq in purged:
+        # Tout le numéro est purgé, pour qu'aucun curseur ne s'y arrête à moitié
+        deleted += db.session.execute(delete(tombstone).where(
+            tombstone.userId == user_id,
+            tombstone.changeSeq <= seq
+        )).rowcount
+        db.session.execute(update(ChangeSequence).where(
+            ChangeSequence.userId == user_id,
+            ChangeSequence.purgedSeq < seq
+        ).values(purgedSeq=seq))
+    db.session.commit()
+    return deleted
+
+
+def _decode_sync_cursor(cursor):
+    """
+    Returns:
+        tuple: (mode, position dans les modifications ou None, position dans les suppressions)
+
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    mode, change_seq, change_id, tombstone_seq, tombstone_id = decode_cursor(cursor, SYNC_CURSOR_SIZE)
+    try:
+        change_key = (int(change_seq), str(change_id)) if change_seq is not None else None
+        tombstone_key = (int(tombstone_seq), int(tombstone_id) if tombstone_id is not None else None)
+        return mode, change_key, tombstone_key
+    except (TypeError, ValueError):
+        raise ValueError("Curseur de pagination invalide")
+
+
+def _encode_sync_cursor(mode, change_key, tombstone_key):
+    change_seq, change_id = change_key or (None, None)
+    return encode_cursor(mode, change_seq, change_id, *tombstone_key)
+
+
+def get_transaction_changes(user_id, cursor=None, limit=None):
+    """
+    Renvoie les transactions créées, modifiées ou supprimées depuis un curseur
+
+    Sans curseur (première synchronisation), toutes les transactions du
+    mode actuel sont renvoyées, page par page. Un curseur émis dans un autre
+    mode, ou dont les suppressions suivantes ont déjà été purgées, provoque
+    aussi une synchronisation complète, signalée par "reset": le client
+    doit alors vider sa copie locale.
+
+    Le client applique "deleted" puis "changes", enregistre "next_cursor"
+    et recommence tant que "has_more" est vrai.
+
+    Le mode démo à la volée (DEMO_ENGINE='lazy') n'est pas synchronisable :
+    ses transactions générées ne sont pas stockées et n'ont donc ni numéro
+    de modification ni trace de suppression.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        cursor (str, optional): Curseur renvoyé par la synchronisation précédente
+        limit (int, optional): Nombre maximum de modifications et de suppressions par page
+
+    Returns:
+        dict: {"changes": [...], "deleted": [ids], "next_cursor": str,
+        "has_more": bool, "reset": bool}
+
+    Raises:
+        ValueError: Si l'ID utilisateur, la taille de page ou le curseur est
+        invalide, ou en mode démo à la volée
+    """
+    if not user_id:
+        raise ValueError("L'ID utilisateur est requis pour synchroniser les transactions")
+    if is_lazy_demo():
+        raise ValueError("La synchronisation n'est pas disponible en mode démo à la volée (DEMO_ENGINE='lazy')")
+
+    page_size = parse_page_size(limit)
+    mode = get_current_mode()
+    # Lu avant les transactions : une suppression validée ensuite a un numéro plus grand
+    last_seq, purged_seq = get_change_sequence(user_id)
+
+    reset = True
+    if cursor:
+        cursor_mode, change_key, tombstone_key = _decode_sync_cursor(cursor)
+        tombstone_seq, tombstone_id = tombstone_key
+        reset = (cursor_mode != mode
+                 or tombstone_seq < purged_seq
+                 or (tombstone_seq == purged_seq and tombstone_id is not None))
+    if reset:
+        # Copie locale vide : les suppressions antérieures ne la concernent pas
+        change_key, tombstone_key = None, (last_seq, None)
+
+    # Transactions créées ou modifiées, dans l'ordre de (changeSeq, id)
+    # Lignes sans numéro : écrites par la version précédente, pas encore reprises
+    filters = [Transaction.userId == user_id, mode_filter(), Transaction.changeSeq.is_not(None)]
+    if change_key:
+        filters.append(tuple_(Transaction.changeSeq, Transaction.id) > tuple_(*change_key))
+    statement = select(*TRANSACTION_API_COLUMNS, Transaction.changeSeq).where(*filters).order_by(
+        Transaction.changeSeq,
+        Transaction.id
+    ).limit(page_size + 1)
+    rows = db.session.execute(statement).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if rows:
+        change_key = (rows[-1].changeSeq, rows[-1].id)
+
+    # Transactions supprimées (sauf celles recréées depuis avec le même identifiant)
+    tombstone = TransactionTombstone
+    tombstone_seq, tombstone_id = tombstone_key
+    after = tombstone.changeSeq > tombstone_seq
+    if tombstone_id is not None:
+        after = or_(after, and_(tombstone.changeSeq == tombstone_seq, tombstone.id > tombstone_id))
+    statement = select(tombstone.id, tombstone.transactionId, tombstone.changeSeq).where(
+        tombstone.userId == user_id,
+        mode_filter(tombstone),
+        after,
+        ~exists().where(Transaction.id == tombstone.transactionId)
+    ).order_by(tombstone.changeSeq, tombstone.id).limit(page_size + 1)
+    deleted = db.session.execute(statement).all()
+    if len(deleted) > page_size:
+        has_more = True
+        deleted = deleted[:page_size]
+        tombstone_key = (deleted[-1].changeSeq, deleted[-1].id)
+    else:
+        # Toutes les suppressions jusqu'à last_seq sont lues : le curseur avance
+        # jusque-là, et une purge ultérieure ne le fera pas repartir de zéro
+        tombstone_key = (max([last_seq, tombstone_seq] + [row.changeSeq for row in deleted]), None)
+
+    return {
+        "changes": transactions_to_api(row[:-1] for row in rows),
+        "deleted": [row.transactionId for row in deleted],
+        "next_cursor": _encode_sync_cursor(mode, change_key, tombstone_key),
+        "has_more": has_more,
+        "reset": reset
+    }
@@ -1,15 +1,37 @@
 """
 Service de gestion des transactions (manuelles et de test)
 """
-from datetime import datetime, timedelta
-from services.mode_service import get_current_mode
+from datetime import date, datetime, timedelta
+from config import DEMO_ENGINE
+from services.mode_service import get_current_mode, is_lazy_demo
+from services.demo_service import demo_window, iter_generated_transactions, merge_transactions
 from utils.mock_data import get_mock_transactions
-from utils.transaction_validator import format_transaction
-from utils.category_utils import extract_category_data
-from db_models import db, Transaction
+from utils.transaction_validator import format_transaction, validate_transactions
+from utils.pagination import encode_cursor, decode_cursor, parse_page_size
+from services.bulk_writer import build_transaction_row, bulk_insert_transactions, DEFAULT_CHUNK_SIZE
+from services.rollup_service import record_deleted
+from services.sync_service import record_tombstones
+from utils.response_cache import bump_user_version
+from utils.single_flight import SingleFlight
+from db_models import db, Transaction, DemoGeneration, TRANSACTION_API_COLUMNS, transactions_to_api
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from itertools import islice
 import json
+import logging
+import time
 import uuid
 
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Nombre maximum de transactions acceptées par appel à add_transactions
+MAX_BATCH_SIZE = 50000
+
+# Générations de données de démo en cours dans le processus, par
+# (utilisateur, nombre de jours, mode)
+_demo_generation_flight = SingleFlight()
+
 def get_transactions(user_id, days=30):
     """
     Récupère les transactions pour un utilisateur.
@@ -28,12 +50,12 @@ def get_transactions(user_id, days=30):
     """
     # Vérifier que user_id n'est pas vide ou None
     if not user_id:
-        print("Erreur: Tentative d'accès aux transactions sans ID utilisateur")
+        logger.warning("Tentative d'accès aux transactions sans ID utilisateur")
         raise ValueError("L'ID utilisateur est requis pour accéder aux transactions")
     
     # Selon le mode, récupérer les transactions appropriées
     current_mode = get_current_mode()
-    print(f"Mode actuel: {current_mode}")
+    logger.debug("Lecture des transactions", extra={'mode': current_mode, 'days': days})
     
     if current_mode == 'demo':
         # Mode démo - récupérer les transactions de test
@@ -56,52 +78,277 @@ def get_demo_transactions(user_id, days=30):
     if not user_id:
         raise ValueError("L'ID utilisateur est requis")
     
-    # Vérifier si nous avons déjà des transactions de test pour cet utilisateur
-    transactions_count = Transaction.query.filter_by(
-        userId=user_id, 
-        isTestData=True
-    ).count()
+    if DEMO_ENGINE == 'lazy':
+        # Mois générés à la volée et transactions de démo manuelles, sans écriture
+        return list(_iter_lazy_demo_transactions(user_id, days))
     
-    if transactions_count == 0:
-        # Générer des transactions de test
-        mock_transactions = get_mock_transactions(days=days)
-        
-        # Stocker les transactions dans la base de données
-        for tx_data in mock_transactions:
-            category_id, subcategory_id = extract_category_data(tx_data)
-            
-            # Créer une nouvelle transaction
-            transaction = Transaction(
-                id=tx_data.get("id", f"tx_{uuid.uuid4().hex}"),
-                userId=user_id,
-                amount=tx_data.get("amount", 0),
-                date=tx_data.get("date", datetime.now().strftime("%Y-%m-%d")),
-                merchantName=tx_data.get("merchant_name", "Unknown"),
-                paymentChannel=tx_data.get("payment_channel", ""),
-                pending=tx_data.get("pending", False),
-                category=category_id,
-                subcategory=subcategory_id,
-                isTestData=True,
-                isManual=False
-            )
-            db.session.add(transaction)
+    generated = _ensure_demo_transactions(user_id, days)
+    if generated is not None:
+        # Première génération : l'utilisateur n'avait aucune donnée de test,
+        # les lignes renvoyées par l'insertion suffisent
+        return sorted(generated, key=lambda x: x["date"], reverse=True)
+    
+    # Récupérer toutes les transactions de test pour cet utilisateur,
+    # triées par date décroissante directement en SQL
+    statement = select(*TRANSACTION_API_COLUMNS).where(
+        *_transaction_filters(user_id, None, is_test_data=True)
+    ).order_by(Transaction.txDate.desc())
+    
+    # Convertir en format API
+    return transactions_to_api(db.session.execute(statement))
+
+def _ensure_demo_transactions(user_id, days=30):
+    """
+    Génère et stocke les transactions de test d'un utilisateur s'il n'en a pas encore
+    
+    Les appels concurrents identiques (double requête au chargement d'une
+    page) partagent une seule génération : dans le processus par regroupement
+    des appels, entre processus par le marqueur DemoGeneration. Le
+    regroupement porte sur l'utilisateur, le nombre de jours et le mode : un
+    appel pour une autre fenêtre ne reçoit pas les lignes générées pour la
+    première, il attend le marqueur puis lit les données stockées.
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        days (int): Nombre de jours de transactions à générer
         
+    Returns:
+        list: Transactions générées au format API (partagées entre les appels
+        regroupés, à ne pas modifier), ou None si l'utilisateur avait déjà des
+        transactions de test
+    """
+    key = (user_id, days, get_current_mode())
+    return _demo_generation_flight.do(key, lambda: _generate_demo_transactions(user_id, days))
+
+def _has_test_data(user_id):
+    """Indique si l'utilisateur a déjà des transactions de test stockées"""
+    return db.session.execute(
+        select(Transaction.id).where(
+            Transaction.userId == user_id,
+            Transaction.isTestData == True  # noqa: E712
+        ).limit(1)
+    ).first() is not None
+
+def _claim_demo_generation(user_id):
+    """
+    Pose le marqueur de génération de l'utilisateur dans la transaction courante
+    
+    Si un autre processus génère au même moment, l'insertion attend son commit
+    puis échoue sur la clé primaire. Un marqueur validé sans données de test
+    (supprimées depuis) est orphelin : il est retiré et l'appelant peut retenter.
+    
+    Returns:
+        bool: True si le marqueur est posé, False sinon
+    """
+    try:
+        db.session.execute(insert(DemoGeneration).values(userId=user_id, createdAt=datetime.utcnow()))
+        return True
+    except IntegrityError:
+        db.session.rollback()
+    
+    if not _has_test_data(user_id):
+        db.session.execute(delete(DemoGeneration).where(DemoGeneration.userId == user_id))
         db.session.commit()
-        print(f"Généré et stocké {len(mock_transactions)} transactions de test pour l'utilisateur {user_id}")
+    return False
+
+def _generate_demo_transactions(user_id, days=30):
+    """Génère et stocke les transactions de test (voir _ensure_demo_transactions)"""
+    # Vérifier si nous avons déjà des transactions de test pour cet utilisateur,
+    # puis réserver la génération (une seconde tentative après un marqueur orphelin)
+    for _ in range(2):
+        if _has_test_data(user_id):
+            return None
+        if _claim_demo_generation(user_id):
+            break
+    else:
+        return None
     
-    # Récupérer toutes les transactions de test pour cet utilisateur
-    transactions = Transaction.query.filter_by(
-        userId=user_id, 
-        isTestData=True
-    ).all()
+    # Générer des transactions de test
+    start = time.perf_counter()
+    mock_transactions = get_mock_transactions(days=days)
     
-    # Convertir en format API
-    result = [tx.to_dict() for tx in transactions]
+    # Stocker les transactions dans la base de données par INSERT multi-lignes,
+    # dans la même transaction que le marqueur
+    rows = [build_transaction_row(user_id, tx_data, is_test=True, is_manual=False)
+            for tx_data in mock_transactions]
+    try:
+        generated = bulk_insert_transactions(rows, returning=True)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
     
-    # Trier par date décroissante
-    result.sort(key=lambda x: x["date"], reverse=True)
+    bump_user_version(user_id)
+    logger.info("Transactions de test générées et stockées", extra={
+        'user_id': user_id,
+        'count': len(mock_transactions),
+        'duration_ms': round((time.perf_counter() - start) * 1000, 2)
+    })
     
-    return result
+    return generated
+
+def _iter_lazy_demo_transactions(user_id, days=30, before=None, limit=None):
+    """
+    Parcourt les transactions de démo du moteur 'lazy' sur les 'days' derniers jours
+    
+    Les mois générés (voir services.demo_service) sont fusionnés avec les
+    transactions de démo saisies manuellement, seules à être stockées.
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        days (int): Nombre de jours de transactions à récupérer
+        before (tuple, optional): Clé (date ISO, id) exclusive, pour la pagination
+        limit (int, optional): Nombre maximum de transactions stockées à lire
+        
+    Returns:
+        iterator: Transactions au format API, triées par (date, id) décroissants
+    """
+    filters = _transaction_filters(user_id, days, is_test_data=True, is_manual=True)
+    if before:
+        filters.append(
+            tuple_(Transaction.txDate, Transaction.id) < tuple_(date.fromisoformat(before[0]), before[1])
+        )
+    statement = select(*TRANSACTION_API_COLUMNS).where(*filters).order_by(
+        Transaction.txDate.desc(),
+        Transaction.id.desc()
+    ).limit(limit)
+    stored = transactions_to_api(db.session.execute(statement))
+    
+    start, end = demo_window(days)
+    return merge_transactions(iter_generated_transactions(user_id, start, end, before), stored)
+
+def get_transactions_page(user_id, days=30, limit=None, cursor=None):
+    """
+    Récupère une page de transactions selon le mode, par pagination keyset.
+    
+    Les pages sont triées par (txDate, id) décroissants. Le curseur encode la
+    clé de la dernière ligne renvoyée : la page suivante est lue avec
+    WHERE (txDate, id) < (:date, :id), sans OFFSET, pour un coût constant
+    quelle que soit la profondeur de la page.
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        days (int): Nombre de jours de transactions à récupérer (mode prod)
+        limit (int, optional): Taille de la page
+        cursor (str, optional): Curseur renvoyé par la page précédente
+        
+    Returns:
+        dict: {"transactions": [...], "next_cursor": str ou None}
+        
+    Raises:
+        ValueError: Si l'ID utilisateur, la taille de page ou le curseur est invalide
+    """
+    if not user_id:
+        raise ValueError("L'ID utilisateur est requis pour accéder aux transactions")
+    
+    page_size = parse_page_size(limit)
+    
+    if cursor:
+        cursor_date, cursor_id = decode_cursor(cursor, 2)
+        try:
+            cursor_date = date.fromisoformat(cursor_date)
+        except (TypeError, ValueError):
+            raise ValueError("Curseur de pagination invalide")
+    
+    if is_lazy_demo():
+        # Même clé de pagination sur la fusion des mois générés et des transactions stockées
+        before = (cursor_date.isoformat(), cursor_id) if cursor else None
+        transactions = list(islice(
+            _iter_lazy_demo_transactions(user_id, days, before, page_size + 1), page_size + 1
+        ))
+        next_cursor = None
+        if len(transactions) > page_size:
+            transactions = transactions[:page_size]
+            next_cursor = encode_cursor(transactions[-1]["date"], transactions[-1]["id"])
+        return {"transactions": transactions, "next_cursor": next_cursor}
+    
+    if get_current_mode() == 'demo':
+        _ensure_demo_transactions(user_id, days)
+    filters = _mode_filters(user_id, days)
+    
+    if cursor:
+        filters.append(
+            tuple_(Transaction.txDate, Transaction.id) < tuple_(cursor_date, cursor_id)
+        )
+    
+    # Lire une ligne de plus pour savoir s'il existe une page suivante
+    statement = select(*TRANSACTION_API_COLUMNS).where(*filters).order_by(
+        Transaction.txDate.desc(),
+        Transaction.id.desc()
+    ).limit(page_size + 1)
+    rows = db.session.execute(statement).all()
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.txDate.isoformat(), last.id)
+    
+    return {
+        "transactions": transactions_to_api(rows),
+        "next_cursor": next_cursor
+    }
+
+def iter_transactions(user_id, days=30, chunk_size=500):
+    """
+    Parcourt les transactions d'un utilisateur selon le mode, sans les charger
+    toutes en mémoire.
+    
+    Les lignes sont lues par paquets avec yield_per (curseur côté serveur sur
+    PostgreSQL) et converties au format API paquet par paquet.
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        days (int): Nombre de jours de transactions à récupérer (mode prod)
+        chunk_size (int): Nombre de lignes lues par paquet
+        
+    Yields:
+        dict: Transaction au format API, de la plus récente à la plus ancienne
+        
+    Raises:
+        ValueError: Si l'ID utilisateur n'est pas fourni
+    """
+    if not user_id:
+        raise ValueError("L'ID utilisateur est requis pour accéder aux transactions")
+    
+    if is_lazy_demo():
+        # Les mois sont générés au fil du parcours
+        yield from _iter_lazy_demo_transactions(user_id, days)
+        return
+    
+    if get_current_mode() == 'demo':
+        _ensure_demo_transactions(user_id, days)
+    
+    statement = select(*TRANSACTION_API_COLUMNS).where(
+        *_mode_filters(user_id, days)
+    ).order_by(Transaction.txDate.desc())
+    result = db.session.execute(statement, execution_options={"yield_per": chunk_size})
+    
+    for rows in result.partitions():
+        yield from transactions_to_api(rows)
+
+def get_transactions_version(user_id, days=30):
+    """
+    Calcule une empreinte peu coûteuse des transactions lues selon le mode
+    
+    Seuls COUNT(*) et MAX(updatedAt) sont calculés en base, sans charger de
+    ligne : toute insertion, modification ou suppression dans la fenêtre
+    change au moins l'une des deux valeurs.
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        days (int): Nombre de jours de transactions à récupérer (mode prod)
+        
+    Returns:
+        tuple: (nombre de transactions, date de dernière modification ou None)
+    """
+    statement = select(
+        func.count(Transaction.id),
+        func.max(Transaction.updatedAt)
+    ).where(*_mode_filters(user_id, days))
+    
+    count, last_updated = db.session.execute(statement).one()
+    return count, last_updated
 
 def get_manual_transactions(user_id, days=30):
     """
@@ -116,7 +363,7 @@ def get_manual_transactions(user_id, days=30):
     """
     return get_stored_transactions(user_id, days, is_manual=True)
 
-def get_stored_transactions(user_id, days=30, is_test_data=None, is_manual=None):
+def get_stored_transactions(user_id, days=30, is_test_data=None, is_manual=None, limit=None):
     """
     Récupère les transactions stockées en base de données
     
@@ -125,36 +372,71 @@ def get_stored_transactions(user_id, days=30, is_test_data=None, is_manual=None)
         days (int): Nombre de jours de transactions à récupérer
         is_test_data (bool): Filtre sur les données de test
         is_manual (bool): Filtre sur les transactions manuelles
+        limit (int, optional): Nombre maximum de transactions à retourner
         
     Returns:
-        list: Liste des transactions stockées
+        list: Liste des transactions stockées, de la plus récente à la plus ancienne
     """
-    # Calculer la date minimale
-    min_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-    
-    # Construire la requête
-    query = Transaction.query.filter(
-        Transaction.userId == user_id,
-        Transaction.date >= min_date
+    # Ne sélectionner que les colonnes de la forme API : pas d'instance ORM
+    # ni d'identity map, les lignes sont converties directement en dict
+    statement = select(*TRANSACTION_API_COLUMNS).where(
+        *_transaction_filters(user_id, days, is_test_data, is_manual)
     )
     
+    # Trier par date décroissante et limiter côté SQL (servi par les index)
+    statement = statement.order_by(Transaction.txDate.desc())
+    
+    if limit is not None:
+        statement = statement.limit(limit)
+    
+    # Exécuter la requête et convertir en format API
+    return transactions_to_api(db.session.execute(statement))
+
+def _transaction_filters(user_id, days=30, is_test_data=None, is_manual=None):
+    """
+    Construit les conditions de base sur les transactions d'un utilisateur
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        days (int): Nombre de jours à remonter (None pour ne pas filtrer sur la date)
+        is_test_data (bool): Filtre sur les données de test
+        is_manual (bool): Filtre sur les transactions manuelles
+        
+    Returns:
+        list: Conditions SQLAlchemy à passer à where()
+    """
+    # Lignes sans numéro de modification : écrites par la version précédente
+    # pendant un déploiement, lues une fois reprises par le prochain upgrade
+    filters = [Transaction.userId == user_id, Transaction.changeSeq.is_not(None)]
+    
+    if days is not None:
+        # Calculer la date minimale
+        min_date = (datetime.now() - timedelta(days=days)).date()
+        filters.append(Transaction.txDate >= min_date)
+    
     # Appliquer les filtres supplémentaires si spécifiés
     if is_test_data is not None:
-        query = query.filter(Transaction.isTestData == is_test_data)
+        filters.append(Transaction.isTestData == is_test_data)
     
     if is_manual is not None:
-        query = query.filter(Transaction.isManual == is_manual)
-    
-    # Exécuter la requête
-    transactions = query.all()
+        filters.append(Transaction.isManual == is_manual)
     
-    # Convertir en format API
-    result = [tx.to_dict() for tx in transactions]
-    
-    # Trier par date décroissante
-    result.sort(key=lambda x: x["date"], reverse=True)
+    return filters
+
+def _mode_filters(user_id, days=30):
+    """
+    Retourne les conditions des transactions lues selon le mode actuel
     
-    return result
+    En mode démo, toutes les données de test (sans filtre de date), ou avec
+    le moteur 'lazy' les seules données de test stockées, c'est-à-dire
+    saisies manuellement, des 'days' derniers jours ; en mode prod, les
+    transactions manuelles des 'days' derniers jours.
+    """
+    if is_lazy_demo():
+        return _transaction_filters(user_id, days, is_test_data=True, is_manual=True)
+    if get_current_mode() == 'demo':
+        return _transaction_filters(user_id, None, is_test_data=True)
+    return _transaction_filters(user_id, days, is_manual=True)
 
 def add_transaction(user_id, transaction_data, is_test=False, is_manual=True):
     """
@@ -179,28 +461,109 @@ def add_transaction(user_id, transaction_data, is_test=False, is_manual=True):
     # Valider et formater la transaction
     formatted_tx = format_transaction(transaction_data)
     
-    category_id, subcategory_id = extract_category_data(formatted_tx)
-    
-    # Créer une nouvelle transaction
-    transaction = Transaction(
-        id=formatted_tx.get("id"),
-        userId=user_id,
-        amount=formatted_tx.get("amount", 0),
-        date=formatted_tx.get("date"),
-        merchantName=formatted_tx.get("merchant_name"),
-        paymentChannel=formatted_tx.get("payment_channel"),
-        pending=formatted_tx.get("pending", False),
-        category=category_id,
-        subcategory=subcategory_id,
-        isTestData=is_test,
-        isManual=is_manual
-    )
+    # Créer une nouvelle transaction (date native et montant en centimes compris)
+    row = build_transaction_row(user_id, formatted_tx, is_test=is_test, is_manual=is_manual)
     
-    # Ajouter à la base de données
-    db.session.add(transaction)
+    # Ajouter à la base de données (anciennes colonnes et cumul mensuel compris)
+    transaction = bulk_insert_transactions([row], returning=True)[0]
     db.session.commit()
+    bump_user_version(user_id)
+    
+    return transaction
+
+def add_transactions(user_id, transactions_data, is_test=False, is_manual=True):
+    """
+    Ajoute un lot de transactions en une seule transaction de base de données
+    
+    Le lot est validé en une passe : les transactions invalides sont
+    signalées dans le résultat (avec toutes leurs erreurs) sans bloquer les autres, qui
+    sont insérées par paquets d'INSERT multi-lignes puis validées en un seul commit.
+    
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        transactions_data (list): Liste des transactions à ajouter
+        is_test (bool): Indique si ce sont des transactions de test
+        is_manual (bool): Indique si ce sont des transactions manuelles
+        
+    Returns:
+        list: Un résultat par transaction, dans l'ordre du lot, de la forme
+        {"index", "success", "transaction"} ou {"index", "success", "error"}
+        
+    Raises:
+        ValueError: Si l'ID utilisateur est absent ou si le lot est invalide
+    """
+    if not user_id:
+        raise ValueError("L'ID utilisateur est requis")
+    
+    if not isinstance(transactions_data, list):
+        raise ValueError("Les transactions doivent être fournies sous forme de liste")
+    
+    if len(transactions_data) > MAX_BATCH_SIZE:
+        raise ValueError(f"Un lot ne peut pas dépasser {MAX_BATCH_SIZE} transactions")
+    
+    results = [None] * len(transactions_data)
+    rows = []
+    row_indexes = {}
+    
+    # Créer un ID pour les transactions qui n'en ont pas
+    for transaction_data in transactions_data:
+        if isinstance(transaction_data, dict) and "id" not in transaction_data:
+            transaction_data["id"] = f"tx_{uuid.uuid4().hex}"
+    
+    # Valider tout le lot en une passe et écarter les identifiants en double
+    invalid = validate_transactions(transactions_data)
+    for index, transaction_data in enumerate(transactions_data):
+        if index in invalid:
+            error = "; ".join(str(e) for e in invalid[index])
+            results[index] = {"index": index, "success": False, "error": error}
+            continue
+        
+        if transaction_data["id"] in row_indexes:
+            results[index] = {"index": index, "success": False,
+                              "error": f"Identifiant '{transaction_data['id']}' en double dans le lot"}
+            continue
+        
+        try:
+            row = build_transaction_row(user_id, transaction_data, is_test=is_test, is_manual=is_manual)
+        except ValueError as e:
+            results[index] = {"index": index, "success": False, "error": str(e)}
+            continue
+        
+        row_indexes[transaction_data["id"]] = index
+        rows.append(row)
+    
+    # Écarter les identifiants déjà présents en base
+    existing_ids = set()
+    ids = list(row_indexes)
+    for start in range(0, len(ids), DEFAULT_CHUNK_SIZE):
+        chunk = ids[start:start + DEFAULT_CHUNK_SIZE]
+        existing_ids.update(db.session.scalars(
+            select(Transaction.id).where(Transaction.id.in_(chunk))
+        ))
+    
+    if existing_ids:
+        for tx_id in existing_ids:
+            index = row_indexes.pop(tx_id)
+            results[index] = {"index": index, "success": False,
+                              "error": f"Une transaction avec l'identifiant '{tx_id}' existe déjà"}
+        rows = [row for row in rows if row["id"] not in existing_ids]
+    
+    # Insérer toutes les transactions valides dans une seule transaction
+    try:
+        inserted = bulk_insert_transactions(rows, returning=True)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
     
-    return transaction.to_dict()
+    if inserted:
+        bump_user_version(user_id)
+    
+    for transaction in inserted:
+        index = row_indexes[transaction["id"]]
+        results[index] = {"index": index, "success": True, "transaction": transaction}
+    
+    return results
 
 def reset_demo_transactions(user_id, days=30):
     """
@@ -217,40 +580,42 @@ def reset_demo_transactions(user_id, days=30):
         raise ValueError("L'ID utilisateur est requis")
     
     # Supprimer toutes les transactions de test automatiques (non manuelles)
-    Transaction.query.filter_by(
-        userId=user_id, 
-        isTestData=True,
-        isManual=False
-    ).delete()
+    # après les avoir retirées du cumul mensuel et signalées à la synchronisation
+    generated_test_data = (
+        Transaction.userId == user_id,
+        Transaction.isTestData == True,  # noqa: E712
+        Transaction.isManual == False  # noqa: E712
+    )
+    record_deleted(*generated_test_data)
+    record_tombstones(*generated_test_data)
+    db.session.execute(delete(Transaction).where(*generated_test_data))
+    
+    if DEMO_ENGINE == 'lazy':
+        # Rien à régénérer : la suppression ne purge que les transactions laissées
+        # par le moteur 'stored', les mois générés à la volée sont déterministes
+        db.session.commit()
+        bump_user_version(user_id)
+        return list(_iter_lazy_demo_transactions(user_id, days))
     
     # Générer de nouvelles transactions de test
     mock_transactions = get_mock_transactions(days=days)
     
-    # Stocker les nouvelles transactions
-    for tx_data in mock_transactions:
-        # Extraire les données de catégorie
-        category_id = "other"
-        subcategory_id = "unknown"
-        category_id, subcategory_id = extract_category_data(tx_data)
-        
-        transaction = Transaction(
-            id=tx_data.get("id", f"tx_{uuid.uuid4().hex}"),
-            userId=user_id,
-            amount=tx_data.get("amount", 0),
-            date=tx_data.get("date", datetime.now().strftime("%Y-%m-%d")),
-            merchantName=tx_data.get("merchant_name", "Unknown"),
-            paymentChannel=tx_data.get("payment_channel", ""),
-            pending=tx_data.get("pending", False),
-            category=category_id,
-            subcategory=subcategory_id,
-            isTestData=True,
-            isManual=False
-            # Supprimer cette ligne
-            # rawData=json.dumps(tx_data)
-        )
-        db.session.add(transaction)
+    # Stocker les nouvelles transactions et récupérer leur forme API via RETURNING
+    rows = [build_transaction_row(user_id, tx_data, is_test=True, is_manual=False)
+            for tx_data in mock_transactions]
+    inserted = bulk_insert_transactions(rows, returning=True)
+    
+    # Seules les transactions de test manuelles restent à relire
+    manual_test_transactions = get_stored_transactions(user_id, days, is_test_data=True, is_manual=True)
     
     db.session.commit()
+    bump_user_version(user_id)
+    
+    # Conserver la même fenêtre que la lecture en base
+    min_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    result = [tx for tx in inserted if tx["date"] >= min_date] + manual_test_transactions
     
-    # Récupérer toutes les transactions de test (y compris les manuelles)
-    return get_stored_transactions(user_id, days, is_test_data=True)
\ No newline at end of file
+    # Trier par date décroissante
+    result.sort(key=lambda x: x["date"], reverse=True)
+    
+    return result
@@ -0,0 +1,71 @@
+"""
+Fixtures communes : une application sur une base SQLite temporaire par test.
+"""
+import os
+import sys
+
+# Lus par config.py à l'import : à fixer avant d'importer l'application
+os.environ.setdefault('RESPONSE_CACHE_BACKEND', 'none')
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('DB_AUTO_MIGRATE', 'false')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app import create_app
+from db_models import db, User
+from migrations import initialize_database
+from utils.auth_utils import invalidate_user
+from utils.category_registry import load_category_registry
+from utils.response_cache import set_response_cache
+
+USER_ID = 'user-test'
+
+
+def make_transaction(transaction_id, tx_date='2026-10-01', amount=-3.5, merchant_name='Café',
+                     category='foodAndDrink', subcategory='cafe'):
+    """Transaction valide au format de schemas/transaction.json"""
+    return {
+        "id": transaction_id,
+        "date": tx_date,
+        "merchant_name": merchant_name,
+        "amount": amount,
+        "category": {"id": category, "subcategory": {"id": subcategory}},
+        "payment_channel": "in store",
+        "pending": False,
+        "is_test_data": False
+    }
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'cashsense.db'}"
+
+
+@pytest.fixture
+def app(database_uri):
+    """Application sur une base vide, schéma créé et migré"""
+    app = create_app({'SQLALCHEMY_DATABASE_URI': database_uri, 'TESTING': True})
+    with app.app_context():
+        initialize_database()
+        # Caches du processus remplis par un test précédent, sur une autre base
+        load_category_registry()
+        invalidate_user()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+    set_response_cache(None)
+
+
+@pytest.fixture
+def user(app):
+    """Identifiant d'un utilisateur existant"""
+    db.session.add(User(id=USER_ID, name='Test'))
+    db.session.commit()
+    return USER_ID
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
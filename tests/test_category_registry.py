@@ -0,0 +1,28 @@
+"""
+Codes de catégorie : correspondance avec les paires (catégorie, sous-catégorie).
+"""
+from db_models import db, Category
+from utils.category_registry import DEFAULT_PAIR, decode_category, encode_category, schema_pairs
+
+
+def test_schema_pairs_are_registered_with_distinct_codes(app):
+    pairs = set(schema_pairs())
+    codes = {encode_category(*pair) for pair in pairs}
+
+    assert len(codes) == len(pairs)
+    for pair in pairs:
+        assert decode_category(encode_category(*pair)) == pair
+
+
+def test_unknown_pair_gets_the_default_code_without_registration(app):
+    count = db.session.scalar(db.select(db.func.count()).select_from(Category))
+
+    code = encode_category('legacyCategory', 'legacySubcategory')
+
+    assert code == encode_category(*DEFAULT_PAIR)
+    assert decode_category(code) == DEFAULT_PAIR
+    assert db.session.scalar(db.select(db.func.count()).select_from(Category)) == count
+
+
+def test_unknown_code_decodes_to_default_pair(app):
+    assert decode_category(32000) == DEFAULT_PAIR
@@ -0,0 +1,79 @@
+"""
+Compression des réponses (gzip/deflate négociés) et sérialisation JSON orjson/json.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import gzip
+import json
+import zlib
+
+import pytest
+
+from conftest import make_transaction
+from services.transaction_service import add_transactions
+from utils import serialization
+
+
+@pytest.fixture
+def url(user):
+    # Réponse au-delà de COMPRESSION_MIN_SIZE
+    add_transactions(user, [make_transaction(f'tx_{index}', amount=-index) for index in range(20)])
+    return f'/api/get_transactions?user_id={user}'
+
+
+@pytest.mark.parametrize('accept, encoding, decompress', [
+    ('gzip, deflate', 'gzip', gzip.decompress),
+    ('gzip;q=0, deflate', 'deflate', zlib.decompress),
+])
+def test_accepted_encoding_is_negotiated(client, url, accept, encoding, decompress):
+    plain = client.get(url)
+    response = client.get(url, headers={'Accept-Encoding': accept})
+
+    assert response.headers['Content-Encoding'] == encoding
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(decompress(response.data)) == plain.json
+
+
+def test_response_without_accept_encoding_is_left_plain(client, url):
+    response = client.get(url)
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_small_response_is_not_compressed(user, client):
+    response = client.get(f'/api/get_transactions?user_id={user}', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    # La réponse dépend quand même de l'en-tête pour un cache partagé
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_streamed_and_not_modified_responses_are_not_compressed(client, url):
+    streamed = client.get(url + '&stream=true', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in streamed.headers
+    assert len(json.loads(streamed.data)['transactions']) == 20
+
+    etag = client.get(url).headers['ETag']
+    not_modified = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert 'Content-Encoding' not in not_modified.headers
+
+
+def test_orjson_and_stdlib_give_the_same_json():
+    pytest.importorskip('orjson')
+    payload = {
+        'date': date(2026, 10, 18),
+        'datetime': datetime(2026, 10, 18, 12, 30, 5),
+        'amount': Decimal('12.34'),
+        'merchant': 'Café « Le Zinc »',
+        'nested': [{'pending': False, 'count': 3, 'missing': None}],
+    }
+
+    body = serialization._orjson_dumps(payload)
+
+    assert body == serialization._stdlib_dumps(payload)
+    assert json.loads(body) == {
+        'date': '2026-10-18', 'datetime': '2026-10-18T12:30:05', 'amount': 12.34,
+        'merchant': 'Café « Le Zinc »', 'nested': [{'pending': False, 'count': 3, 'missing': None}],
+    }
@@ -0,0 +1,91 @@
+"""
+Requêtes conditionnelles sur get_transactions : ETag, 304 vide sans lecture des transactions.
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from conftest import make_transaction
+from db_models import db
+from utils.response_cache import MemoryCacheBackend, ResponseCache, bump_user_version, set_response_cache
+
+
+@pytest.fixture
+def cache(app):
+    cache = ResponseCache(MemoryCacheBackend(10 * 1024 * 1024))
+    set_response_cache(cache)
+    return cache
+
+
+@contextmanager
+def recorded_statements():
+    """Requêtes SQL exécutées dans le bloc"""
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+def transactions_url(user):
+    return f'/api/get_transactions?user_id={user}'
+
+
+def test_matching_etag_returns_an_empty_304_without_query(user, client, cache):
+    client.post('/api/add_transaction', json={'user_id': user, 'transaction': make_transaction('tx_1')})
+    etag = client.get(transactions_url(user)).headers['ETag']
+
+    with recorded_statements() as statements:
+        response = client.get(transactions_url(user), headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+    assert statements == []
+
+
+def test_bump_user_version_changes_the_etag(user, client, cache):
+    etag = client.get(transactions_url(user)).headers['ETag']
+
+    bump_user_version(user)
+    response = client.get(transactions_url(user), headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_write_changes_the_etag(user, client, cache):
+    etag = client.get(transactions_url(user)).headers['ETag']
+
+    client.post('/api/add_transaction', json={'user_id': user, 'transaction': make_transaction('tx_1')})
+    response = client.get(transactions_url(user), headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert [transaction['id'] for transaction in response.json['transactions']] == ['tx_1']
+
+
+def test_without_cache_revalidation_reads_no_row(user, client):
+    client.post('/api/add_transaction', json={'user_id': user, 'transaction': make_transaction('tx_1')})
+    etag = client.get(transactions_url(user)).headers['ETag']
+
+    with recorded_statements() as statements:
+        response = client.get(transactions_url(user), headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    # Seule l'agrégation COUNT(*)/MAX(updatedAt) est exécutée
+    assert len(statements) == 1 and 'count(' in statements[0].lower()
+
+    client.post('/api/add_transaction', json={'user_id': user, 'transaction': make_transaction('tx_2')})
+    assert client.get(transactions_url(user), headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_streamed_response_has_no_etag(user, client, cache):
+    response = client.get(transactions_url(user) + '&stream=true')
+
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
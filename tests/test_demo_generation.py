@@ -0,0 +1,118 @@
+"""
+Génération des données de démo stockées : une seule génération par utilisateur.
+"""
+import threading
+import time
+
+import pytest
+
+from conftest import make_transaction
+from db_models import db, DemoGeneration, Transaction
+from services import transaction_service
+from services.mode_service import toggle_demo_mode
+from services.transaction_service import add_transaction, get_demo_transactions
+from utils.single_flight import SingleFlight
+
+
+@pytest.fixture
+def generations(user, monkeypatch):
+    """Nombre d'appels au générateur de données de démo (ralenti pour que les appels se chevauchent)"""
+    calls = []
+    get_mock_transactions = transaction_service.get_mock_transactions
+
+    def slow_generation(days):
+        calls.append(days)
+        time.sleep(0.2)
+        return get_mock_transactions(days=days)
+
+    monkeypatch.setattr(transaction_service, 'DEMO_ENGINE', 'stored')
+    monkeypatch.setattr(transaction_service, 'get_mock_transactions', slow_generation)
+    toggle_demo_mode(True)
+    return calls
+
+
+def stored_test_rows(user):
+    return db.session.scalar(
+        db.select(db.func.count()).select_from(Transaction).where(Transaction.userId == user, Transaction.isTestData)
+    )
+
+
+def run_concurrently(app, count, target):
+    """Lance target dans count threads démarrés ensemble, chacun dans son contexte d'application"""
+    barrier = threading.Barrier(count)
+    results, errors = [None] * count, []
+
+    def worker(index):
+        with app.app_context():
+            barrier.wait()
+            try:
+                results[index] = target()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    return results
+
+
+def test_concurrent_first_reads_generate_once(app, user, generations, monkeypatch):
+    flight = SingleFlight()
+    monkeypatch.setattr(transaction_service, '_demo_generation_flight', flight)
+
+    results = run_concurrently(app, 8, lambda: get_demo_transactions(user, 30))
+
+    assert generations == [30]
+    assert flight.stats()['executed'] == 1 and flight.stats()['shared'] == 7
+    assert all(result == results[0] for result in results)
+    assert stored_test_rows(user) == len(results[0])
+
+
+def test_marker_keeps_out_a_second_process(app, user, generations, monkeypatch):
+    # Sans regroupement dans le processus : seul le marqueur départage les appels, comme entre processus
+    monkeypatch.setattr(transaction_service, '_ensure_demo_transactions',
+                        transaction_service._generate_demo_transactions)
+
+    results = run_concurrently(app, 2, lambda: get_demo_transactions(user, 30))
+
+    assert generations == [30]
+    assert {tx['id'] for tx in results[0]} == {tx['id'] for tx in results[1]}
+    assert stored_test_rows(user) == len(results[0])
+
+
+def test_orphaned_marker_is_reclaimed(user, generations):
+    # Marqueur validé dont les données de test ont été supprimées depuis
+    db.session.add(DemoGeneration(userId=user))
+    db.session.commit()
+
+    transactions = get_demo_transactions(user, 30)
+
+    assert generations == [30]
+    assert transactions and stored_test_rows(user) == len(transactions)
+    assert db.session.get(DemoGeneration, user) is not None
+
+
+def test_generation_lost_to_another_process_reads_its_rows(user, generations, monkeypatch):
+    # L'autre processus valide marqueur et données entre la vérification et l'insertion du marqueur
+    add_transaction(user, make_transaction('tx_demo'), is_test=True, is_manual=False)
+    db.session.add(DemoGeneration(userId=user))
+    db.session.commit()
+    has_test_data = transaction_service._has_test_data
+    checks = []
+
+    def stale_check(user_id):
+        checks.append(user_id)
+        return len(checks) > 1 and has_test_data(user_id)
+
+    monkeypatch.setattr(transaction_service, '_has_test_data', stale_check)
+
+    transactions = get_demo_transactions(user, 30)
+
+    assert generations == []
+    assert [transaction['id'] for transaction in transactions] == ['tx_demo']
+    assert db.session.get(DemoGeneration, user) is not None
@@ -0,0 +1,60 @@
+"""
+Moteur de démo 'lazy' : mois déterministes, même sortie que le moteur 'stored'.
+"""
+from datetime import datetime
+
+import pytest
+
+from conftest import make_transaction
+from db_models import db
+from services import demo_service, transaction_service
+from services.bulk_writer import build_transaction_row, bulk_insert_transactions
+from services.demo_service import SORT_KEY, demo_window, generate_demo_month, iter_generated_transactions
+from services.mode_service import toggle_demo_mode
+from services.transaction_service import add_transaction, get_demo_transactions
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 10, 18, 12, 0)
+
+
+@pytest.fixture
+def frozen_today(monkeypatch):
+    monkeypatch.setattr(demo_service, 'datetime', FrozenDatetime)
+    monkeypatch.setattr(transaction_service, 'datetime', FrozenDatetime)
+
+
+def test_month_is_identical_across_calls_and_after_cache_clear(app):
+    month = generate_demo_month('user-a', 2026, 3)
+    assert generate_demo_month('user-a', 2026, 3) is month
+
+    generate_demo_month.cache_clear()
+
+    assert generate_demo_month('user-a', 2026, 3) == month
+    assert len(month) >= demo_service.MONTHLY_MIN_COUNT
+    assert list(month) == sorted(month, key=SORT_KEY, reverse=True)
+    assert generate_demo_month('user-b', 2026, 3) != month
+    assert generate_demo_month('user-a', 2026, 4) != month
+
+
+def test_lazy_output_matches_the_stored_engine(user, frozen_today, monkeypatch):
+    toggle_demo_mode(True)
+    start, end = demo_window(60)
+    # Moteur 'stored' : les mêmes mois générés, stockés en base
+    bulk_insert_transactions([
+        build_transaction_row(user, transaction, is_test=True, is_manual=False)
+        for transaction in iter_generated_transactions(user, start, end)
+    ])
+    db.session.commit()
+    add_transaction(user, make_transaction('tx_manual', tx_date='2026-10-10'), is_test=True, is_manual=True)
+
+    monkeypatch.setattr(transaction_service, 'DEMO_ENGINE', 'stored')
+    stored = get_demo_transactions(user, 60)
+    generate_demo_month.cache_clear()
+    monkeypatch.setattr(transaction_service, 'DEMO_ENGINE', 'lazy')
+    lazy = get_demo_transactions(user, 60)
+
+    assert len(lazy) > demo_service.MONTHLY_MIN_COUNT and 'tx_manual' in {tx['id'] for tx in lazy}
+    assert lazy == sorted(stored, key=SORT_KEY, reverse=True)
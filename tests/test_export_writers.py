@@ -0,0 +1,60 @@
+"""
+Écrivains d'export CSV et XLSX (sans bibliothèque de tableur : archive relue avec zipfile).
+"""
+import csv
+import io
+import zipfile
+from datetime import date
+from xml.etree import ElementTree
+
+from utils import export_writers
+from utils.export_writers import iter_csv, iter_xlsx
+
+COLUMNS = (('date', 'date'), ('merchant', 'text'), ('amount', 'money'), ('pending', 'bool'))
+ROWS = [
+    (date(2026, 10, 1), 'Café', -350, False),
+    (date(2026, 10, 2), '=HYPERLINK("x")', 120000, True),
+    (date(2026, 10, 3), None, 5, False),
+]
+NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def test_csv_has_bom_and_neutralizes_formulas():
+    content = b''.join(iter_csv(COLUMNS, ROWS, batch_size=2)).decode('utf-8')
+
+    assert content.startswith('\ufeff')
+    assert list(csv.reader(io.StringIO(content[1:]))) == [
+        ['date', 'merchant', 'amount', 'pending'],
+        ['2026-10-01', 'Café', '-3.50', 'false'],
+        ['2026-10-02', '\'=HYPERLINK("x")', '1200.00', 'true'],
+        ['2026-10-03', '', '0.05', 'false'],
+    ]
+
+
+def read_sheets(content):
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        assert archive.testzip() is None
+        names = sorted(name for name in archive.namelist() if name.startswith('xl/worksheets/'))
+        return [ElementTree.fromstring(archive.read(name)) for name in names]
+
+
+def test_xlsx_is_a_valid_workbook():
+    sheets = read_sheets(b''.join(iter_xlsx(COLUMNS, ROWS, batch_size=2)))
+
+    assert len(sheets) == 1
+    rows = sheets[0].findall('.//s:row', NS)
+    assert len(rows) == 1 + len(ROWS)
+    first = rows[1].findall('s:c', NS)
+    # Date en numéro de série Excel, montant en unités, texte en ligne
+    assert first[0].find('s:v', NS).text == str((date(2026, 10, 1) - date(1899, 12, 30)).days)
+    assert first[1].find('s:is/s:t', NS).text == 'Café'
+    assert first[2].find('s:v', NS).text == '-3.5'
+
+
+def test_xlsx_continues_on_a_new_sheet_when_full(monkeypatch):
+    monkeypatch.setattr(export_writers, 'XLSX_MAX_ROWS', 3)
+
+    sheets = read_sheets(b''.join(iter_xlsx(COLUMNS, ROWS * 2)))
+
+    # En-tête répété sur chaque feuille, 2 lignes de données par feuille
+    assert [len(sheet.findall('.//s:row', NS)) for sheet in sheets] == [3, 3, 3]
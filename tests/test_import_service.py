@@ -0,0 +1,70 @@
+"""
+Import de relevés : empreinte, déduplication et codes HTTP des fichiers invalides.
+"""
+import io
+from datetime import date
+
+import pytest
+
+from db_models import db, Transaction
+from services.import_service import import_hash, import_transactions
+
+SORTED_CSV = (
+    "date;montant;libelle\n"
+    "2024-01-01;-3,50;Cafe\n"
+    "2024-01-01;-3,50;Cafe\n"
+    "2024-01-02;-3,50;Cafe\n"
+)
+# Mêmes lignes, la deuxième occurrence du 1er janvier après celle du 2
+UNSORTED_CSV = (
+    "date;montant;libelle\n"
+    "2024-01-01;-3,50;Cafe\n"
+    "2024-01-02;-3,50;Cafe\n"
+    "2024-01-01;-3,50;Cafe\n"
+)
+
+
+def run_import(user_id, content, **kwargs):
+    return import_transactions(user_id, io.BytesIO(content.encode('utf-8')), import_format='csv', **kwargs)
+
+
+def test_import_hash_ignores_merchant_case():
+    day = date(2024, 1, 1)
+    assert import_hash('u', day, -350, 'Cafe', '0') == import_hash('u', day, -350, 'CAFE', '0')
+    assert import_hash('u', day, -350, 'Cafe', '0') != import_hash('u', day, -350, 'Cafe', '1')
+    assert import_hash('u', day, -350, 'Cafe', '0') != import_hash('v', day, -350, 'Cafe', '0')
+
+
+def test_identical_rows_of_the_same_day_are_kept(user):
+    job = run_import(user, SORTED_CSV)
+
+    assert job['status'] == 'completed'
+    assert (job['inserted'], job['duplicates']) == (3, 0)
+    # Convention bancaire : un débit devient une dépense positive
+    assert {row.amountCents for row in db.session.scalars(db.select(Transaction))} == {350}
+
+
+def test_reimport_of_unsorted_file_is_deduplicated(user):
+    run_import(user, SORTED_CSV)
+    job = run_import(user, UNSORTED_CSV)
+
+    assert (job['inserted'], job['duplicates']) == (0, 3)
+
+
+def test_unknown_format_is_a_parameter_error(user):
+    with pytest.raises(ValueError):
+        import_transactions(user, io.BytesIO(b''), import_format='xls')
+
+
+def test_invalid_file_content_is_rejected_with_422(user, client):
+    oversized = 'date,amount,label\n2024-01-01,1,"' + 'x' * 200000 + '"\n'
+    response = client.post(f'/api/import?user_id={user}&format=csv', data=oversized.encode('utf-8'))
+
+    assert response.status_code == 422
+    assert response.json['status'] == 'rejected'
+
+
+def test_missing_header_is_rejected_with_400(user, client):
+    response = client.post(f'/api/import?user_id={user}&format=csv', data=b'foo;bar\n1;2\n')
+
+    assert response.status_code == 400
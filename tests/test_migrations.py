@@ -0,0 +1,214 @@
+"""
+Migrations d'une base existante : backfill rejoué, quarantaine, écriture des anciennes colonnes et contraction.
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+
+import migrations
+from app import create_app
+from conftest import make_transaction
+from db_models import db, MonthlyCategoryTotal, Transaction, TransactionQuarantine
+from migrations import (
+    LEGACY_TRANSACTION, _backfill_in_chunks, contract_legacy_columns, initialize_database,
+    quarantine_invalid_transactions, upgrade
+)
+from services import bulk_writer
+from services.rollup_service import verify_rollup
+from services.sync_service import get_transaction_changes
+from services.transaction_service import add_transaction
+from utils.auth_utils import invalidate_user
+from utils.category_registry import decode_category, load_category_registry
+
+# Schéma d'avant les colonnes natives (date en texte, montant flottant, catégories en chaînes)
+LEGACY_SCHEMA = [
+    '''CREATE TABLE "User" (id VARCHAR(36) NOT NULL, name VARCHAR(100), email VARCHAR(255),
+       "emailVerified" DATETIME, password VARCHAR(255), image VARCHAR(255), "createdAt" DATETIME,
+       "updatedAt" DATETIME, PRIMARY KEY (id), UNIQUE (email))''',
+    '''CREATE TABLE "Transaction" (id VARCHAR(36) NOT NULL, date VARCHAR(10) NOT NULL,
+       "merchantName" VARCHAR(100), amount FLOAT NOT NULL, "paymentChannel" VARCHAR(50), pending BOOLEAN,
+       "userId" VARCHAR(36) NOT NULL, category VARCHAR(100), subcategory VARCHAR(100), "isTestData" BOOLEAN,
+       "isManual" BOOLEAN, "rawData" TEXT, "createdAt" DATETIME, "updatedAt" DATETIME, PRIMARY KEY (id),
+       FOREIGN KEY("userId") REFERENCES "User" (id))''',
+    'CREATE INDEX "ix_Transaction_user_date" ON "Transaction" ("userId", date)',
+]
+
+LEGACY_INSERT = (
+    "INSERT INTO \"Transaction\" (id, date, \"merchantName\", amount, category, subcategory, \"userId\", "
+    "\"isTestData\", \"isManual\", \"createdAt\", \"updatedAt\") "
+    "VALUES (?, ?, ?, ?, ?, ?, 'u1', 0, 1, '2026-09-01', '2026-09-01')"
+)
+
+LEGACY_ROWS = [
+    ('t1', '2026-09-03', 'Cafe', 3.5, 'foodAndDrink', 'cafe'),
+    ('t2', 'n/a', 'Illisible', 12.0, 'shopping', 'books'),
+    ('t3', '2026-09-10', 'Salaire', -2000.0, 'income', 'salary'),
+    ('t4', '2026-09-11', 'Ancienne catégorie', 5.0, 'legacyCategory', None),
+]
+
+
+@pytest.fixture
+def legacy_path(tmp_path):
+    path = tmp_path / 'legacy.db'
+    conn = sqlite3.connect(path)
+    for statement in LEGACY_SCHEMA:
+        conn.execute(statement)
+    conn.execute("INSERT INTO \"User\" (id, name) VALUES ('u1', 'Ancien')")
+    conn.executemany(LEGACY_INSERT, LEGACY_ROWS)
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def legacy_app(legacy_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{legacy_path}', 'TESTING': True})
+    with app.app_context():
+        invalidate_user()
+        initialize_database()
+        load_category_registry()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def columns_of(path, table_name):
+    with sqlite3.connect(path) as conn:
+        return {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+
+
+def write_as_old_worker(path, *rows):
+    """Écrit des lignes comme la version précédente : anciennes colonnes seulement"""
+    with sqlite3.connect(path) as conn:
+        conn.executemany(LEGACY_INSERT, rows)
+
+
+@pytest.fixture
+def legacy_writes_off(monkeypatch):
+    monkeypatch.setattr(migrations, 'LEGACY_TRANSACTION_WRITES', False)
+    monkeypatch.setattr(bulk_writer, 'LEGACY_TRANSACTION_WRITES', False)
+
+
+def test_upgrade_backfills_without_contracting(legacy_app, legacy_path):
+    quarantined = db.session.get(TransactionQuarantine, 't2')
+    assert quarantined.reason == 'date'
+
+    # Anciennes colonnes conservées pour les workers de la version précédente
+    assert {'date', 'amount', 'category', 'subcategory', 'txDate', 'amountCents', 'categoryCode',
+            'changeSeq'} <= columns_of(legacy_path, 'Transaction')
+
+    rows = {row.id: row for row in db.session.scalars(db.select(Transaction))}
+    assert set(rows) == {'t1', 't3', 't4'}
+    assert rows['t1'].amountCents == 350 and rows['t1'].txDate.isoformat() == '2026-09-03'
+    assert decode_category(rows['t4'].categoryCode) == ('legacyCategory', 'unknown')
+    assert {row.changeSeq for row in rows.values()} == {0}
+
+    # Cumul construit sans la ligne écartée, synchronisation possible
+    assert db.session.scalar(db.select(db.func.count()).select_from(MonthlyCategoryTotal)) > 0
+    assert verify_rollup() == []
+    assert {change['id'] for change in get_transaction_changes('u1')['changes']} == {'t1', 't3', 't4'}
+
+
+def test_new_writes_fill_the_legacy_columns(legacy_app, legacy_path):
+    add_transaction('u1', make_transaction('tx_new', tx_date='2026-09-20', amount=-12.5,
+                                           category='foodAndDrink', subcategory='cafe'))
+
+    with sqlite3.connect(legacy_path) as conn:
+        row = conn.execute(
+            'SELECT date, amount, category, subcategory FROM "Transaction" WHERE id = \'tx_new\''
+        ).fetchone()
+    assert row == ('2026-09-20', -12.5, 'foodAndDrink', 'cafe')
+
+
+def test_rows_written_by_old_workers_are_picked_up(legacy_app, legacy_path):
+    cursor = get_transaction_changes('u1')['next_cursor']
+    write_as_old_worker(legacy_path, ('t0', '2026-09-15', 'Ancien worker', 7.25, 'shopping', 'books'))
+    assert 't0' not in {tx['id'] for tx in get_transaction_changes('u1')['changes']}
+
+    result = upgrade()
+
+    assert result['legacy_sequenced'] == 1
+    row = db.session.get(Transaction, 't0')
+    assert row.amountCents == 725 and row.changeSeq > 0
+    assert [tx['id'] for tx in get_transaction_changes('u1', cursor=cursor)['changes']] == ['t0']
+    assert verify_rollup() == []
+
+
+def test_quarantine_keeps_rows_that_parse(legacy_app, legacy_path):
+    # Écrites après le backfill : la quarantaine le rejoue d'abord
+    write_as_old_worker(legacy_path,
+                        ('t5', '2026-09-12', 'Lisible', 1.0, 'shopping', 'books'),
+                        ('t6', '12/09/2026', 'Illisible', 1.0, 'shopping', 'books'))
+
+    assert quarantine_invalid_transactions() == 1
+
+    assert db.session.get(Transaction, 't5').txDate.isoformat() == '2026-09-12'
+    assert db.session.get(TransactionQuarantine, 't6').reason == 'date'
+
+
+def test_backfill_revisits_rows_inserted_behind_the_scan(legacy_app, legacy_path):
+    write_as_old_worker(legacy_path, *[(f't9{i}', '2026-09-15', 'Ancien worker', 1.0, 'shopping', 'books')
+                                       for i in range(3)])
+    columns = LEGACY_TRANSACTION.c
+    inserted = []
+
+    def insert_behind(conn, cursor, statement, parameters, context, executemany):
+        # Ligne insérée pendant le passage, avant la position courante
+        if statement.startswith('UPDATE') and not inserted:
+            inserted.append(True)
+            cursor.execute(LEGACY_INSERT, ('t00', '2026-09-16', 'Derrière', 2.0, 'shopping', 'books'))
+
+    event.listen(db.engine, 'after_cursor_execute', insert_behind)
+    try:
+        updated = _backfill_in_chunks(db.engine, LEGACY_TRANSACTION, columns.txDate.is_(None),
+                                      {'txDate': db.func.date(columns.date)}, chunk_size=1)
+    finally:
+        event.remove(db.engine, 'after_cursor_execute', insert_behind)
+
+    assert updated == 4
+    assert db.session.get(Transaction, 't00').txDate.isoformat() == '2026-09-16'
+
+
+def test_upgrade_is_idempotent(legacy_app):
+    result = upgrade()
+
+    assert result['data_migrations'] == {} and result['quarantined'] == 0
+    assert result['legacy_backfilled'] == 0 and result['legacy_sequenced'] == 0
+    assert result['columns_added'] == [] and result['indexes_created'] == []
+
+
+def test_contract_refuses_while_legacy_columns_are_written(legacy_app, legacy_path):
+    with pytest.raises(RuntimeError):
+        contract_legacy_columns()
+
+    assert {'date', 'amount', 'category', 'subcategory'} <= columns_of(legacy_path, 'Transaction')
+
+
+def test_contract_drops_the_legacy_columns(legacy_app, legacy_path, legacy_writes_off):
+    write_as_old_worker(legacy_path, ('t7', '2026-09-18', 'Dernier ancien', 3.0, 'shopping', 'books'))
+
+    assert set(contract_legacy_columns()) == {'date', 'amount', 'category', 'subcategory'}
+
+    assert not {'date', 'amount', 'category', 'subcategory'} & columns_of(legacy_path, 'Transaction')
+    assert db.session.get(Transaction, 't7').changeSeq > 0
+    # Les écritures suivantes n'utilisent plus les colonnes supprimées
+    add_transaction('u1', make_transaction('tx_after', tx_date='2026-09-21'))
+    assert verify_rollup() == []
+
+
+def test_contract_refuses_a_mismatched_backfill(legacy_app, legacy_path, legacy_writes_off):
+    with sqlite3.connect(legacy_path) as conn:
+        conn.execute("UPDATE \"Transaction\" SET \"amountCents\" = 999 WHERE id = 't1'")
+
+    with pytest.raises(RuntimeError):
+        contract_legacy_columns()
+
+    assert {'date', 'amount'} <= columns_of(legacy_path, 'Transaction')
+
+
+def test_fresh_database_needs_no_migration(app):
+    result = upgrade()
+
+    assert result['data_migrations'] == {}
+    assert result['columns_added'] == [] and result['legacy_backfilled'] == 0
@@ -0,0 +1,43 @@
+"""
+Curseurs opaques et pagination keyset de get_transactions_page.
+"""
+import pytest
+
+from conftest import make_transaction
+from services.transaction_service import add_transactions, get_transactions_page
+from utils.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, parse_page_size
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('2026-10-01', 'tx_1', None, 42)
+    assert decode_cursor(cursor, 4) == ('2026-10-01', 'tx_1', None, 42)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not-base64!', encode_cursor('a', 'b', 'c'), encode_cursor({'a': 1})])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+def test_page_size_is_validated_and_capped():
+    assert parse_page_size(MAX_PAGE_SIZE * 10) == MAX_PAGE_SIZE
+    for limit in (0, -1, True, '10'):
+        with pytest.raises(ValueError):
+            parse_page_size(limit)
+
+
+def test_pages_cover_every_transaction_once(user):
+    # Plusieurs transactions le même jour : l'id départage les lignes de la clé (txDate, id)
+    add_transactions(user, [
+        make_transaction(f'tx_{i:02d}', tx_date=f'2026-10-{1 + i // 3:02d}') for i in range(10)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        page = get_transactions_page(user, days=3650, limit=3, cursor=cursor)
+        seen.extend(transaction['id'] for transaction in page['transactions'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == [f'tx_{i:02d}' for i in reversed(range(10))]
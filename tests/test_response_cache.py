@@ -0,0 +1,58 @@
+"""
+Cache de réponses : invalidation à l'écriture et totaux du backend SQLite.
+"""
+import pytest
+
+from conftest import make_transaction
+from utils.response_cache import (
+    MemoryCacheBackend, ResponseCache, SQLiteCacheBackend, default_cache_path, set_response_cache
+)
+
+
+@pytest.fixture
+def cache(app):
+    cache = ResponseCache(MemoryCacheBackend(10 * 1024 * 1024))
+    set_response_cache(cache)
+    return cache
+
+
+def test_cached_response_is_served_until_invalidated(user, client, cache):
+    url = f'/api/get_transactions?user_id={user}'
+    client.get(url)
+    client.get(url)
+    assert cache.stats()['hits'] == 1
+
+    client.post('/api/add_transaction', json={'user_id': user, 'transaction': make_transaction('tx_1')})
+    assert len(client.get(url).json['transactions']) == 1
+
+
+def test_sqlite_backend_keeps_totals_and_evicts(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.db'), max_bytes=100, access_resolution=0)
+    backend.set('a', b'x' * 40)
+    backend.set('b', b'x' * 40)
+    # Remplacement : la taille est corrigée, pas ajoutée
+    backend.set('a', b'x' * 30)
+    assert backend.stats() == {'entries': 2, 'bytes': 70}
+
+    backend.get('a')
+    backend.set('c', b'x' * 40)
+
+    # 'b', lue le moins récemment, est évincée pour repasser sous 100 octets
+    assert backend.get('b') is None
+    assert backend.stats() == {'entries': 2, 'bytes': 70}
+    assert backend.get('a') is not None and backend.get('c') is not None
+
+
+def test_sqlite_backend_versions(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.db'), max_bytes=100)
+    assert backend.get_version('u') == 0
+    backend.bump_version('u')
+    backend.bump_version('u')
+    assert backend.get_version('u') == 2
+
+
+def test_default_cache_path_depends_on_the_database(app):
+    path = default_cache_path()
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:////tmp/another.db'
+
+    assert default_cache_path() != path
@@ -0,0 +1,41 @@
+"""
+Cumul mensuel : maintenu à chaque écriture, identique au calcul sur les transactions.
+"""
+from conftest import make_transaction
+from db_models import db, MonthlyCategoryTotal
+from services.mode_service import toggle_demo_mode
+from services.rollup_service import rebuild_rollup, verify_rollup
+from services.transaction_service import add_transaction, add_transactions, reset_demo_transactions
+
+
+def test_rollup_follows_writes(user):
+    add_transaction(user, make_transaction('tx_1', amount=-3.5))
+    add_transactions(user, [
+        make_transaction('tx_2', amount=-10),
+        make_transaction('tx_3', amount=2000, category='income', subcategory='salary'),
+    ])
+    toggle_demo_mode(True)
+    reset_demo_transactions(user, days=60)
+    reset_demo_transactions(user, days=60)
+
+    assert verify_rollup(user) == []
+
+
+def test_manual_and_generated_totals_are_kept_apart(user):
+    toggle_demo_mode(True)
+    reset_demo_transactions(user, days=30)
+    add_transaction(user, make_transaction('tx_1', amount=-3.5), is_test=True, is_manual=True)
+
+    flags = set(db.session.execute(db.select(MonthlyCategoryTotal.isTestData, MonthlyCategoryTotal.isManual)))
+    assert flags == {(True, False), (True, True)}
+
+
+def test_rebuild_repairs_a_drifted_rollup(user):
+    add_transaction(user, make_transaction('tx_1', amount=-3.5))
+    db.session.execute(db.update(MonthlyCategoryTotal).values(expensesCents=1))
+    db.session.commit()
+    assert verify_rollup(user) != []
+
+    rebuild_rollup(user)
+
+    assert verify_rollup(user) == []
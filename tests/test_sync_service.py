@@ -0,0 +1,117 @@
+"""
+Synchronisation incrémentale : curseur sur le numéro de modification, suppressions et purge.
+"""
+import pytest
+
+from conftest import make_transaction
+from db_models import db, ChangeSequence, Transaction
+from services import mode_service
+from services.change_sequence import next_change_seq
+from services.mode_service import toggle_demo_mode
+from services.sync_service import get_transaction_changes, purge_tombstones
+from services.transaction_service import add_transaction, reset_demo_transactions
+
+
+def sync_all(user_id, cursor=None, limit=1000):
+    """Enchaîne les pages d'une synchronisation ; renvoie les pages et le dernier curseur"""
+    pages = []
+    while True:
+        page = get_transaction_changes(user_id, cursor, limit)
+        pages.append(page)
+        cursor = page['next_cursor']
+        if not page['has_more']:
+            return pages, cursor
+
+
+def test_first_sync_returns_everything_and_resets(user):
+    add_transaction(user, make_transaction('tx_1'))
+    add_transaction(user, make_transaction('tx_2'))
+
+    pages, _ = sync_all(user, limit=1)
+
+    assert pages[0]['reset'] is True
+    assert [change['id'] for page in pages for change in page['changes']] == ['tx_1', 'tx_2']
+
+
+def test_incremental_sync_returns_only_new_writes(user):
+    add_transaction(user, make_transaction('tx_1'))
+    _, cursor = sync_all(user)
+
+    add_transaction(user, make_transaction('tx_2'))
+    page = get_transaction_changes(user, cursor)
+
+    assert page['reset'] is False
+    assert [change['id'] for change in page['changes']] == ['tx_2']
+    assert get_transaction_changes(user, page['next_cursor'])['changes'] == []
+
+
+def test_write_is_visible_as_soon_as_committed(user):
+    # Pas de fenêtre d'attente : une écriture validée est renvoyée immédiatement
+    _, cursor = sync_all(user)
+    add_transaction(user, make_transaction('tx_1'))
+
+    assert [change['id'] for change in get_transaction_changes(user, cursor)['changes']] == ['tx_1']
+
+
+def test_rolled_back_write_does_not_consume_a_number(user):
+    # Le numéro est pris dans la transaction de l'écriture : annulé avec elle
+    _, cursor = sync_all(user)
+    seq = next_change_seq(user)
+    db.session.rollback()
+
+    add_transaction(user, make_transaction('tx_1'))
+    row = db.session.get(Transaction, 'tx_1')
+
+    assert row.changeSeq == seq
+    assert [change['id'] for change in get_transaction_changes(user, cursor)['changes']] == ['tx_1']
+
+
+def test_demo_reset_reports_deleted_transactions(user):
+    toggle_demo_mode(True)
+    reset_demo_transactions(user, days=30)
+    pages, cursor = sync_all(user)
+    first_ids = {change['id'] for page in pages for change in page['changes']}
+
+    reset_demo_transactions(user, days=30)
+    pages, _ = sync_all(user, cursor)
+
+    assert pages[0]['reset'] is False
+    assert {deleted for page in pages for deleted in page['deleted']} == first_ids
+    assert len([change for page in pages for change in page['changes']]) == len(first_ids)
+
+
+def test_mode_change_resets_the_client(user):
+    _, cursor = sync_all(user)
+    toggle_demo_mode(True)
+
+    assert get_transaction_changes(user, cursor)['reset'] is True
+
+
+def test_purge_only_resets_cursors_that_missed_deletions(user):
+    toggle_demo_mode(True)
+    reset_demo_transactions(user, days=30)
+    _, stale_cursor = sync_all(user)
+    reset_demo_transactions(user, days=30)
+    _, current_cursor = sync_all(user, stale_cursor)
+
+    assert purge_tombstones(retention_days=-1) > 0
+    assert db.session.get(ChangeSequence, user).purgedSeq > 0
+
+    assert get_transaction_changes(user, current_cursor)['reset'] is False
+    assert get_transaction_changes(user, stale_cursor)['reset'] is True
+
+
+def test_invalid_cursor_is_rejected(user):
+    with pytest.raises(ValueError):
+        get_transaction_changes(user, 'not-a-cursor')
+
+
+def test_lazy_demo_mode_is_refused(user, monkeypatch, client):
+    monkeypatch.setattr(mode_service, 'DEMO_ENGINE', 'lazy')
+    toggle_demo_mode(True)
+
+    with pytest.raises(ValueError):
+        get_transaction_changes(user)
+
+    response = client.get(f'/api/sync?user_id={user}')
+    assert response.status_code == 400
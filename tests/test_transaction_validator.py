@@ -0,0 +1,101 @@
+"""
+Validation des transactions : erreurs typées, résultat par lot et chemin rapide.
+"""
+import pytest
+
+from conftest import make_transaction
+from utils.transaction_validator import (
+    InvalidTypeError, MissingFieldError, TransactionValidationError, UnknownCategoryError,
+    UnknownSubcategoryError, compile_validator, validate_transactions
+)
+
+TRANSACTION_SCHEMA = {
+    "id": "string",
+    "amount": "number",
+    "pending": "boolean",
+    "note": "any",
+    "category": {"id": "string", "subcategory": {"id": "string"}},
+}
+CATEGORIES_SCHEMA = {
+    "foodAndDrink": {"subcategories": {"cafe": {}}},
+    "income": {"subcategories": {"salary": {}}},
+}
+VALID = {"id": "tx_1", "amount": 3.5, "pending": False, "note": None,
+         "category": {"id": "foodAndDrink", "subcategory": {"id": "cafe"}}}
+
+
+MISSING = object()
+
+
+def variant(**changes):
+    """VALID modifiée ; MISSING retire le champ"""
+    return {key: value for key, value in dict(VALID, **changes).items() if value is not MISSING}
+
+
+def detailed_errors(checks, transaction):
+    return [error for error in (check(transaction) for check in checks) if error is not None]
+
+
+@pytest.mark.parametrize('transaction, error_type', [
+    (variant(id=MISSING), MissingFieldError),
+    (variant(amount='3.5'), InvalidTypeError),
+    (variant(pending='false'), InvalidTypeError),
+    (variant(category='foodAndDrink'), InvalidTypeError),
+    (variant(category={"id": "travel", "subcategory": {"id": "cafe"}}), UnknownCategoryError),
+    (variant(category={"id": "foodAndDrink"}), InvalidTypeError),
+    (variant(category={"id": "foodAndDrink", "subcategory": {"id": "salary"}}), UnknownSubcategoryError),
+    (variant(category={"id": ["unhashable"], "subcategory": {"id": "cafe"}}), UnknownCategoryError),
+])
+def test_each_problem_has_its_typed_error(transaction, error_type):
+    is_valid, checks = compile_validator(TRANSACTION_SCHEMA, CATEGORIES_SCHEMA)
+
+    errors = detailed_errors(checks, transaction)
+
+    assert not is_valid(transaction)
+    assert [type(error) for error in errors] == [error_type]
+    # Sous-classe de ValueError : les routes répondent 400, pas 500
+    assert isinstance(errors[0], ValueError) and isinstance(errors[0], TransactionValidationError)
+
+
+def test_fast_path_agrees_with_detailed_checks():
+    is_valid, checks = compile_validator(TRANSACTION_SCHEMA, CATEGORIES_SCHEMA)
+    transactions = [
+        VALID,
+        variant(amount=3),
+        variant(note=MISSING),
+        variant(id=MISSING, amount=MISSING),
+        variant(pending=0),
+        variant(category={"id": "income", "subcategory": {"id": "salary"}}),
+        variant(category={"id": "income", "subcategory": {"id": "cafe"}}),
+        variant(category={"id": "income", "subcategory": "salary"}),
+        variant(category=MISSING),
+    ]
+
+    for transaction in transactions:
+        assert is_valid(transaction) == (detailed_errors(checks, transaction) == []), transaction
+
+
+def test_batch_reports_every_error_by_index(app):
+    transactions = [
+        make_transaction('tx_1'),
+        {"id": "tx_2"},
+        make_transaction('tx_3', category='foodAndDrink', subcategory='salary'),
+        'not a transaction',
+    ]
+    transactions[2]['amount'] = '12'
+
+    invalid = validate_transactions(transactions)
+
+    assert set(invalid) == {1, 2, 3}
+    assert len(invalid[1]) > 1 and all(isinstance(error, MissingFieldError) for error in invalid[1])
+    assert [type(error) for error in invalid[2]] == [InvalidTypeError, UnknownSubcategoryError]
+    assert [type(error) for error in invalid[3]] == [InvalidTypeError]
+
+
+def test_invalid_transaction_is_a_bad_request(user, client):
+    transaction = make_transaction('tx_1', category='unknownCategory')
+
+    response = client.post('/api/add_transaction', json={'user_id': user, 'transaction': transaction})
+
+    assert response.status_code == 400
+    assert 'unknownCategory' in response.json['error']
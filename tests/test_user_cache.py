@@ -0,0 +1,85 @@
+"""
+Cache des vérifications d'existence des utilisateurs : TTL, cache négatif et invalidation.
+"""
+from db_models import db, User
+from utils.auth_utils import user_cache, verify_user_exists
+from utils.user_cache import UserExistenceCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    clock = FakeClock()
+    return UserExistenceCache(clock=clock, **kwargs), clock
+
+
+def test_existing_user_expires_after_ttl():
+    cache, clock = make_cache(ttl=30, negative_ttl=5)
+    cache.set('u1', True)
+
+    clock.now = 29.9
+    assert cache.get('u1') is True
+    clock.now = 30.0
+    assert cache.get('u1') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 0}
+
+
+def test_missing_user_is_cached_for_the_shorter_negative_ttl():
+    cache, clock = make_cache(ttl=30, negative_ttl=5)
+    cache.set('ghost', False)
+
+    clock.now = 4
+    assert cache.get('ghost') is False
+    clock.now = 5
+    assert cache.get('ghost') is None
+
+
+def test_zero_ttl_disables_caching():
+    cache, _ = make_cache(ttl=30, negative_ttl=0)
+    cache.set('ghost', False)
+
+    assert cache.get('ghost') is None
+
+
+def test_invalidate_one_user_or_everything():
+    cache, _ = make_cache(ttl=30)
+    cache.set('u1', True)
+    cache.set('u2', True)
+
+    cache.invalidate('u1')
+    assert cache.get('u1') is None and cache.get('u2') is True
+
+    cache.invalidate()
+    assert cache.get('u2') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, _ = make_cache(max_size=2, ttl=30)
+    cache.set('u1', True)
+    cache.set('u2', True)
+    cache.get('u1')
+
+    cache.set('u3', True)
+
+    assert cache.get('u2') is None
+    assert cache.get('u1') is True and cache.get('u3') is True
+
+
+def test_orm_writes_invalidate_the_worker_cache(app):
+    assert verify_user_exists('u1') is False
+    assert user_cache.get('u1') is False
+
+    # Création : l'entrée négative ne masque pas la nouvelle inscription
+    db.session.add(User(id='u1', name='Nouvel utilisateur'))
+    db.session.commit()
+    assert verify_user_exists('u1') is True
+
+    db.session.delete(db.session.get(User, 'u1'))
+    db.session.commit()
+    assert verify_user_exists('u1') is False
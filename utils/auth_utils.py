@@ -1,12 +1,25 @@
 # utils/auth_utils.py
 from db_models import db, User
 from functools import wraps
-from flask import request, jsonify
+from flask import g, request, jsonify
+from sqlalchemy import event, literal, select
+from config import USER_CACHE_MAX_SIZE, USER_CACHE_TTL, USER_CACHE_NEGATIVE_TTL
+from utils.user_cache import UserExistenceCache
+
+# Cache des utilisateurs vérifiés (par processus)
+user_cache = UserExistenceCache(
+    max_size=USER_CACHE_MAX_SIZE,
+    ttl=USER_CACHE_TTL,
+    negative_ttl=USER_CACHE_NEGATIVE_TTL
+)
 
 def verify_user_exists(user_id):
     """
     Vérifie qu'un utilisateur existe dans la base de données
     
+    Le résultat est mis en cache : seules les vérifications absentes ou
+    expirées du cache interrogent la base.
+    
     Args:
         user_id (str): Identifiant de l'utilisateur à vérifier
         
@@ -15,10 +28,52 @@ def verify_user_exists(user_id):
     """
     if not user_id:
         return False
+    
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
         
-    # Vérifier si l'utilisateur existe
-    user = User.query.filter_by(id=user_id).first()
-    return user is not None
+    # Vérifier si l'utilisateur existe (SELECT 1 ... LIMIT 1, sans charger la ligne)
+    exists = db.session.execute(
+        select(literal(1)).select_from(User).where(User.id == user_id).limit(1)
+    ).first() is not None
+    
+    user_cache.set(user_id, exists)
+    return exists
+
+def invalidate_user(user_id=None):
+    """
+    Retire un utilisateur du cache des vérifications du processus courant
+    
+    À appeler après une suppression faite hors ORM (requête Core, autre service).
+    Les autres workers gardent leur entrée jusqu'à USER_CACHE_TTL.
+    
+    Args:
+        user_id (str, optional): Identifiant de l'utilisateur, None pour vider le cache
+    """
+    user_cache.invalidate(user_id)
+
+@event.listens_for(User, 'after_insert')
+@event.listens_for(User, 'after_delete')
+def _invalidate_cached_user(mapper, connection, target):
+    """Invalide le cache quand un utilisateur est créé ou supprimé via l'ORM"""
+    user_cache.invalidate(target.id)
+
+def get_request_user_id():
+    """
+    Extrait l'ID utilisateur de la requête courante
+    
+    Le corps JSON est lu pour les requêtes POST, sinon le formulaire (envoi
+    de fichier) et la query string. Accepte soit userId soit user_id (pour
+    compatibilité avec le frontend).
+    
+    Returns:
+        str: Identifiant de l'utilisateur, ou None s'il est absent
+    """
+    params = request.get_json(silent=True) if request.method != 'GET' else None
+    if not isinstance(params, dict):
+        params = request.values
+    return params.get('userId') or params.get('user_id')
 
 def require_valid_user(view_function):
     """
@@ -27,9 +82,8 @@ def require_valid_user(view_function):
     @wraps(view_function)
     def wrapper(*args, **kwargs):
         try:
-            # Extraire l'ID utilisateur de la requête JSON
-            # Accepter soit userId soit user_id (pour compatibilité avec le frontend)
-            user_id = request.json.get('userId') or request.json.get('user_id')
+            # Extraire l'ID utilisateur de la requête (corps JSON ou query string)
+            user_id = get_request_user_id()
             
             if not user_id:
                 return jsonify({"error": "User ID is required"}), 400
@@ -42,6 +96,9 @@ def require_valid_user(view_function):
                     pass  # Autoriser la requête
                 else:
                     return jsonify({"error": "User not found"}), 404
+            
+            # Identifiant repris dans les logs de la requête
+            g.user_id = user_id
                 
             # Si l'utilisateur existe, continuer le traitement
             return view_function(*args, **kwargs)
@@ -0,0 +1,216 @@
+"""
+Registre des catégories : chaque paire (catégorie, sous-catégorie) reçoit un
+petit code entier, stocké dans les transactions à la place des deux chaînes.
+
+La table Category est la référence des codes, partagée par tous les
+processus : les paires de schemas/categories.json y sont synchronisées au
+démarrage (migrations), puis chaque processus en garde une copie en mémoire
+pour encoder et décoder en O(1).
+"""
+from functools import lru_cache
+import logging
+import sys
+import threading
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from utils.schema_loader import get_categories_schema
+
+logger = logging.getLogger(__name__)
+
+# Paire utilisée quand une transaction n'a pas de catégorie (voir extract_category_data)
+DEFAULT_PAIR = ("other", "unknown")
+
+
+def schema_category_pairs(categories_schema):
+    """
+    Liste les paires (catégorie, sous-catégorie) autorisées par un schéma
+
+    'unknown' est accepté comme sous-catégorie de n'importe quelle catégorie.
+    L'ordre est celui du schéma, pour que les codes attribués soient stables.
+
+    Args:
+        categories_schema (dict): Schéma des catégories
+
+    Returns:
+        list: Paires (category_id, subcategory_id)
+    """
+    return [
+        (category_id, subcategory_id)
+        for category_id, category in categories_schema.items()
+        for subcategory_id in list(category.get("subcategories", {})) + ["unknown"]
+    ]
+
+
+@lru_cache(maxsize=None)
+def schema_pairs():
+    """
+    Returns:
+        list: Paires de schemas/categories.json (calculées au premier appel)
+    """
+    return schema_category_pairs(get_categories_schema())
+
+
+class CategoryRegistry:
+    """
+    Correspondance bidirectionnelle entre codes et paires de catégories
+
+    Les identifiants sont internés : toutes les transactions décodées
+    partagent les mêmes objets chaîne.
+    """
+
+    def __init__(self, rows=()):
+        """
+        Args:
+            rows: Itérable de (code, category, subcategory)
+        """
+        self._codes = {}
+        self._pairs = {}
+        for code, category, subcategory in rows:
+            pair = (sys.intern(category), sys.intern(subcategory))
+            self._codes[pair] = code
+            self._pairs[code] = pair
+
+    def __len__(self):
+        return len(self._codes)
+
+    def encode(self, category_id, subcategory_id):
+        """
+        Retourne le code d'une paire
+
+        Returns:
+            int: Code de la paire, ou None si elle n'est pas enregistrée
+        """
+        return self._codes.get((category_id, subcategory_id))
+
+    def decode(self, code):
+        """
+        Retourne la paire correspondant à un code
+
+        Returns:
+            tuple: (category_id, subcategory_id), ou None si le code est inconnu
+        """
+        return self._pairs.get(code)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def load_category_registry():
+    """
+    Recharge le registre depuis la table Category
+
+    Doit être appelé dans un contexte d'application Flask.
+
+    Returns:
+        CategoryRegistry: Le registre rechargé
+    """
+    from db_models import db, Category
+
+    global _registry
+    with db.engine.connect() as conn:
+        rows = conn.execute(select(Category.code, Category.category, Category.subcategory)).all()
+    with _registry_lock:
+        _registry = CategoryRegistry(rows)
+    return _registry
+
+
+def get_category_registry():
+    """
+    Retourne le registre des catégories (chargé depuis la base au premier appel)
+
+    Returns:
+        CategoryRegistry: Le registre du processus
+    """
+    return _registry if _registry is not None else load_category_registry()
+
+
+def sync_categories(pairs=None, engine=None):
+    """
+    Enregistre dans la table Category les paires qui n'y sont pas encore
+
+    Les codes sont attribués à la suite du plus grand code existant, dans une
+    transaction séparée de la session. En cas de conflit avec un autre
+    processus, l'attribution est recommencée.
+
+    Args:
+        pairs (list, optional): Paires à enregistrer (par défaut celles du schéma)
+        engine: Moteur SQLAlchemy (par défaut celui de l'application)
+
+    Returns:
+        list: Paires ajoutées
+    """
+    from db_models import db, Category
+
+    engine = engine or db.engine
+    pairs = schema_pairs() if pairs is None else pairs
+
+    for _ in range(5):
+        try:
+            with engine.begin() as conn:
+                existing = {tuple(row) for row in conn.execute(select(Category.category, Category.subcategory))}
+                missing = [pair for pair in dict.fromkeys(pairs) if pair not in existing]
+                if not missing:
+                    return []
+
+                next_code = (conn.execute(select(func.max(Category.code))).scalar() or 0) + 1
+                conn.execute(Category.__table__.insert(), [
+                    {"code": next_code + offset, "category": category, "subcategory": subcategory}
+                    for offset, (category, subcategory) in enumerate(missing)
+                ])
+            logger.info(f"{len(missing)} catégorie(s) enregistrée(s)")
+            return missing
+        except IntegrityError:
+            # Codes attribués en parallèle par un autre processus : recommencer
+            continue
+
+    raise RuntimeError("Impossible d'attribuer des codes de catégorie")
+
+
+def encode_category(category_id, subcategory_id):
+    """
+    Retourne le code d'une paire
+
+    Les paires du schéma sont toujours enregistrées et les écritures sont
+    validées contre le schéma : une paire inconnue reçoit le code de
+    DEFAULT_PAIR, comme à l'import. Elle n'est pas enregistrée : cela
+    demanderait une connexion distincte de la session, qui attendrait le
+    verrou d'écriture tenu par la session (SQLite). Les paires des données
+    anciennes sont enregistrées par les migrations (sync_categories).
+
+    Args:
+        category_id (str): Identifiant de la catégorie
+        subcategory_id (str): Identifiant de la sous-catégorie
+
+    Returns:
+        int: Code de la paire, ou de DEFAULT_PAIR si elle est inconnue
+    """
+    registry = get_category_registry()
+    code = registry.encode(category_id, subcategory_id)
+    if code is None:
+        code = registry.encode(*DEFAULT_PAIR)
+    return code
+
+
+def decode_category(code):
+    """
+    Retourne la paire (catégorie, sous-catégorie) d'un code
+
+    Un code inconnu du processus (enregistré depuis par un autre) provoque un
+    rechargement du registre.
+
+    Args:
+        code (int): Code de la paire
+
+    Returns:
+        tuple: (category_id, subcategory_id)
+    """
+    pair = get_category_registry().decode(code)
+    if pair is None:
+        pair = load_category_registry().decode(code)
+        if pair is None:
+            logger.warning(f"Code de catégorie inconnu: {code}")
+            return DEFAULT_PAIR
+    return pair
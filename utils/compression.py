@@ -0,0 +1,92 @@
+"""
+Compression gzip/deflate des réponses selon l'en-tête Accept-Encoding.
+"""
+import gzip
+import zlib
+
+from flask import request
+
+from config import COMPRESSION_LEVEL, COMPRESSION_MIN_SIZE
+
+# Encodages proposés, par ordre de préférence du serveur
+ENCODINGS = ('gzip', 'deflate')
+
+# Types de contenu qui gagnent à être compressés
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/csv', 'text/plain', 'text/html'}
+
+
+def compress_body(body, encoding, level=COMPRESSION_LEVEL):
+    """
+    Compresse un corps de réponse
+
+    Args:
+        body (bytes): Corps à compresser
+        encoding (str): 'gzip' ou 'deflate'
+        level (int): Niveau de compression (1 à 9)
+
+    Returns:
+        bytes: Corps compressé
+    """
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    return zlib.compress(body, level)
+
+
+def negotiate_encoding():
+    """
+    Choisit l'encodage de la réponse d'après l'en-tête Accept-Encoding
+
+    Returns:
+        str: 'gzip', 'deflate', ou None si le client n'en accepte aucun
+    """
+    accepted = request.accept_encodings
+    for encoding in ENCODINGS:
+        if accepted[encoding]:
+            return encoding
+    return None
+
+
+def compress_response(response):
+    """
+    Compresse la réponse si le client l'accepte et qu'elle dépasse le seuil
+
+    Les réponses en streaming, déjà encodées ou sans corps sont laissées
+    telles quelles.
+
+    Args:
+        response (Response): Réponse Flask
+
+    Returns:
+        Response: La même réponse, éventuellement compressée
+    """
+    if (response.is_streamed
+            or response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    body = response.get_data()
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+
+    response.set_data(compress_body(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    """
+    Active la compression des réponses sur une application Flask
+
+    Args:
+        app (Flask): Application à configurer
+    """
+    app.after_request(compress_response)
@@ -0,0 +1,151 @@
+"""
+Pool de connexions : options du moteur SQLAlchemy, pragmas SQLite et télémétrie.
+
+Le pool est dimensionné par worker gunicorn à partir du nombre de threads
+(voir config.py). TimedQueuePool mesure le temps passé à attendre une
+connexion libre, exposé avec l'occupation du pool par /metrics/pool.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from config import (
+    DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE, DB_POOL_SIZE, DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS, SQLITE_BUSY_TIMEOUT_MS, SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS
+)
+
+
+class PoolStats:
+    """Cumul des attentes de connexion du processus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Remet les compteurs à zéro (worker fraîchement forké)"""
+        with self._lock:
+            self.checkouts = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.timeouts = 0
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'wait_seconds_total': round(self.wait_seconds, 6),
+                'wait_seconds_max': round(self.max_wait_seconds, 6),
+                'timeouts': self.timeouts
+            }
+
+
+POOL_STATS = PoolStats()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool qui mesure l'attente d'une connexion libre (ou jusqu'au timeout)"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            POOL_STATS.record(time.perf_counter() - start, timed_out=True)
+            raise
+        POOL_STATS.record(time.perf_counter() - start)
+        return connection
+
+
+def engine_options(database_url):
+    """
+    Construit les options du moteur SQLAlchemy (SQLALCHEMY_ENGINE_OPTIONS)
+
+    Une base SQLite en mémoire garde le pool choisi par Flask-SQLAlchemy
+    (StaticPool : une seule connexion, sans quoi chacune verrait une base vide).
+
+    Args:
+        database_url (str): URL de la base de données
+
+    Returns:
+        dict: Options passées à create_engine
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+    }
+    if backend != 'sqlite':
+        # Connexions réseau : coupées par le serveur ou un proxy au bout d'un moment
+        options['pool_recycle'] = DB_POOL_RECYCLE
+        options['pool_pre_ping'] = DB_POOL_PRE_PING
+    if backend == 'postgresql' and DB_STATEMENT_TIMEOUT_MS:
+        options['connect_args'] = {'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}'}
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Applique les pragmas à chaque nouvelle connexion SQLite"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
+
+def init_engine(engine):
+    """
+    Branche les événements de connexion sur le moteur
+
+    Sous SQLite, WAL laisse les lectures se poursuivre pendant une écriture et
+    busy_timeout fait attendre les écritures concurrentes au lieu d'échouer.
+
+    Args:
+        engine: Moteur SQLAlchemy de l'application
+    """
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+
+
+def pool_status(engine):
+    """
+    Décrit l'occupation du pool et les attentes de connexion du processus
+
+    Args:
+        engine: Moteur SQLAlchemy de l'application
+
+    Returns:
+        dict: Taille, connexions empruntées et disponibles, débordement, attentes
+    """
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': DB_MAX_OVERFLOW,
+            'timeout_seconds': pool.timeout()
+        })
+    status.update(POOL_STATS.snapshot())
+    return status
@@ -0,0 +1,267 @@
+"""
+Écrivains d'export en flux : CSV et XLSX.
+
+Chaque écrivain reçoit la description des colonnes (nom, type) et un
+itérable de lignes, et produit des morceaux d'octets au fil des lignes, sans
+jamais garder le document entier en mémoire.
+
+Types de colonnes : 'text', 'date' (date native), 'money' (montant en
+centimes entiers) et 'bool'.
+
+Le XLSX est écrit directement (SpreadsheetML minimal dans une archive zip
+écrite en flux, entrées avec descripteur de données) : chaînes en ligne,
+donc sans table de chaînes partagées à construire avant la fin. Une feuille
+contient au plus XLSX_MAX_ROWS lignes ; au-delà, les lignes continuent dans
+une nouvelle feuille.
+"""
+import csv
+from datetime import date
+import io
+from itertools import chain, islice
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from config import COMPRESSION_LEVEL
+
+# Lignes par feuille, en-tête compris (limite d'Excel)
+XLSX_MAX_ROWS = 1048576
+
+# Caractères de contrôle interdits en XML 1.0
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Premiers caractères qu'un tableur interpréterait comme une formule
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+_EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def _batches(rows, size):
+    """Découpe un itérable en listes d'au plus 'size' lignes"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_text(value):
+    if value is None:
+        return ''
+    # Neutralise les formules (injection CSV) en forçant le texte
+    return "'" + value if value.startswith(_FORMULA_PREFIXES) else value
+
+
+_CSV_FORMATTERS = {
+    'text': _csv_text,
+    'date': lambda value: value.isoformat(),
+    'money': lambda cents: f"{cents / 100:.2f}",
+    'bool': lambda value: 'true' if value else 'false',
+}
+
+
+def iter_csv(columns, rows, batch_size=1000):
+    """
+    Écrit des lignes en CSV (UTF-8 avec BOM, lu correctement par Excel)
+
+    Args:
+        columns (tuple): Paires (nom, type) des colonnes
+        rows: Itérable de lignes (tuples dans l'ordre des colonnes)
+        batch_size (int): Nombre de lignes par morceau produit
+
+    Yields:
+        bytes: Morceaux du fichier CSV
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    formatters = [_CSV_FORMATTERS[column_type] for _, column_type in columns]
+
+    writer.writerow(name for name, _ in columns)
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+
+    for batch in _batches(rows, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([
+            [format_value(value) for format_value, value in zip(formatters, row)]
+            for row in batch
+        ])
+        yield buffer.getvalue().encode('utf-8')
+
+
+# Styles de cellule (index dans cellXfs de styles.xml)
+_STYLE_DATE = 1
+_STYLE_MONEY = 2
+_STYLE_HEADER = 3
+
+
+def _xlsx_text(value):
+    if value is None:
+        return '<c/>'
+    return f'<c t="inlineStr"><is><t>{escape(_XML_ILLEGAL.sub("", value))}</t></is></c>'
+
+
+_XLSX_FORMATTERS = {
+    'text': _xlsx_text,
+    # Numéro de série de la date (jours depuis le 30/12/1899), affiché AAAA-MM-JJ
+    'date': lambda value: f'<c s="{_STYLE_DATE}"><v>{(value - _EXCEL_EPOCH).days}</v></c>',
+    'money': lambda cents: f'<c s="{_STYLE_MONEY}"><v>{cents / 100}</v></c>',
+    'bool': lambda value: f'<c t="b"><v>{1 if value else 0}</v></c>',
+}
+
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_PACKAGE_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+# En-tête figé : la première ligne reste visible au défilement
+_SHEET_START = (
+    f'{_XML_DECLARATION}<worksheet xmlns="{_MAIN_NS}">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+_STYLES = (
+    f'{_XML_DECLARATION}<styleSheet xmlns="{_MAIN_NS}">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _package_parts(sheet_count, sheet_name):
+    """
+    Parties fixes du classeur, qui dépendent du nombre de feuilles écrites
+
+    Returns:
+        dict: Chemin dans l'archive -> contenu XML
+    """
+    sheets = range(1, sheet_count + 1)
+    content_types = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for index in sheets
+    )
+    workbook_sheets = ''.join(
+        f'<sheet name="{sheet_name if index == 1 else f"{sheet_name} {index}"}" '
+        f'sheetId="{index}" r:id="rId{index}"/>'
+        for index in sheets
+    )
+    workbook_rels = ''.join(
+        f'<Relationship Id="rId{index}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{index}.xml"/>'
+        for index in sheets
+    )
+    return {
+        '[Content_Types].xml': (
+            f'{_XML_DECLARATION}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{content_types}</Types>'
+        ),
+        '_rels/.rels': (
+            f'{_XML_DECLARATION}<Relationships xmlns="{_PACKAGE_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/workbook.xml': (
+            f'{_XML_DECLARATION}<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}">'
+            f'<sheets>{workbook_sheets}</sheets></workbook>'
+        ),
+        'xl/_rels/workbook.xml.rels': (
+            f'{_XML_DECLARATION}<Relationships xmlns="{_PACKAGE_REL_NS}">{workbook_rels}'
+            f'<Relationship Id="rId{sheet_count + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ),
+        'xl/styles.xml': _STYLES,
+    }
+
+
+class _ChunkSink:
+    """
+    Destination de l'archive zip : garde les octets écrits jusqu'au prochain drain()
+
+    Sans seek ni tell, zipfile écrit chaque entrée en un seul passage
+    (tailles et CRC dans un descripteur de données après les données).
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_xlsx(columns, rows, batch_size=1000, sheet_name='Transactions'):
+    """
+    Écrit des lignes dans un classeur XLSX produit en flux
+
+    Args:
+        columns (tuple): Paires (nom, type) des colonnes
+        rows: Itérable de lignes (tuples dans l'ordre des colonnes)
+        batch_size (int): Nombre de lignes par morceau produit
+        sheet_name (str): Nom de la première feuille
+
+    Yields:
+        bytes: Morceaux de l'archive XLSX
+    """
+    formatters = [_XLSX_FORMATTERS[column_type] for _, column_type in columns]
+    header = '<row>' + ''.join(
+        f'<c t="inlineStr" s="{_STYLE_HEADER}"><is><t>{escape(name)}</t></is></c>' for name, _ in columns
+    ) + '</row>'
+
+    sink = _ChunkSink()
+    rows = iter(rows)
+    sheet_count = 0
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, compresslevel=COMPRESSION_LEVEL) as archive:
+        while True:
+            sheet_count += 1
+            with archive.open(f'xl/worksheets/sheet{sheet_count}.xml', 'w') as sheet:
+                sheet.write((_SHEET_START + header).encode('utf-8'))
+                for batch in _batches(islice(rows, XLSX_MAX_ROWS - 1), batch_size):
+                    sheet.write(''.join(
+                        '<row>' + ''.join([format_value(value) for format_value, value in zip(formatters, row)]) + '</row>'
+                        for row in batch
+                    ).encode('utf-8'))
+                    # Le compresseur peut garder un paquet entier en tampon
+                    data = sink.drain()
+                    if data:
+                        yield data
+                sheet.write(_SHEET_END.encode('utf-8'))
+
+            # Feuille pleine : continuer dans une nouvelle feuille s'il reste des lignes
+            following = next(rows, None)
+            if following is None:
+                break
+            rows = chain([following], rows)
+
+        for name, content in _package_parts(sheet_count, sheet_name).items():
+            archive.writestr(name, content)
+    yield sink.drain()
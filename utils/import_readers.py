@@ -0,0 +1,248 @@
+"""
+Lecteurs d'import en flux : relevés bancaires CSV et OFX.
+
+Chaque lecteur reçoit un flux binaire (fichier ouvert, envoi HTTP) et
+produit un enregistrement par transaction, au fil de la lecture, sans
+jamais garder le fichier entier en mémoire. Les enregistrements ont les
+mêmes clés quel que soit le format ; les valeurs restent des chaînes
+brutes, converties par services/import_service.py :
+
+    date, amount (ou debit/credit), merchant, reference, category,
+    subcategory, payment_channel, pending
+
+Le montant suit la convention du fichier (pour une banque : négatif au
+débit).
+"""
+import codecs
+import csv
+from html import unescape
+from itertools import chain, islice
+import re
+import unicodedata
+
+# Octets lus par lecture du flux
+READ_SIZE = 64 * 1024
+
+# Lignes examinées pour deviner le séparateur et trouver l'en-tête
+# (certaines banques placent d'abord les informations du compte)
+HEADER_SEARCH_LINES = 20
+
+# En-têtes reconnus (normalisés, voir _normalize_header) par champ
+CSV_HEADER_ALIASES = {
+    'date': ('date', 'transaction_date', 'date_operation', 'date_de_l_operation', 'booking_date',
+             'posted_date', 'date_comptable', 'date_valeur', 'value_date'),
+    'amount': ('amount', 'montant', 'montant_eur', 'amount_eur', 'transaction_amount', 'valeur'),
+    'debit': ('debit', 'debit_eur', 'withdrawal', 'money_out'),
+    'credit': ('credit', 'credit_eur', 'deposit', 'money_in'),
+    'merchant': ('merchant_name', 'merchant', 'payee', 'libelle', 'libelle_operation', 'label',
+                 'description', 'name', 'details', 'narrative', 'memo'),
+    'reference': ('id', 'reference', 'fitid', 'transaction_id'),
+    'category': ('category', 'categorie'),
+    'subcategory': ('subcategory', 'sous_categorie'),
+    'payment_channel': ('payment_channel',),
+    'pending': ('pending',),
+}
+
+# Type d'opération OFX -> canal de paiement
+OFX_PAYMENT_CHANNELS = {
+    'POS': 'in store',
+    'ATM': 'in store',
+    'CASH': 'in store',
+    'CHECK': 'other',
+    'DIRECTDEBIT': 'online',
+    'PAYMENT': 'online',
+    'REPEATPMT': 'online',
+}
+
+_OFX_TOKEN = re.compile(r'<(/?)([A-Za-z0-9.]+)[^>]*>([^<]*)')
+
+
+def detect_encoding(head):
+    """
+    Devine l'encodage d'un fichier d'après ses premiers octets
+
+    UTF-8 (avec ou sans BOM) s'il se décode comme tel, sinon Windows-1252,
+    l'encodage habituel des exports bancaires et des en-têtes OFX CHARSET:1252.
+
+    Args:
+        head (bytes): Début du fichier
+
+    Returns:
+        str: Nom de l'encodage
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if re.search(rb'CHARSET:\s*(1252|ISO-8859-1)', head[:1024]):
+        return 'cp1252'
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # Un caractère multi-octets coupé en fin de lecture reste de l'UTF-8
+        if e.start < len(head) - 3:
+            return 'cp1252'
+    return 'utf-8'
+
+
+def iter_text(stream, encoding=None, read_size=READ_SIZE):
+    """
+    Décode un flux binaire morceau par morceau
+
+    Args:
+        stream: Flux binaire ouvert en lecture
+        encoding (str, optional): Encodage (deviné sur le premier morceau sinon)
+        read_size (int): Octets lus par lecture
+
+    Yields:
+        str: Morceaux de texte
+    """
+    data = stream.read(read_size)
+    decoder = codecs.getincrementaldecoder(encoding or detect_encoding(data))(errors='replace')
+    while data:
+        text = decoder.decode(data)
+        if text:
+            yield text
+        data = stream.read(read_size)
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def _iter_lines(chunks):
+    """Découpe des morceaux de texte en lignes (fins de ligne conservées, comme attendu par csv)"""
+    pending = ''
+    for chunk in chunks:
+        lines = (pending + chunk).splitlines(keepends=True)
+        # Ligne incomplète (ou \r dont le \n suit peut-être) : attendre le morceau suivant
+        pending = lines.pop() if lines and not lines[-1].endswith('\n') else ''
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _normalize_header(name):
+    """'Date de l'opération' -> 'date_de_l_operation'"""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def _map_header(header):
+    """
+    Associe chaque champ à l'index de sa colonne
+
+    Returns:
+        dict: Champ -> index, ou None si la date ou le montant manque
+    """
+    normalized = [_normalize_header(name) for name in header]
+    columns = {}
+    for field, aliases in CSV_HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+
+    has_amount = 'amount' in columns or ('debit' in columns and 'credit' in columns)
+    return columns if 'date' in columns and has_amount else None
+
+
+def read_csv(stream, encoding=None):
+    """
+    Lit un relevé CSV en flux
+
+    Le séparateur (',', ';', tabulation ou '|') et la ligne d'en-tête sont
+    cherchés dans les premières lignes : l'en-tête est la première ligne
+    nommant une date et un montant (ou des colonnes débit et crédit).
+
+    Args:
+        stream: Flux binaire du fichier
+        encoding (str, optional): Encodage (deviné sinon)
+
+    Returns:
+        iterator: Enregistrements (dict de chaînes, voir l'en-tête du module)
+
+    Raises:
+        ValueError: Si le fichier est vide ou si l'en-tête est introuvable
+    """
+    lines = _iter_lines(iter_text(stream, encoding))
+    sample = list(islice(lines, HEADER_SEARCH_LINES))
+    if not sample:
+        raise ValueError("Le fichier à importer est vide")
+
+    try:
+        dialect = csv.Sniffer().sniff(''.join(sample), delimiters=',;\t|')
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.reader(chain(sample, lines), dialect)
+    for row in islice(reader, HEADER_SEARCH_LINES):
+        columns = _map_header(row)
+        if columns:
+            return _iter_csv_records(reader, columns)
+
+    raise ValueError("En-tête CSV introuvable : colonnes de date et de montant attendues")
+
+
+def _iter_csv_records(reader, columns):
+    """Convertit les lignes CSV qui suivent l'en-tête en enregistrements"""
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+        yield {field: row[index].strip() if index < len(row) else ''
+               for field, index in columns.items()}
+
+
+def read_ofx(stream, encoding=None):
+    """
+    Lit un relevé OFX en flux (OFX 1.x en SGML comme OFX 2.x en XML)
+
+    Les balises sont analysées au fil des morceaux lus : seuls les éléments
+    STMTTRN (une opération chacun) sont retenus.
+
+    Args:
+        stream: Flux binaire du fichier
+        encoding (str, optional): Encodage (deviné sinon, CHARSET de l'en-tête compris)
+
+    Yields:
+        dict: Enregistrements (chaînes, voir l'en-tête du module)
+    """
+    buffer = ''
+    fields = None
+    for chunk in chain(iter_text(stream, encoding), ['<']):
+        buffer += chunk
+        # Analyser jusqu'à la dernière balise ouverte, dont la valeur peut être coupée
+        cut = buffer.rfind('<')
+        if cut == -1:
+            # En-tête OFX 1.x avant la première balise
+            buffer = ''
+            continue
+
+        ready, buffer = buffer[:cut], buffer[cut:]
+        for closing, tag, value in _OFX_TOKEN.findall(ready):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if closing and fields is not None:
+                    yield _ofx_record(fields)
+                fields = None if closing else {}
+            elif fields is not None and not closing:
+                # En SGML, les éléments n'ont pas de balise fermante : la valeur s'arrête à la balise suivante
+                value = value.strip()
+                if value:
+                    fields[tag] = unescape(value)
+
+
+def _ofx_record(fields):
+    """Convertit les éléments d'une opération OFX en enregistrement"""
+    return {
+        # AAAAMMJJ[HHMMSS[.XXX]][fuseau] : seule la date est gardée
+        'date': fields.get('DTPOSTED', '')[:8],
+        'amount': fields.get('TRNAMT', ''),
+        'merchant': fields.get('NAME') or fields.get('MEMO', ''),
+        'reference': fields.get('FITID', ''),
+        'payment_channel': OFX_PAYMENT_CHANNELS.get(fields.get('TRNTYPE', '').upper(), 'other'),
+    }
+
+
+# Format -> lecteur
+IMPORT_READERS = {
+    'csv': read_csv,
+    'ofx': read_ofx,
+}
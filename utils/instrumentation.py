@@ -0,0 +1,253 @@
+"""
+Instrumentation des requêtes : latence par endpoint, requêtes SQL et temps
+de sérialisation.
+
+Les mesures d'une requête sont accumulées dans un objet propre au thread
+(les événements SQLAlchemy et la sérialisation s'exécutent dans le thread
+de la requête), puis versées dans le registre du processus à la fin de la
+requête. Le registre est exposé au format texte Prometheus par /metrics et,
+si SERVER_TIMING est activé, chaque réponse porte un en-tête Server-Timing.
+
+Les métriques sont propres au processus : sous gunicorn, chaque worker
+expose les siennes, à agréger côté Prometheus.
+"""
+from bisect import bisect_left
+import logging
+import threading
+import time
+
+from flask import request
+from sqlalchemy import event
+
+from config import SERVER_TIMING
+
+# Bornes des histogrammes (secondes, puis nombre de requêtes SQL par requête HTTP)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+# Libellé des requêtes qui ne correspondent à aucune route (évite une série par URL)
+UNMATCHED_ENDPOINT = 'unmatched'
+
+
+class Histogram:
+    """Histogramme cumulatif à bornes fixes, au sens de Prometheus"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Returns:
+            list: (borne, nombre d'observations inférieures ou égales), '+Inf' compris
+        """
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            result.append(('+Inf' if bound == float('inf') else _format_value(bound), total))
+        return result
+
+
+class RequestStats:
+    """Mesures de la requête en cours"""
+
+    __slots__ = ('start', 'status', 'db_queries', 'db_seconds', 'serialization_seconds')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.status = 500
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serialization_seconds = 0.0
+
+
+class MetricsRegistry:
+    """Métriques cumulées du processus, par endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.requests = {}
+        self.db_queries = {}
+        self.db_seconds = {}
+        self.serialization_seconds = {}
+
+    def record(self, endpoint, method, stats, duration):
+        with self._lock:
+            key = (endpoint, method)
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(duration)
+            status_key = (endpoint, method, str(stats.status))
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            self.db_queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(stats.db_queries)
+            self.db_seconds[key] = self.db_seconds.get(key, 0.0) + stats.db_seconds
+            self.serialization_seconds[key] = self.serialization_seconds.get(key, 0.0) + stats.serialization_seconds
+
+    def render(self):
+        """
+        Returns:
+            str: Métriques des requêtes au format texte Prometheus
+        """
+        with self._lock:
+            lines = []
+            _render_histograms(lines, 'cashsense_http_request_duration_seconds',
+                               'HTTP request latency by endpoint', self.latency)
+            _render_values(lines, 'cashsense_http_requests_total', 'counter',
+                           'HTTP requests by endpoint and status',
+                           ('endpoint', 'method', 'status'), self.requests)
+            _render_histograms(lines, 'cashsense_db_queries_per_request',
+                               'SQL statements executed per HTTP request', self.db_queries)
+            _render_values(lines, 'cashsense_db_seconds_total', 'counter',
+                           'Time spent executing SQL statements', ('endpoint', 'method'), self.db_seconds)
+            _render_values(lines, 'cashsense_serialization_seconds_total', 'counter',
+                           'Time spent serializing JSON responses', ('endpoint', 'method'),
+                           self.serialization_seconds)
+            return '\n'.join(lines) + '\n'
+
+
+METRICS = MetricsRegistry()
+
+_local = threading.local()
+
+
+def _format_value(value):
+    """Formate un nombre comme Prometheus (entiers sans décimale)"""
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _render_histograms(lines, name, help_text, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for (endpoint, method), histogram in sorted(histograms.items()):
+        labels = _labels(('endpoint', 'method'), (endpoint, method))
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{{labels}}} {_format_value(histogram.sum)}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+
+def _render_values(lines, name, metric_type, help_text, label_names, values):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {metric_type}')
+    for key, value in sorted(values.items()):
+        lines.append(f'{name}{{{_labels(label_names, key)}}} {_format_value(value)}')
+
+
+def render_gauges(metrics):
+    """
+    Formate des valeurs instantanées (pool, caches) au format texte Prometheus
+
+    Args:
+        metrics (list): Tuples (nom, type, aide, valeur)
+
+    Returns:
+        str: Métriques au format texte Prometheus
+    """
+    lines = []
+    for name, metric_type, help_text, value in metrics:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        lines.append(f'{name} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+def record_serialization(seconds):
+    """Ajoute un temps de sérialisation à la requête en cours (sans effet hors requête)"""
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._instrumentation_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = getattr(_local, 'stats', None)
+    start = getattr(context, '_instrumentation_start', None)
+    if stats is not None and start is not None:
+        stats.db_queries += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def _start_request():
+    _local.stats = RequestStats()
+
+
+def _add_server_timing(response):
+    """Note le statut et ajoute l'en-tête Server-Timing (mesures jusqu'ici)"""
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        return response
+
+    stats.status = response.status_code
+    if SERVER_TIMING:
+        total_ms = (time.perf_counter() - stats.start) * 1000
+        response.headers['Server-Timing'] = (
+            f'db;desc="{stats.db_queries} queries";dur={stats.db_seconds * 1000:.2f}, '
+            f'ser;dur={stats.serialization_seconds * 1000:.2f}, '
+            f'app;dur={total_ms:.2f}'
+        )
+    return response
+
+
+def _finish_request(exception=None):
+    """
+    Verse les mesures de la requête dans le registre et les journalise
+
+    Appelé au démontage du contexte de requête, donc après la fin d'une
+    réponse en streaming : la latence et les requêtes SQL couvrent tout le flux.
+    """
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        return
+    _local.stats = None
+
+    endpoint = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ENDPOINT
+    duration = time.perf_counter() - stats.start
+    METRICS.record(endpoint, request.method, stats, duration)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Requête traitée", extra={
+            'method': request.method,
+            'endpoint': endpoint,
+            'status': stats.status,
+            'duration_ms': round(duration * 1000, 2),
+            'db_queries': stats.db_queries,
+            'db_ms': round(stats.db_seconds * 1000, 2),
+            'serialization_ms': round(stats.serialization_seconds * 1000, 2)
+        })
+
+
+def init_instrumentation(app, engine):
+    """
+    Active l'instrumentation sur une application Flask et son moteur SQLAlchemy
+
+    Args:
+        app (Flask): Application à instrumenter
+        engine: Moteur SQLAlchemy de l'application
+    """
+    app.before_request(_start_request)
+    app.after_request(_add_server_timing)
+    app.teardown_request(_finish_request)
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
@@ -2,10 +2,9 @@
 Module qui génère des données de transactions fictives pour le mode test.
 """
 import random
-import uuid
 from datetime import datetime, timedelta
 import calendar
-from utils.schema_loader import CATEGORIES_SCHEMA
+from utils.schema_loader import get_categories_schema
 from utils.transaction_validator import format_transaction
 
 # Données de base pour générer des transactions
@@ -48,20 +47,25 @@ TX_TYPES = {
     ]
 }
 
-def create_transaction(data, date):
-    """Crée une transaction formatée à partir des données de base"""
+def create_transaction(data, date, rng=random):
+    """
+    Crée une transaction formatée à partir des données de base
+
+    Le tirage (montant, canal, identifiant) utilise rng : un random.Random
+    initialisé avec une graine rend la transaction reproductible.
+    """
     # Générer un montant aléatoire dans la plage spécifiée
     min_amount, max_amount = data.get("amount", (5, 200))
-    amount = round(random.uniform(min_amount, max_amount), 2)
+    amount = round(rng.uniform(min_amount, max_amount), 2)
     
     # Créer la structure de la transaction
     tx = {
         "amount": amount,
         "date": date.strftime("%Y-%m-%d"),
         "merchant_name": data.get("name", "Inconnu"),
-        "payment_channel": "online" if amount < 0 else random.choice(["in store", "online"]),
+        "payment_channel": "online" if amount < 0 else rng.choice(["in store", "online"]),
         "pending": False,
-        "id": f"txn_{uuid.uuid4().hex[:12]}",
+        "id": f"txn_{rng.getrandbits(48):012x}",
         "category": {
             "id": data.get("category", "other"),
             "subcategory": {
@@ -74,8 +78,13 @@ def create_transaction(data, date):
     # Valider le format avec notre validateur standard
     return format_transaction(tx)
 
-def generate_monthly_transactions(year, month, start_date=None, end_date=None, min_count=10):
-    """Génère les transactions pour un mois spécifique, en garantissant les récurrentes"""
+def generate_monthly_transactions(year, month, start_date=None, end_date=None, min_count=10, rng=random):
+    """
+    Génère les transactions pour un mois spécifique, en garantissant les récurrentes
+
+    Avec un rng initialisé par une graine et sans filtre de dates, le mois
+    généré est toujours le même.
+    """
     # Calculer les dates du mois
     month_start = datetime(year, month, 1).date()
     last_day = calendar.monthrange(year, month)[1]
@@ -107,7 +116,7 @@ def generate_monthly_transactions(year, month, start_date=None, end_date=None, m
             # Cela garantit que chaque mois aura toujours ses transactions récurrentes
             tx_config_copy = tx_config.copy()
             tx_config_copy["days"] = [fixed_day]  # Jour fixe pour documentation
-            transactions.append(create_transaction(tx_config_copy, tx_date))
+            transactions.append(create_transaction(tx_config_copy, tx_date, rng))
     
     # 2. Ajouter les transactions spéciales pour ce mois
     for tx_config in TX_TYPES["SPECIAL"]:
@@ -116,27 +125,28 @@ def generate_monthly_transactions(year, month, start_date=None, end_date=None, m
             continue
             
         # Vérifier la probabilité
-        if random.random() > tx_config["probability"]:
+        if rng.random() > tx_config["probability"]:
             continue
             
         # Choisir une date aléatoire dans la période filtrée du mois
         days_in_range = (actual_end - actual_start).days + 1
-        random_day = random.randint(0, days_in_range - 1)
+        random_day = rng.randint(0, days_in_range - 1)
         tx_date = actual_start + timedelta(days=random_day)
         
         # Ajouter la transaction
-        transactions.append(create_transaction(tx_config, tx_date))
+        transactions.append(create_transaction(tx_config, tx_date, rng))
     
     # 3. Compléter avec des transactions aléatoires pour atteindre le minimum
     while len(transactions) < min_count:
         # Choisir une date aléatoire dans la période filtrée
         days_in_range = (actual_end - actual_start).days + 1
-        random_day = random.randint(0, days_in_range - 1)
+        random_day = rng.randint(0, days_in_range - 1)
         tx_date = actual_start + timedelta(days=random_day)
         
         # Choisir une catégorie aléatoire
-        cat_id = random.choice(list(CATEGORIES_SCHEMA.keys()))
-        subcat_id = random.choice(list(CATEGORIES_SCHEMA[cat_id]["subcategories"].keys()))
+        categories_schema = get_categories_schema()
+        cat_id = rng.choice(list(categories_schema.keys()))
+        subcat_id = rng.choice(list(categories_schema[cat_id]["subcategories"].keys()))
         
         # Déterminer si c'est un revenu
         is_income = cat_id == "income"
@@ -145,17 +155,17 @@ def generate_monthly_transactions(year, month, start_date=None, end_date=None, m
         tx_data = {
             "category": cat_id,
             "subcategory": subcat_id,
-            "name": random.choice(MERCHANTS.get(cat_id, ["Inconnu"])),
+            "name": rng.choice(MERCHANTS.get(cat_id, ["Inconnu"])),
             "amount": (-200, -50) if is_income else (5, 200)
         }
         
         # Ajouter la transaction
-        transactions.append(create_transaction(tx_data, tx_date))
+        transactions.append(create_transaction(tx_data, tx_date, rng))
     
     # Tri par date (du plus récent au plus ancien)
     return sorted(transactions, key=lambda x: x["date"], reverse=True)
 
-def get_mock_transactions(days=30, count=None):
+def get_mock_transactions(days=30, count=None, rng=random):
     """Génère des transactions de test sur une période donnée"""
     # Calculer la période
     end_date = datetime.now().date()
@@ -167,7 +177,7 @@ def get_mock_transactions(days=30, count=None):
     
     while current <= end_date:
         year, month = current.year, current.month
-        monthly_txs = generate_monthly_transactions(year, month, start_date, end_date, 15)
+        monthly_txs = generate_monthly_transactions(year, month, start_date, end_date, 15, rng)
         all_transactions.extend(monthly_txs)
         
         # Passer au mois suivant
@@ -182,22 +192,23 @@ def get_mock_transactions(days=30, count=None):
             # Ajouter des transactions supplémentaires pour atteindre le nombre demandé
             for _ in range(count - len(all_transactions)):
                 # Choisir une date aléatoire dans la période
-                random_date = start_date + timedelta(days=random.randint(0, days))
+                random_date = start_date + timedelta(days=rng.randint(0, days))
                 
                 # Choisir une catégorie aléatoire
-                cat_id = random.choice(list(CATEGORIES_SCHEMA.keys()))
-                subcat_id = random.choice(list(CATEGORIES_SCHEMA[cat_id]["subcategories"].keys()))
+                categories_schema = get_categories_schema()
+                cat_id = rng.choice(list(categories_schema.keys()))
+                subcat_id = rng.choice(list(categories_schema[cat_id]["subcategories"].keys()))
                 
                 # Générer la transaction
                 tx_data = {
                     "category": cat_id,
                     "subcategory": subcat_id,
-                    "name": random.choice(MERCHANTS.get(cat_id, ["Inconnu"])),
+                    "name": rng.choice(MERCHANTS.get(cat_id, ["Inconnu"])),
                     "amount": (-200, -50) if cat_id == "income" else (5, 200)
                 }
                 
                 # Ajouter la transaction
-                all_transactions.append(create_transaction(tx_data, random_date))
+                all_transactions.append(create_transaction(tx_data, random_date, rng))
         elif len(all_transactions) > count:
             # Limiter au nombre demandé
             all_transactions = all_transactions[:count]
@@ -0,0 +1,71 @@
+"""
+Utilitaires de pagination par curseur (keyset)
+"""
+import base64
+import json
+
+# Taille de page par défaut et maximale
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(*values):
+    """
+    Encode les clés de la dernière ligne d'une page en curseur opaque
+
+    Args:
+        *values: Valeurs de la clé de tri (ex: date, id)
+
+    Returns:
+        str: Curseur encodé en base64 url-safe
+    """
+    payload = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Décode un curseur opaque
+
+    Args:
+        cursor (str): Curseur reçu du client
+        size (int): Nombre de valeurs attendues dans le curseur
+
+    Returns:
+        tuple: Valeurs de la clé de tri
+
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (TypeError, ValueError):
+        raise ValueError("Curseur de pagination invalide")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Curseur de pagination invalide")
+
+    return tuple(values)
+
+
+def parse_page_size(limit):
+    """
+    Valide la taille de page demandée
+
+    Args:
+        limit: Taille demandée (None pour la valeur par défaut)
+
+    Returns:
+        int: Taille de page bornée à MAX_PAGE_SIZE
+
+    Raises:
+        ValueError: Si la taille n'est pas un entier positif
+    """
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+
+    if isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0:
+        raise ValueError("Le paramètre 'limit' doit être un entier positif")
+
+    return min(limit, MAX_PAGE_SIZE)
@@ -0,0 +1,381 @@
+"""
+Cache des réponses JSON pré-sérialisées, invalidé par un compteur de version par utilisateur.
+
+Chaque écriture sur les transactions d'un utilisateur incrémente sa version.
+La version fait partie de la clé de cache : les anciennes entrées ne sont plus
+jamais lues et finissent évincées par la politique LRU, bornée en octets.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+from config import (
+    DATABASE_URL, RESPONSE_CACHE_ACCESS_RESOLUTION, RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_PATH
+)
+from utils.serialization import dumps
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """
+    Cache en mémoire du processus.
+
+    Les versions sont propres au processus : à n'utiliser qu'avec un seul
+    worker, sinon une écriture traitée par un autre worker ne l'invalide pas.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_version(self, user_id):
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def bump_version(self, user_id):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size}
+
+
+class SQLiteCacheBackend:
+    """
+    Cache partagé par tous les processus de la machine, stocké dans un fichier SQLite.
+
+    Versions et entrées vivent dans le même fichier : supprimer le fichier
+    remet les deux à zéro de façon cohérente.
+
+    Le nombre d'entrées et leur taille totale sont tenus à jour par des
+    triggers (table totals), dans la même transaction que chaque écriture :
+    l'éviction n'a pas à parcourir la table. La date de dernière lecture,
+    qui ordonne l'éviction, n'est réécrite qu'une fois par
+    access_resolution secondes et par entrée.
+    """
+
+    def __init__(self, path, max_bytes, access_resolution=RESPONSE_CACHE_ACCESS_RESOLUTION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.access_resolution = access_resolution
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS entries ("
+                         "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (user_id TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS totals ("
+                         "id INTEGER PRIMARY KEY CHECK (id = 0), entries INTEGER NOT NULL, size INTEGER NOT NULL)")
+            # Fichier créé avant les triggers : totaux calculés une fois, dans la même transaction
+            conn.execute("INSERT OR IGNORE INTO totals (id, entries, size) "
+                         "SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM entries")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN "
+                         "UPDATE totals SET entries = entries + 1, size = size + NEW.size WHERE id = 0; END")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN "
+                         "UPDATE totals SET size = size - OLD.size + NEW.size WHERE id = 0; END")
+            conn.execute("CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN "
+                         "UPDATE totals SET entries = entries - 1, size = size - OLD.size WHERE id = 0; END")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _connect(self):
+        """Connexion propre au thread courant (sqlite3 ne partage pas les connexions)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT value, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] >= self.access_resolution:
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        conn = self._connect()
+        # UPSERT plutôt que INSERT OR REPLACE : le remplacement d'une entrée
+        # ne déclencherait pas le trigger de suppression
+        conn.execute("INSERT INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?) "
+                     "ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size, "
+                     "accessed = excluded.accessed",
+                     (key, value, len(value), time.time()))
+        self._evict(conn)
+
+    def _evict(self, conn):
+        """Évince les entrées les moins récemment lues jusqu'à repasser sous max_bytes"""
+        total = conn.execute("SELECT size FROM totals WHERE id = 0").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            keys.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in keys])
+
+    def get_version(self, user_id):
+        row = self._connect().execute("SELECT version FROM versions WHERE user_id = ?", (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def bump_version(self, user_id):
+        self._connect().execute(
+            "INSERT INTO versions (user_id, version) VALUES (?, 1) "
+            "ON CONFLICT(user_id) DO UPDATE SET version = version + 1",
+            (user_id,)
+        )
+
+    def stats(self):
+        entries, size = self._connect().execute("SELECT entries, size FROM totals WHERE id = 0").fetchone()
+        return {'entries': entries, 'bytes': size}
+
+
+class ResponseCache:
+    """
+    Cache de réponses par utilisateur, au-dessus d'un backend interchangeable.
+
+    Les erreurs du backend ne font jamais échouer une requête : elles sont
+    journalisées et traitées comme un défaut de cache.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        # Compteurs partagés par les threads du worker
+        self._stats_lock = threading.Lock()
+
+    def make_key(self, user_id, params):
+        """
+        Construit la clé d'une réponse à partir de la version courante de l'utilisateur
+
+        Args:
+            user_id (str): Identifiant de l'utilisateur
+            params (dict): Paramètres qui déterminent la réponse (mode, days, filtres...)
+
+        Returns:
+            str: Clé de cache, ou None si le backend est indisponible
+        """
+        try:
+            version = self.backend.get_version(user_id)
+        except Exception as e:
+            logger.warning(f"Cache de réponses indisponible: {str(e)}")
+            return None
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        return f"{user_id}:{version}:{digest}"
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Lecture du cache de réponses impossible: {str(e)}")
+            value = None
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            logger.warning(f"Écriture du cache de réponses impossible: {str(e)}")
+
+    def bump_version(self, user_id):
+        try:
+            self.backend.bump_version(user_id)
+        except Exception as e:
+            logger.error(f"Invalidation du cache impossible pour l'utilisateur {user_id}: {str(e)}")
+
+    def stats(self):
+        try:
+            stats = self.backend.stats()
+        except Exception:
+            stats = {}
+        with self._stats_lock:
+            return dict(stats, hits=self.hits, misses=self.misses)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def default_cache_path():
+    """
+    Fichier du cache 'local' lorsque RESPONSE_CACHE_PATH n'est pas défini
+
+    Le nom dépend de la base de données et du dossier d'instance de
+    l'application (où Flask-SQLAlchemy place les bases SQLite relatives) :
+    les workers d'un même déploiement partagent le fichier, deux
+    déploiements de la même machine non.
+
+    Returns:
+        str: Chemin du fichier dans le répertoire temporaire
+    """
+    if has_app_context():
+        scope = f"{current_app.instance_path}|{current_app.config['SQLALCHEMY_DATABASE_URI']}"
+    else:
+        scope = f"{os.getcwd()}|{DATABASE_URL}"
+    digest = hashlib.sha1(scope.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"cashsense_response_cache_{digest}.db")
+
+
+def get_response_cache():
+    """
+    Retourne le cache de réponses configuré (créé au premier appel)
+
+    Returns:
+        ResponseCache: Le cache, ou None si RESPONSE_CACHE_BACKEND vaut 'none'
+    """
+    global _cache
+    if _cache is None and RESPONSE_CACHE_BACKEND != 'none':
+        with _cache_lock:
+            if _cache is None:
+                if RESPONSE_CACHE_BACKEND == 'memory':
+                    backend = MemoryCacheBackend(RESPONSE_CACHE_MAX_BYTES)
+                elif RESPONSE_CACHE_BACKEND == 'local':
+                    backend = SQLiteCacheBackend(RESPONSE_CACHE_PATH or default_cache_path(), RESPONSE_CACHE_MAX_BYTES)
+                else:
+                    raise ValueError(f"Backend de cache inconnu: {RESPONSE_CACHE_BACKEND}")
+                _cache = ResponseCache(backend)
+    return _cache
+
+
+def set_response_cache(cache):
+    """
+    Remplace le cache de réponses (backend personnalisé, tests)
+
+    Args:
+        cache (ResponseCache): Nouveau cache, ou None pour revenir à la configuration
+    """
+    global _cache
+    _cache = cache
+
+
+def bump_user_version(user_id):
+    """
+    Invalide toutes les réponses en cache d'un utilisateur
+
+    À appeler après le commit de toute écriture sur ses transactions.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+    """
+    cache = get_response_cache()
+    if cache is not None:
+        cache.bump_version(user_id)
+
+
+def response_cache_key(user_id, params):
+    """
+    Retourne la clé de cache d'une réponse, à la version courante de l'utilisateur
+
+    La clé change à chaque écriture sur les transactions de l'utilisateur
+    (bump_user_version) : elle peut servir d'ETag sans lire la base.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        params (dict): Paramètres qui déterminent la réponse
+
+    Returns:
+        str: Clé de cache, ou None si le cache est désactivé ou indisponible
+    """
+    cache = get_response_cache()
+    return cache.make_key(user_id, params) if cache is not None else None
+
+
+# Calculs de réponses en cours, regroupés par clé de cache
+_response_flight = SingleFlight()
+
+
+def cached_json_response(user_id, params, compute, key=None):
+    """
+    Retourne une réponse JSON servie depuis le cache, ou calculée puis mise en cache
+
+    Les requêtes identiques qui manquent le cache en même temps dans le
+    processus partagent un seul calcul. La clé contenant la version de
+    l'utilisateur, une requête arrivée après une écriture n'est jamais
+    regroupée avec un calcul commencé avant.
+
+    Args:
+        user_id (str): Identifiant de l'utilisateur
+        params (dict): Paramètres qui déterminent la réponse
+        compute (callable): Fonction sans argument renvoyant le contenu à sérialiser
+        key (str, optional): Clé déjà obtenue par response_cache_key (évite de
+            relire la version de l'utilisateur)
+
+    Returns:
+        Response: Réponse Flask application/json
+    """
+    cache = get_response_cache()
+    if key is None and cache is not None:
+        key = cache.make_key(user_id, params)
+
+    if key is None:
+        body = dumps(compute())
+    else:
+        body = cache.get(key)
+        if body is None:
+            body = _response_flight.do(key, lambda: _compute_and_store(cache, key, compute))
+
+    return current_app.response_class(body, mimetype='application/json')
+
+
+def _compute_and_store(cache, key, compute):
+    """Calcule et sérialise une réponse puis la met en cache"""
+    body = dumps(compute())
+    cache.set(key, body)
+    return body
+
@@ -1,6 +1,10 @@
 """
 Utilitaire pour charger les schémas JSON
+
+Les schémas sont lus au premier accès puis gardés en mémoire : importer ce
+module (ou l'application) ne touche pas au disque.
 """
+from functools import lru_cache
 import json
 import os
 import logging
@@ -46,6 +50,18 @@ def load_schema(filename):
         logger.error(f"Format JSON invalide dans le schéma '{filename}'")
         return {}
 
-# Charger les schémas
-TRANSACTION_SCHEMA = load_schema('transaction.json')
-CATEGORIES_SCHEMA = load_schema('categories.json')
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_transaction_schema():
+    """
+    Returns:
+        dict: Schéma des transactions (schemas/transaction.json), chargé au premier appel
+    """
+    return load_schema('transaction.json')
+
+@lru_cache(maxsize=None)
+def get_categories_schema():
+    """
+    Returns:
+        dict: Schéma des catégories (schemas/categories.json), chargé au premier appel
+    """
+    return load_schema('categories.json')
\ No newline at end of file
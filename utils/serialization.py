@@ -0,0 +1,104 @@
+"""
+Sérialisation JSON des réponses, avec orjson si disponible et json en repli.
+
+Le backend est choisi une fois au chargement (JSON_SERIALIZER) : toutes les
+réponses, y compris celles de jsonify, passent par dumps() qui produit
+directement des octets UTF-8, sans chaîne intermédiaire.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+import json
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+from config import JSON_SERIALIZER
+from utils.instrumentation import record_serialization
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+
+def _default(value):
+    """Convertit les types non natifs rencontrés dans les réponses"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Objet de type {type(value).__name__} non sérialisable en JSON")
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+if JSON_SERIALIZER == 'orjson' and orjson is None:
+    raise ValueError("JSON_SERIALIZER=orjson mais le paquet orjson n'est pas installé")
+if JSON_SERIALIZER not in ('auto', 'orjson', 'json'):
+    raise ValueError(f"Sérialiseur JSON inconnu: {JSON_SERIALIZER}")
+
+# Backend retenu : 'orjson' ou 'json'
+BACKEND = 'orjson' if orjson is not None and JSON_SERIALIZER != 'json' else 'json'
+
+_dumps = _orjson_dumps if BACKEND == 'orjson' else _stdlib_dumps
+
+
+def dumps(obj):
+    """
+    Sérialise un objet en JSON compact
+
+    Args:
+        obj: Objet à sérialiser (dict, list, types scalaires, Decimal, dates)
+
+    Returns:
+        bytes: Document JSON encodé en UTF-8
+    """
+    start = time.perf_counter()
+    body = _dumps(obj)
+    record_serialization(time.perf_counter() - start)
+    return body
+
+
+loads = orjson.loads if BACKEND == 'orjson' else json.loads
+
+
+def dumps_items(items):
+    """
+    Sérialise une liste d'objets sans les crochets englobants
+
+    Permet de concaténer des morceaux d'un même tableau JSON (streaming).
+
+    Args:
+        items (list): Objets à sérialiser
+
+    Returns:
+        bytes: Éléments séparés par des virgules
+    """
+    return dumps(items)[1:-1]
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Fournisseur JSON de Flask utilisant le backend de ce module
+
+    Les clés ne sont pas triées et la sortie est toujours compacte : la
+    réponse est construite directement à partir des octets sérialisés.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,77 @@
+"""
+Regroupement des appels concurrents identiques (single-flight).
+
+Quand plusieurs threads du processus demandent le même calcul en même temps,
+seul le premier l'exécute ; les autres attendent son résultat (ou son
+exception) au lieu de le refaire. Le regroupement ne dure que le temps du
+calcul : un appel arrivé après sa fin relance un calcul.
+"""
+from concurrent.futures import Future
+import threading
+
+
+class SingleFlight:
+    """
+    Regroupe les appels concurrents par clé
+
+    Le résultat est partagé entre tous les appelants : il ne doit pas être
+    modifié en place.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn, timeout=None):
+        """
+        Exécute fn, ou attend le résultat d'un appel en cours pour la même clé
+
+        Args:
+            key: Clé hachable identifiant le calcul
+            fn (callable): Fonction sans argument
+            timeout (float, optional): Attente maximale d'un calcul en cours, en secondes
+
+        Returns:
+            Le résultat de fn (partagé avec les appels regroupés)
+
+        Raises:
+            Exception: L'exception levée par fn, relancée dans chaque appelant
+            TimeoutError: Si le calcul en cours dépasse timeout
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            return future.result(timeout)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._forget(key)
+            future.set_exception(e)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    def _forget(self, key):
+        """Retire l'appel en cours : les appels suivants relanceront le calcul"""
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Calculs exécutés, appels servis par un calcul en cours, calculs en cours
+        """
+        with self._lock:
+            return {'executed': self.executed, 'shared': self.shared, 'in_flight': len(self._calls)}
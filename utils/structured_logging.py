@@ -0,0 +1,250 @@
+"""
+Journalisation structurée et non bloquante.
+
+Les threads de requête ne font que déposer leurs enregistrements dans une
+file bornée (QueueHandler) ; un thread d'écriture (QueueListener) les formate
+en JSON, une ligne par enregistrement, et les écrit sur la sortie standard.
+Une file pleine fait abandonner l'enregistrement (compté) plutôt que
+bloquer la requête.
+
+Chaque enregistrement émis pendant une requête porte son identifiant
+(request_id, repris de l'en-tête X-Request-ID s'il est fourni) et, une fois
+l'utilisateur vérifié, son identifiant (user_id). Les champs passés par
+extra= (durées, compteurs) sont ajoutés tels quels. LOG_SAMPLING ne garde
+qu'une fraction des enregistrements de certains loggers, sous WARNING.
+"""
+import atexit
+import copy
+from datetime import datetime, timezone
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import random
+import re
+import sys
+import uuid
+
+from flask import g, has_request_context, request
+
+from config import LOG_FORMAT, LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLING
+from utils.serialization import dumps
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+# Identifiant fourni par le client accepté tel quel (sinon un nouveau est tiré)
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# Attributs propres à LogRecord : tout autre attribut vient de extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+
+def parse_sampling(spec):
+    """
+    Analyse la configuration d'échantillonnage
+
+    Args:
+        spec (str): Liste 'logger=taux' séparée par des virgules, ex. 'services=0.1'
+
+    Returns:
+        dict: Taux conservé (entre 0 et 1) par nom de logger
+
+    Raises:
+        ValueError: Si une entrée est mal formée ou un taux hors de [0, 1]
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        name, separator, rate = entry.partition('=')
+        try:
+            rate = float(rate)
+        except ValueError:
+            rate = None
+        if not separator or not name.strip() or rate is None or not 0 <= rate <= 1:
+            raise ValueError(f"Échantillonnage de logs invalide: '{entry}' (attendu logger=taux entre 0 et 1)")
+        rates[name.strip()] = rate
+    return rates
+
+
+class RequestContextFilter(logging.Filter):
+    """Ajoute request_id et user_id aux enregistrements émis pendant une requête"""
+
+    def filter(self, record):
+        if has_request_context():
+            if getattr(record, 'request_id', None) is None:
+                record.request_id = g.get('request_id')
+            if getattr(record, 'user_id', None) is None:
+                record.user_id = g.get('user_id')
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Ne garde qu'une fraction des enregistrements de certains loggers
+
+    Le taux d'un logger est celui de son ancêtre le plus proche présent dans
+    la configuration. Les avertissements et erreurs sont toujours gardés.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+        self._resolved = {}
+
+    def _rate(self, name):
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition('.')[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler qui abandonne (et compte) les enregistrements quand la file est pleine"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Message et trace calculés dans le thread appelant : les arguments
+        # peuvent changer ou ne plus être lisibles quand l'écrivain les traite
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """Formate un enregistrement en une ligne JSON"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        try:
+            return dumps(entry).decode('utf-8')
+        except TypeError:
+            return dumps({key: value if isinstance(value, (str, int, float, bool)) else repr(value)
+                          for key, value in entry.items()}).decode('utf-8')
+
+
+_handler = None
+_listener = None
+
+
+def _start_listener(output_handlers):
+    global _listener
+    _handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+    _listener = QueueListener(_handler.queue, *output_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def configure_logging():
+    """
+    Installe la file de journalisation sur le logger racine (une seule fois)
+
+    Returns:
+        NonBlockingQueueHandler: Le handler installé
+    """
+    global _handler
+    if _handler is not None:
+        return _handler
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JSONFormatter() if LOG_FORMAT == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    _handler = NonBlockingQueueHandler(None)
+    _handler.addFilter(SamplingFilter(parse_sampling(LOG_SAMPLING)))
+    _handler.addFilter(RequestContextFilter())
+    _start_listener([output])
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    atexit.register(stop_logging)
+    return _handler
+
+
+def restart_after_fork():
+    """
+    Relance l'écrivain dans un processus forké
+
+    Le thread d'écriture du processus parent n'existe pas dans l'enfant :
+    sans lui, la file se remplirait sans jamais être vidée. Une nouvelle
+    file remplace celle héritée (et son verrou, éventuellement tenu au fork).
+    """
+    if _listener is not None:
+        _start_listener(_listener.handlers)
+
+
+def stop_logging():
+    """Vide la file et arrête l'écrivain (fin du processus)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records():
+    """
+    Returns:
+        int: Enregistrements abandonnés faute de place dans la file
+    """
+    return _handler.dropped if _handler is not None else 0
+
+
+def _assign_request_id():
+    request_id = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = request_id if _VALID_REQUEST_ID.match(request_id) else uuid.uuid4().hex
+
+
+def _add_request_id_header(response):
+    request_id = g.get('request_id')
+    if request_id:
+        response.headers[REQUEST_ID_HEADER] = request_id
+    return response
+
+
+def init_logging(app):
+    """
+    Configure la journalisation et attribue un identifiant à chaque requête
+
+    L'identifiant est renvoyé dans l'en-tête X-Request-ID pour relier une
+    réponse à ses lignes de log.
+
+    Args:
+        app (Flask): Application à configurer
+    """
+    configure_logging()
+    app.before_request(_assign_request_id)
+    app.after_request(_add_request_id_header)
@@ -0,0 +1,288 @@
+"""
+Générateur vectorisé (NumPy) de transactions fictives pour les jeux de données
+volumineux (tests de charge, benchmarks).
+
+Reprend la sémantique de utils/mock_data (transactions RECURRING chaque mois,
+SPECIAL selon leur probabilité et leurs mois, complément aléatoire jusqu'à un
+minimum par mois) mais produit directement des colonnes pour N utilisateurs
+× M mois à partir d'une graine.
+"""
+import csv
+from datetime import date
+
+import numpy as np
+
+from utils.schema_loader import get_categories_schema
+from utils.mock_data import MERCHANTS, TX_TYPES
+
+# Nombre minimum de transactions par utilisateur et par mois (comme get_mock_transactions)
+DEFAULT_MIN_COUNT = 15
+
+# Nombre de lignes écrites par paquet (fichier ou base)
+WRITE_CHUNK_SIZE = 50000
+
+PAYMENT_CHANNELS = ["in store", "online"]
+
+
+def _build_lookup_tables():
+    """
+    Construit les tables de correspondance code -> valeur
+
+    Returns:
+        tuple: (paires (catégorie, sous-catégorie), noms de marchands)
+    """
+    pairs = []
+    for category_id, category in get_categories_schema().items():
+        for subcategory_id in category.get("subcategories", {}):
+            pairs.append((category_id, subcategory_id))
+
+    merchants = []
+    for names in MERCHANTS.values():
+        merchants.extend(name for name in names if name not in merchants)
+    for tx_type in TX_TYPES.values():
+        merchants.extend(config["name"] for config in tx_type if config["name"] not in merchants)
+    merchants.append("Inconnu")
+
+    return pairs, merchants
+
+
+CATEGORY_PAIRS, MERCHANT_NAMES = _build_lookup_tables()
+_PAIR_CODES = {pair: code for code, pair in enumerate(CATEGORY_PAIRS)}
+_MERCHANT_CODES = {name: code for code, name in enumerate(MERCHANT_NAMES)}
+
+
+def _fixed_columns(config, users, dates, rng):
+    """Colonnes d'une série de transactions issues d'une configuration de TX_TYPES"""
+    min_amount, max_amount = config["amount"]
+    count = len(users)
+    return {
+        "user": users,
+        "date": dates,
+        "amount": rng.uniform(min_amount, max_amount, count),
+        "pair": np.full(count, _PAIR_CODES[(config["category"], config["subcategory"])], dtype=np.int16),
+        "merchant": np.full(count, _MERCHANT_CODES[config["name"]], dtype=np.int16),
+    }
+
+
+def _random_days(month_starts, available_days, rng):
+    """Tire un jour aléatoire dans la partie disponible de chaque mois"""
+    offsets = (rng.random(len(month_starts)) * available_days).astype(np.int64)
+    return month_starts + offsets
+
+
+def generate_columns(n_users, months, seed=None, end_date=None, min_count=DEFAULT_MIN_COUNT):
+    """
+    Génère les transactions de N utilisateurs sur M mois sous forme de colonnes
+
+    Args:
+        n_users (int): Nombre d'utilisateurs
+        months (int): Nombre de mois, le dernier étant celui de end_date
+        seed (int, optional): Graine du générateur (résultat reproductible)
+        end_date (date, optional): Date de fin (aujourd'hui par défaut)
+        min_count (int): Nombre minimum de transactions par utilisateur et par mois
+
+    Returns:
+        dict: Tableaux NumPy de même longueur :
+            user (index d'utilisateur), date (datetime64[D]), amount (float64),
+            pair (code dans CATEGORY_PAIRS), merchant (code dans MERCHANT_NAMES),
+            channel (code dans PAYMENT_CHANNELS), id (entier aléatoire 64 bits)
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or date.today()
+
+    # Mois couverts et nombre de jours disponibles (le mois courant s'arrête à end_date)
+    end_month = np.datetime64(end_date, 'M')
+    month_starts = np.arange(end_month - (months - 1), end_month + 1)
+    first_days = month_starts.astype('datetime64[D]')
+    days_in_month = ((month_starts + 1).astype('datetime64[D]') - first_days).astype(np.int64)
+    available_days = days_in_month.copy()
+    available_days[-1] = end_date.day
+    month_numbers = month_starts.astype(np.int64) % 12 + 1
+
+    # Grille utilisateur × mois
+    grid_users = np.repeat(np.arange(n_users, dtype=np.int32), months)
+    grid_months = np.tile(np.arange(months), n_users)
+    counts = np.zeros(len(grid_users), dtype=np.int64)
+    parts = []
+
+    # 1. Transactions récurrentes : chaque mois, à un jour fixe entre 1 et 5
+    for index, config in enumerate(TX_TYPES["RECURRING"]):
+        fixed_day = (index % 5) + 1
+        mask = days_in_month[grid_months] >= fixed_day
+        dates = first_days[grid_months[mask]] + (fixed_day - 1)
+        parts.append(_fixed_columns(config, grid_users[mask], dates, rng))
+        counts += mask
+
+    # 2. Transactions spéciales selon leurs mois et leur probabilité
+    for config in TX_TYPES["SPECIAL"]:
+        mask = rng.random(len(grid_users)) <= config["probability"]
+        if config["months"]:
+            mask &= np.isin(month_numbers[grid_months], config["months"])
+        selected = grid_months[mask]
+        dates = _random_days(first_days[selected], available_days[selected], rng)
+        parts.append(_fixed_columns(config, grid_users[mask], dates, rng))
+        counts += mask
+
+    # 3. Complément aléatoire pour atteindre le minimum mensuel
+    missing = np.maximum(min_count - counts, 0)
+    fill_users = np.repeat(grid_users, missing)
+    fill_months = np.repeat(grid_months, missing)
+    fill_count = len(fill_users)
+    if fill_count:
+        # Catégorie puis sous-catégorie tirées uniformément, comme dans mock_data
+        categories_schema = get_categories_schema()
+        categories = list(categories_schema)
+        category_index = rng.integers(0, len(categories), fill_count)
+        subcategory_counts = np.array([len(categories_schema[c].get("subcategories", {})) for c in categories])
+        subcategory_offsets = np.concatenate(([0], np.cumsum(subcategory_counts)[:-1]))
+        pairs = subcategory_offsets[category_index] + (
+            rng.random(fill_count) * subcategory_counts[category_index]).astype(np.int64)
+
+        # Marchand tiré parmi ceux de la catégorie
+        merchant_table = [[_MERCHANT_CODES[name] for name in MERCHANTS.get(c, ["Inconnu"])] for c in categories]
+        merchant_counts = np.array([len(names) for names in merchant_table])
+        merchant_offsets = np.concatenate(([0], np.cumsum(merchant_counts)[:-1]))
+        merchant_flat = np.array([code for names in merchant_table for code in names], dtype=np.int16)
+        merchants = merchant_flat[merchant_offsets[category_index] + (
+            rng.random(fill_count) * merchant_counts[category_index]).astype(np.int64)]
+
+        is_income = np.array([c == "income" for c in categories])[category_index]
+        amounts = np.where(is_income, rng.uniform(-200, -50, fill_count), rng.uniform(5, 200, fill_count))
+
+        parts.append({
+            "user": fill_users,
+            "date": _random_days(first_days[fill_months], available_days[fill_months], rng),
+            "amount": amounts,
+            "pair": pairs.astype(np.int16),
+            "merchant": merchants,
+        })
+
+    columns = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    columns["amount"] = np.round(columns["amount"], 2)
+
+    # Les revenus (montants négatifs) sont en ligne, les dépenses au hasard
+    total = len(columns["user"])
+    columns["channel"] = np.where(columns["amount"] < 0, 1, rng.integers(0, 2, total)).astype(np.int8)
+    columns["id"] = rng.integers(0, np.iinfo(np.int64).max, total, dtype=np.int64)
+
+    # Trier par utilisateur puis date décroissante
+    order = np.lexsort((-columns["date"].astype(np.int64), columns["user"]))
+    return {key: values[order] for key, values in columns.items()}
+
+
+def iter_rows(columns, user_ids, chunk_size=WRITE_CHUNK_SIZE, category_codes=None):
+    """
+    Convertit les colonnes en lignes de la table Transaction, par paquets
+
+    Args:
+        columns (dict): Colonnes produites par generate_columns
+        user_ids (list): Identifiant de chaque utilisateur (par index)
+        chunk_size (int): Nombre de lignes par paquet
+        category_codes (list, optional): Code de chaque paire de CATEGORY_PAIRS
+            (par index), requis pour une insertion en base ; sans lui, le code
+            d'une paire est son index dans CATEGORY_PAIRS
+
+    Yields:
+        list: Paquet de lignes (dict) prêtes à insérer
+    """
+    total = len(columns["user"])
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        # datetime64[D] -> datetime.date ; centimes calculés en bloc
+        dates = columns["date"][start:stop].tolist()
+        cents = np.rint(columns["amount"][start:stop] * 100).astype(np.int64).tolist()
+        rows = []
+        for i, offset in enumerate(range(start, stop)):
+            pair = int(columns["pair"][offset])
+            rows.append({
+                "id": f"txn_{int(columns['id'][offset]):016x}",
+                "userId": user_ids[columns["user"][offset]],
+                "txDate": dates[i],
+                "amountCents": cents[i],
+                "merchantName": MERCHANT_NAMES[columns["merchant"][offset]],
+                "paymentChannel": PAYMENT_CHANNELS[columns["channel"][offset]],
+                "pending": False,
+                "categoryCode": category_codes[pair] if category_codes else pair,
+                "isTestData": True,
+                "isManual": False,
+            })
+        yield rows
+
+
+def _file_record(row):
+    """Ligne de fichier CSV (date, montant et catégorie lisibles) d'une ligne produite par iter_rows"""
+    category_id, subcategory_id = CATEGORY_PAIRS[row["categoryCode"]]
+    return dict(row, date=row["txDate"].isoformat(), amount=row["amountCents"] / 100,
+                category=category_id, subcategory=subcategory_id)
+
+
+def write_to_file(columns, path, user_ids=None):
+    """
+    Écrit les colonnes dans un fichier
+
+    Args:
+        columns (dict): Colonnes produites par generate_columns
+        path (str): Fichier de sortie (.npz pour les colonnes brutes, CSV sinon)
+        user_ids (list, optional): Identifiant de chaque utilisateur (CSV uniquement)
+
+    Returns:
+        int: Nombre de transactions écrites
+    """
+    if path.endswith('.npz'):
+        np.savez_compressed(path, **columns)
+        return len(columns["user"])
+
+    user_ids = user_ids or default_user_ids(int(columns["user"].max()) + 1 if len(columns["user"]) else 0)
+    fields = ["id", "userId", "date", "amount", "merchantName", "paymentChannel",
+              "pending", "category", "subcategory", "isTestData", "isManual"]
+
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+        writer.writeheader()
+        for rows in iter_rows(columns, user_ids):
+            writer.writerows(_file_record(row) for row in rows)
+            written += len(rows)
+    return written
+
+
+def write_to_db(columns, user_ids):
+    """
+    Insère les colonnes en base, un commit par paquet, en créant les utilisateurs manquants
+
+    Doit être appelé dans un contexte d'application Flask.
+
+    Args:
+        columns (dict): Colonnes produites par generate_columns
+        user_ids (list): Identifiant de chaque utilisateur (par index)
+
+    Returns:
+        int: Nombre de transactions insérées
+    """
+    from db_models import db, User
+    from services.bulk_writer import bulk_insert_transactions
+    from utils.category_registry import encode_category
+    from utils.response_cache import bump_user_version
+
+    existing = set(db.session.scalars(db.select(User.id).where(User.id.in_(user_ids))))
+    missing = [{"id": user_id} for user_id in user_ids if user_id not in existing]
+    if missing:
+        db.session.execute(db.insert(User), missing)
+        db.session.commit()
+
+    category_codes = [encode_category(category_id, subcategory_id) for category_id, subcategory_id in CATEGORY_PAIRS]
+
+    written = 0
+    for rows in iter_rows(columns, user_ids, category_codes=category_codes):
+        bulk_insert_transactions(rows)
+        db.session.commit()
+        written += len(rows)
+
+    for user_id in user_ids:
+        bump_user_version(user_id)
+    return written
+
+
+def default_user_ids(n_users):
+    """Identifiants d'utilisateurs synthétiques par défaut"""
+    return [f"synthetic-user-{i}" for i in range(n_users)]
@@ -1,60 +1,252 @@
 
-from utils.schema_loader import TRANSACTION_SCHEMA, CATEGORIES_SCHEMA
+from functools import lru_cache
+
+from utils.schema_loader import get_categories_schema, get_transaction_schema
+from utils.category_registry import schema_category_pairs
+
+
+class TransactionValidationError(ValueError):
+    """Erreur de base levée quand une transaction ne respecte pas le schéma"""
+
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.field = field
+
+
+class MissingFieldError(TransactionValidationError):
+    """Un champ requis par TRANSACTION_SCHEMA est absent"""
+
+
+class InvalidTypeError(TransactionValidationError):
+    """Un champ (ou la transaction elle-même) n'a pas le type attendu"""
+
+
+class UnknownCategoryError(TransactionValidationError):
+    """La catégorie n'existe pas dans CATEGORIES_SCHEMA"""
+
+
+class UnknownSubcategoryError(TransactionValidationError):
+    """La sous-catégorie n'existe pas pour la catégorie donnée"""
+
+
+# Correspondance entre les types du schéma et les types Python
+_SCHEMA_TYPES = {
+    "string": (str, "une chaîne de caractères"),
+    "number": ((int, float), "un nombre"),
+    "boolean": (bool, "un booléen"),
+}
+
+
+def _compile_field_check(field, expected_type):
+    """Construit la fonction de vérification d'un champ simple"""
+    missing_message = f"Schéma non respecté: champ '{field}' requis par TRANSACTION_SCHEMA est manquant"
+    python_type, label = _SCHEMA_TYPES.get(expected_type, (None, None))
+
+    if python_type is None:
+        # Type sans contrainte : seule la présence est vérifiée
+        def check(transaction):
+            if field not in transaction:
+                return MissingFieldError(missing_message, field)
+            return None
+        return check
+
+    type_message = f"Schéma non respecté: '{field}' doit être {label}"
+
+    def check(transaction):
+        if field not in transaction:
+            return MissingFieldError(missing_message, field)
+        if not isinstance(transaction[field], python_type):
+            return InvalidTypeError(type_message, field)
+        return None
+    return check
+
+
+def _valid_category_pairs(categories_schema):
+    """Précalcule les paires (catégorie, sous-catégorie) autorisées"""
+    return frozenset(schema_category_pairs(categories_schema))
+
+
+def _contains(collection, value):
+    """Test d'appartenance tolérant les valeurs non hachables (listes, dicts...)"""
+    try:
+        return value in collection
+    except TypeError:
+        return False
+
+
+def _compile_category_check(categories_schema):
+    """Construit la fonction de vérification du champ 'category'"""
+    missing_message = "Schéma non respecté: champ 'category' requis par TRANSACTION_SCHEMA est manquant"
+    valid_categories = frozenset(categories_schema)
+    valid_pairs = _valid_category_pairs(categories_schema)
+
+    def check(transaction):
+        if "category" not in transaction:
+            return MissingFieldError(missing_message, "category")
+
+        # Vérifier que category est un dict avec un id
+        cat = transaction["category"]
+        if not isinstance(cat, dict) or "id" not in cat:
+            return InvalidTypeError("Schéma non respecté: 'category' doit être un dict avec un champ 'id'", "category")
+
+        # Vérifier que l'id de category existe dans CATEGORIES_SCHEMA
+        if not _contains(valid_categories, cat["id"]):
+            return UnknownCategoryError(
+                f"Schéma non respecté: catégorie '{cat['id']}' inconnue dans CATEGORIES_SCHEMA", "category")
+
+        # Vérifier que subcategory est un dict avec un id
+        subcat = cat.get("subcategory")
+        if not isinstance(subcat, dict) or "id" not in subcat:
+            return InvalidTypeError("Schéma non respecté: manque 'subcategory' avec 'id' dans 'category'", "category")
+
+        # Vérifier que la paire (catégorie, sous-catégorie) existe
+        if not _contains(valid_pairs, (cat["id"], subcat["id"])):
+            return UnknownSubcategoryError(
+                f"Schéma non respecté: sous-catégorie '{subcat['id']}' inconnue pour catégorie '{cat['id']}'",
+                "category")
+        return None
+    return check
+
+
+def _compile_fast_path(transaction_schema, categories_schema):
+    """
+    Construit un prédicat rapide pour le cas nominal (transaction valide) :
+    une seule boucle sur des types précalculés et un test d'appartenance
+    dans le frozenset des paires (catégorie, sous-catégorie).
+    """
+    typed_fields = tuple(
+        (field, _SCHEMA_TYPES[expected_type][0])
+        for field, expected_type in transaction_schema.items()
+        if field != "category" and isinstance(expected_type, str) and expected_type in _SCHEMA_TYPES
+    )
+    untyped_fields = tuple(
+        field for field, expected_type in transaction_schema.items()
+        if field != "category" and not (isinstance(expected_type, str) and expected_type in _SCHEMA_TYPES)
+    )
+    check_category = "category" in transaction_schema
+    valid_pairs = _valid_category_pairs(categories_schema)
+
+    def is_valid(transaction):
+        try:
+            for field, python_type in typed_fields:
+                if not isinstance(transaction[field], python_type):
+                    return False
+            for field in untyped_fields:
+                if field not in transaction:
+                    return False
+            if check_category:
+                cat = transaction["category"]
+                return (cat["id"], cat["subcategory"]["id"]) in valid_pairs
+            return True
+        except (KeyError, TypeError):
+            # Champ manquant, structure inattendue ou identifiant non hachable
+            return False
+    return is_valid
+
+
+def compile_validator(transaction_schema, categories_schema):
+    """
+    Compile les schémas en fonctions de vérification prêtes à l'emploi.
+
+    Le schéma n'est parcouru qu'une seule fois : chaque champ devient une
+    fonction de vérification et les paires (catégorie, sous-catégorie)
+    valides sont précalculées dans un frozenset.
+
+    Args:
+        transaction_schema (dict): Schéma des champs d'une transaction
+        categories_schema (dict): Schéma des catégories
+
+    Returns:
+        tuple: (is_valid, checks) où is_valid est un prédicat rapide et
+        checks les vérifications détaillées, dans l'ordre du schéma, chacune
+        renvoyant une TransactionValidationError ou None
+    """
+    checks = []
+    for field, expected_type in transaction_schema.items():
+        if field == "category":
+            checks.append(_compile_category_check(categories_schema))
+        else:
+            checks.append(_compile_field_check(field, expected_type))
+    return _compile_fast_path(transaction_schema, categories_schema), tuple(checks)
+
+
+@lru_cache(maxsize=None)
+def _compiled_validator():
+    """Valideur des schémas de l'application, compilé à la première validation"""
+    return compile_validator(get_transaction_schema(), get_categories_schema())
+
+
+def get_validation_errors(transaction):
+    """
+    Retourne toutes les erreurs de schéma d'une transaction
+
+    Args:
+        transaction: La transaction à vérifier
+
+    Returns:
+        list: Erreurs TransactionValidationError (vide si la transaction est valide)
+    """
+    if not isinstance(transaction, dict):
+        return [InvalidTypeError("La transaction doit être un dictionnaire")]
+
+    is_valid, checks = _compiled_validator()
+    if is_valid(transaction):
+        return []
+
+    errors = []
+    for check in checks:
+        error = check(transaction)
+        if error is not None:
+            errors.append(error)
+    return errors
+
+
+def validate_transactions(transactions):
+    """
+    Valide un lot de transactions en une seule passe
+
+    Args:
+        transactions (list): Transactions à vérifier
+
+    Returns:
+        dict: Index de chaque transaction invalide -> liste de ses erreurs
+    """
+    is_valid, _ = _compiled_validator()
+    invalid = {}
+    for index, transaction in enumerate(transactions):
+        if isinstance(transaction, dict) and is_valid(transaction):
+            continue
+        invalid[index] = get_validation_errors(transaction)
+    return invalid
+
 
 def format_transaction(transaction):
     """
-    Vérifie si la transaction respecte le schéma défini dans TRANSACTION_SCHEMA 
+    Vérifie si la transaction respecte le schéma défini dans TRANSACTION_SCHEMA
     et CATEGORIES_SCHEMA.
-    
+
     Args:
         transaction: La transaction à vérifier
-        
+
     Returns:
         dict: La transaction validée
-        
+
     Raises:
-        Exception: Si le schéma n'est pas respecté
-    """    
+        TransactionValidationError: Première erreur de schéma rencontrée
+    """
     # Vérification que la transaction est un dictionnaire
     if not isinstance(transaction, dict):
-        raise Exception("La transaction doit être un dictionnaire")
-    
-    # Vérification des champs requis selon TRANSACTION_SCHEMA
-    for field, expected_type in TRANSACTION_SCHEMA.items():
-        # Vérifier présence du champ
-        if field not in transaction:
-            raise Exception(f"Schéma non respecté: champ '{field}' requis par TRANSACTION_SCHEMA est manquant")
-        
-        # Vérifier type simple
-        if expected_type == "string" and not isinstance(transaction[field], str):
-            raise Exception(f"Schéma non respecté: '{field}' doit être une chaîne de caractères")
-        elif expected_type == "number" and not isinstance(transaction[field], (int, float)):
-            raise Exception(f"Schéma non respecté: '{field}' doit être un nombre")
-        elif expected_type == "boolean" and not isinstance(transaction[field], bool):
-            raise Exception(f"Schéma non respecté: '{field}' doit être un booléen")
-        elif expected_type == "object" and field == "category":
-            # Vérification de la structure de catégorie
-            cat = transaction["category"]
-            
-            # Vérifier que category est un dict avec un id
-            if not isinstance(cat, dict) or "id" not in cat:
-                raise Exception("Schéma non respecté: 'category' doit être un dict avec un champ 'id'")
-            
-            # Vérifier que l'id de category existe dans CATEGORIES_SCHEMA
-            if cat["id"] not in CATEGORIES_SCHEMA:
-                raise Exception(f"Schéma non respecté: catégorie '{cat['id']}' inconnue dans CATEGORIES_SCHEMA")
-            
-            # Vérifier que subcategory est un dict avec un id
-            if "subcategory" not in cat or not isinstance(cat["subcategory"], dict) or "id" not in cat["subcategory"]:
-                raise Exception("Schéma non respecté: manque 'subcategory' avec 'id' dans 'category'")
-            
-            # Vérifier que l'id de subcategory existe dans CATEGORIES_SCHEMA
-            subcat_id = cat["subcategory"]["id"]
-            if subcat_id != "unknown" and (
-                "subcategories" not in CATEGORIES_SCHEMA[cat["id"]] or
-                subcat_id not in CATEGORIES_SCHEMA[cat["id"]]["subcategories"]
-            ):
-                raise Exception(f"Schéma non respecté: sous-catégorie '{subcat_id}' inconnue pour catégorie '{cat['id']}'")
-    
+        raise InvalidTypeError("La transaction doit être un dictionnaire")
+
+    # Cas nominal : aucune erreur à construire
+    is_valid, checks = _compiled_validator()
+    if is_valid(transaction):
+        return transaction
+
+    for check in checks:
+        error = check(transaction)
+        if error is not None:
+            raise error
+
     # Si toutes les validations passent, retourner la transaction
-    return transaction
\ No newline at end of file
+    return transaction
@@ -0,0 +1,95 @@
+"""
+Cache borné (LRU + TTL) des vérifications d'existence des utilisateurs
+"""
+from collections import OrderedDict
+import threading
+import time
+
+
+class UserExistenceCache:
+    """
+    Cache par processus des utilisateurs vérifiés.
+
+    Les utilisateurs existants sont conservés ttl secondes, les utilisateurs
+    introuvables negative_ttl secondes (pour qu'une inscription récente soit
+    vue rapidement). Au-delà de max_size entrées, les moins récemment
+    utilisées sont évincées.
+
+    invalidate ne concerne que le processus appelant : avec plusieurs
+    workers gunicorn, un utilisateur supprimé reste accepté par les autres
+    workers jusqu'à l'expiration de leur entrée. ttl borne donc la durée
+    pendant laquelle un compte supprimé peut encore lire ses données.
+    """
+
+    def __init__(self, max_size=10000, ttl=300, negative_ttl=5, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        """
+        Retourne le résultat en cache pour un utilisateur
+
+        Args:
+            user_id (str): Identifiant de l'utilisateur
+
+        Returns:
+            bool: True/False si le résultat est en cache et valide, None sinon
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                exists, expires_at = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return exists
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def set(self, user_id, exists):
+        """
+        Enregistre le résultat d'une vérification
+
+        Args:
+            user_id (str): Identifiant de l'utilisateur
+            exists (bool): True si l'utilisateur existe
+        """
+        ttl = self.ttl if exists else self.negative_ttl
+        if ttl <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[user_id] = (exists, self._clock() + ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id=None):
+        """
+        Supprime un utilisateur du cache (ou vide tout le cache)
+
+        Args:
+            user_id (str, optional): Identifiant de l'utilisateur, None pour tout vider
+        """
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self):
+        """
+        Retourne les compteurs du cache
+
+        Returns:
+            dict: hits, misses et nombre d'entrées
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}